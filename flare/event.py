@@ -47,5 +47,6 @@ class EventDispatcher(object):
         Informs all subscribed listeners.
         All parameters passed to the receiving function.
         """
-        for cb in self.queue:
+        # Receivers may unregister while the event is fired
+        for cb in self.queue[:]:
             getattr(cb, self._genTargetFuncName())(*args, **kwargs)
@@ -1,9 +1,10 @@
 """Flare base handlers for ViUR prototypes."""
 
 from .network import NetworkService, HTTPRequest
+from .multipart import MultipartEncoder
 from .event import EventDispatcher
 from .observable import StateHandler
-import string, random, os, json
+import json
 
 
 class requestHandler:
@@ -164,54 +165,8 @@ class SyncHandler(object):
         return json.loads(request.result)
 
     def genReqStr(self, params):
-        boundary_str = "---" + ''.join(
-            [random.choice(string.ascii_lowercase + string.ascii_uppercase + string.digits) for x in range(13)])
-        boundary = boundary_str
-
-        res = f"Content-Type: multipart/mixed; boundary=\"{boundary}\"\r\nMIME-Version: 1.0\r\n"
-        res += "\r\n--" + boundary
-
-        def expand(key, value):
-            ret = ""
-
-            if all([x in dir(value) for x in ["name", "read"]]):  # File
-                type = "application/octet-stream"
-                filename = os.path.basename(value.name).decode(sys.getfilesystemencoding())
-
-                ret += \
-                    f"\r\nContent-Type: {type}" \
-                    f"\r\nMIME-Version: 1.0" \
-                    f"\r\nContent-Disposition: form-data; name=\"{key}\"; filename=\"{filename}\"\r\n\r\n"
-                ret += str(value.read())
-                ret += '\r\n--' + boundary
-
-            elif isinstance(value, list):
-                if any([isinstance(entry, dict) for entry in value]):
-                    for idx, entry in enumerate(value):
-                        ret += expand(key + "." + str(idx), entry)
-                else:
-                    for entry in value:
-                        ret += expand(key, entry)
-
-            elif isinstance(value, dict):
-                for key_, entry in value.items():
-                    ret += expand(((key + ".") if key else "") + key_, entry)
-
-            else:
-                ret += \
-                    "\r\nContent-Type: application/octet-stream" \
-                    "\r\nMIME-Version: 1.0" \
-                    f"\r\nContent-Disposition: form-data; name=\"{key}\"\r\n\r\n"
-                ret += str(value) if value is not None else ""
-                ret += '\r\n--' + boundary
-
-            return ret
-
-        for key, value in params.items():
-            res += expand(key, value)
-
-        res += "--\r\n"
-        return res, boundary
+        encoder = MultipartEncoder(params)
+        return encoder.encode().decode("utf-8", "replace"), encoder.boundary
 
     def __init__(self):
         self.result = None
@@ -224,8 +179,9 @@ class SyncHandler(object):
             contentType = None
 
             if isinstance(params, dict):
-                multipart, boundary = self.genReqStr(params)
-                contentType = "multipart/form-data; boundary=" + boundary + "; charset=utf-8"
+                encoder = MultipartEncoder(params)
+                multipart = encoder.encode()
+                contentType = encoder.contentType
             elif isinstance(params, bytes):
                 contentType = "application/x-www-form-urlencoded"
                 multipart = params
@@ -5,8 +5,9 @@
 - Fully-integrated HTML-parser for quick Widget prototyping
 """
 
-import string, re, logging, inspect
-from types import SimpleNamespace
+import string, re, logging, inspect, itertools, weakref, ast
+from html import escape as _htmlEscape, unescape as _htmlUnescape
+from types import MappingProxyType
 from typing import Any, Callable, Dict
 
 # htmlExpressionEvaluator is used for interpreting conditional expressions
@@ -26,13 +27,14 @@ try:
     document = window.document
 
 except:
-    # This is only a dummy, but a demo to show how to bind html5 to another rendering environment.
+    # Emulation mode, rendering into the headless DOM backend, e.g. for benchmarks and tests in plain CPython.
     print("Emulation mode")
-    from xml.dom.minidom import parseString
+    from .headless import Document
 
     jseval = None
     window = None
-    document = parseString("<html><head /><body /></html>")
+    pyodide = None
+    document = Document()
 
 
 def domCreateAttribute(tag, ns=None):
@@ -79,6 +81,186 @@ def domCreateTextNode(txt=""):
     return document.createTextNode(txt)
 
 
+# Insert multiple widgets into an attached widget at once, by using a DocumentFragment.
+domUseFragments = True
+
+
+def domCreateDocumentFragment():
+    return document.createDocumentFragment()
+
+
+def domSetStyles(element, styles):
+    """Sets multiple inline style properties of element, by setProperty() like the style wrapper."""
+    style = element.style
+
+    for key, value in styles.items():
+        style.setProperty(key, value)
+
+
+# Render static template contents by one innerHTML assignment, and create their widgets on demand.
+domUseInnerHTML = True
+
+
+def domSetInnerHTML(element, html):
+    element.innerHTML = html
+
+
+class DomWriteQueue(object):
+    """Queue of DOM writes, which are run together with the next animation frame.
+
+    When `domUseWriteQueue` is enabled, widgets defer their DOM writes into `domWriteQueue` by domWrite(),
+    so that they don't interleave with layout reads. The Python side of the widgets is updated immediately;
+    call flush() to apply the pending writes before reading from the DOM.
+
+    :param requestFrame: Clock function, which is called with a callback to be run with the next frame.
+        Defaults to window.requestAnimationFrame. In emulation mode without a clock, writes are run by flush() only.
+    """
+
+    def __init__(self, requestFrame: Callable = None):
+        super().__init__()
+        self.requestFrame = requestFrame
+        self.writes = []
+        self.frameRequested = False
+        self.frames = 0  # Number of frames which ran writes
+        self.flushing = False
+        self._proxy = None
+
+    def write(self, func: Callable, *args):
+        """Queues the call func(*args), and requests a frame to run it."""
+        self.writes.append((func, args))
+
+        if not self.frameRequested:
+            self._requestFrame()
+
+    def _requestFrame(self):
+        if self.requestFrame:
+            self.requestFrame(self._onFrame)
+
+        elif window:
+            if self._proxy is None:
+                self._proxy = pyodide.create_proxy(self._onFrame) if pyodide else self._onFrame
+
+            window.requestAnimationFrame(self._proxy)
+
+        else:
+            return
+
+        self.frameRequested = True
+
+    def _onFrame(self, *args):
+        self.frameRequested = False
+
+        if self.writes:
+            self.frames += 1
+            self.flush()
+
+    def flush(self):
+        """Runs all pending writes in their order; writes made by them through domWrite() are run immediately."""
+        flushing, self.flushing = self.flushing, True
+
+        try:
+            while self.writes:
+                writes = self.writes
+                self.writes = []
+
+                for func, args in writes:
+                    try:
+                        func(*args)
+                    except Exception as e:
+                        logging.exception(e)
+        finally:
+            self.flushing = flushing
+
+    def __len__(self):
+        return len(self.writes)
+
+
+# Defer DOM writes of widgets into domWriteQueue, which is flushed with the next animation frame.
+domUseWriteQueue = False
+domWriteQueue = DomWriteQueue()
+
+
+def domWrite(func, *args):
+    """Runs the DOM write func(*args), or queues it when `domUseWriteQueue` is enabled."""
+    if domUseWriteQueue and not domWriteQueue.flushing:
+        domWriteQueue.write(func, *args)
+    else:
+        func(*args)
+
+
+def domFlush():
+    """Runs the DOM writes pending in domWriteQueue."""
+    domWriteQueue.flush()
+
+
+def _flushPendingWrites():
+    """Applies pending DOM writes before reading from the DOM, so that reads see all writes made before."""
+    if domUseWriteQueue and domWriteQueue.writes:
+        domFlush()
+
+
+# Methods of elements, their style and their classList which are queued by _DeferredElement
+_deferredMethods = {
+    "setAttribute",
+    "setAttributeNS",
+    "removeAttribute",
+    "removeAttributeNS",
+    "toggleAttribute",
+    "appendChild",
+    "insertBefore",
+    "removeChild",
+    "replaceChild",
+    "replaceChildren",
+    "append",
+    "prepend",
+    "remove",
+    "setProperty",
+    "removeProperty",
+    "add",
+    "toggle",
+    "replace",
+}
+
+# Objects of elements whose writes are queued by _DeferredElement as well
+_deferredObjects = {"style", "classList", "dataset"}
+
+
+class _DeferredElement(object):
+    """Stand-in for the element of a widget while Widget.__setitem__() runs an attribute setter with
+    `domUseWriteQueue` enabled.
+
+    Property assignments and calls of mutating methods are queued by domWrite(), so that the setter updates the
+    Python side of the widget immediately; this includes the style, classList and dataset of the element.
+    Anything else is read from the element after the pending writes were applied, so that the DOM sees all
+    operations in program order.
+    """
+
+    __slots__ = ("_element",)
+
+    def __init__(self, element):
+        super().__init__()
+        object.__setattr__(self, "_element", element)
+
+    def __getattr__(self, name):
+        if name in _deferredMethods:
+            method = getattr(self._element, name)
+            return lambda *args: domWrite(method, *args)
+
+        if name in _deferredObjects:
+            return _DeferredElement(getattr(self._element, name))
+
+        _flushPendingWrites()
+        return getattr(self._element, name)
+
+    def __setattr__(self, name, value):
+        domWrite(setattr, self._element, name, value)
+
+
+# Handle events of widgets by one listener per event type on the delegation root (see _delegateEvent()).
+domDelegateEvents = False
+domDelegationRoot = None  # Element receiving the delegated events, defaults to document.body
+
+
 def domGetElementById(idTag):
     return document.getElementById(idTag)
 
@@ -116,19 +298,37 @@ def domParseString(string, mimetype="text/html"):
     return __domParser.parseFromString(string, mimetype)
 
 
+__reTextMarkup = re.compile(r"<[A-Za-z!?/][^>]*(>|$)")
+
+
 def domConvertEncodedText(txt):
     """Convert HTML-encoded text (containing HTML entities) into its decoded string representation.
 
     The reason for this function is the handling of HTML entities, which is not properly supported by native JavaScript.
 
-    We use the browser's DOM parser to do this, according to
-    https://stackoverflow.com/questions/3700326/decode-amp-back-to-in-javascript
+    The text is decoded in Python, with the same result as the browser's DOM parser would deliver as textContent:
+    Line breaks are normalized, any markup is removed, and named or numeric character references are decoded
+    according to the HTML5 entity table. This doesn't require the browser, so it also works in emulation mode.
 
     :param txt: The encoded text.
     :return: The decoded text.
     """
-    doc = domParseString("<!doctype html><body>" + str(txt))
-    return doc.body.textContent
+    txt = str(txt)
+
+    # Fast path: Nothing to decode
+    if "&" not in txt and "<" not in txt and "\r" not in txt:
+        return txt
+
+    if "\r" in txt:
+        txt = txt.replace("\r\n", "\n").replace("\r", "\n")
+
+    if "<" in txt:
+        txt = __reTextMarkup.sub("", txt)
+
+    if "&" in txt:
+        txt = _htmlUnescape(txt)
+
+    return txt
 
 
 ########################################################################################################################
@@ -145,12 +345,21 @@ class TextNode(object):
     not support any of its properties.
     """
 
-    def __init__(self, txt=None, *args, **kwargs):
+    # __dict__ is only allocated when further attributes are set on a TextNode
+    __slots__ = ("_parent", "_children", "element", "_isAttached", "_observers", "__dict__", "__weakref__")
+
+    def __init__(self, txt=None, *args, _wrapElem=None, **kwargs):
         super().__init__()
         self._parent = None
-        self._children = []
-        self.element = domCreateTextNode(domConvertEncodedText(txt or ""))
+        self._children = ()  # A TextNode never has children
+
+        if _wrapElem is not None:
+            self.element = _wrapElem
+        else:
+            self.element = domCreateTextNode(domConvertEncodedText(txt or ""))
+
         self._isAttached = False
+        self._observers = ()  # observers of observable values rendered into this text, see _addObserver()
 
     def _setText(self, txt):
         self.element.data = domConvertEncodedText(txt)
@@ -164,9 +373,15 @@ class TextNode(object):
     def onAttach(self):
         self._isAttached = True
 
+        for observer in self._observers:
+            observer.attach()
+
     def onDetach(self):
         self._isAttached = False
 
+        for observer in self._observers:
+            observer.detach()
+
     def _setDisabled(self, disabled):
         return
 
@@ -181,16 +396,107 @@ class TextNode(object):
 
 
 class _WidgetClassWrapper(list):
+    """Ordered set of the CSS classes of a widget.
+
+    Changes are applied to the element as deltas by classList.add() and classList.remove(),
+    with several classes per call. When the element has no classList, the class attribute is rewritten.
+    """
+
     def __init__(self, targetWidget):
         super().__init__()
 
         self.targetWidget = targetWidget
+        self._classes = set()
+
+        # The wrapper may be created by a setter while the element is deferred, but it must keep the real classList.
+        # As the class attribute is only written by the wrapper, it can be read without applying pending writes.
+        element = targetWidget.element
+        if isinstance(element, _DeferredElement):
+            element = element._element
+
+        self._classList = getattr(element, "classList", None)
 
         # Initially read content of element into current wrappper
-        value = targetWidget.element.getAttribute("class")
+        value = element.getAttribute("class")
         if value:
-            for c in value.split(" "):
-                list.append(self, c)
+            self._add(value.split())
+
+    def _add(self, values):
+        """Adds values which are not already contained, and returns them."""
+        added = []
+
+        for value in values:
+            for c in value.split():
+                if c not in self._classes:
+                    self._classes.add(c)
+                    list.append(self, c)
+                    added.append(c)
+
+        return added
+
+    def _remove(self, values):
+        """Removes values which are contained, and returns them."""
+        removed = []
+
+        for c in values:
+            if c in self._classes:
+                self._classes.remove(c)
+                list.remove(self, c)
+                removed.append(c)
+
+        return removed
+
+    def _updateElem(self, added=None, removed=None):
+        """Writes changes to the element; Without added or removed classes, the whole attribute is written."""
+        domWrite(self._writeElem, added, removed)
+
+    def _writeElem(self, added, removed):
+        if self._classList is not None and (added is not None or removed is not None):
+            if removed and added and len(removed) == len(added) == 1:
+                self._classList.replace(removed[0], added[0])
+                return
+
+            if removed:
+                self._classList.remove(*removed)
+
+            if added:
+                self._classList.add(*added)
+
+        elif len(self) == 0:
+            self.targetWidget.element.removeAttribute("class")
+        else:
+            self.targetWidget.element.setAttribute("class", " ".join(self))
+
+    def __contains__(self, value):
+        return value in self._classes
+
+    def add(self, *values):
+        """Adds classes, which are not already contained, with one update."""
+        if added := self._add(values):
+            self._updateElem(added=added)
+
+    def discard(self, *values):
+        """Removes classes, if contained, with one update."""
+        if removed := self._remove(values):
+            self._updateElem(removed=removed)
+
+    def replace(self, old, new):
+        """Removes class old, if contained, and adds class new, if provided, with one update.
+
+        Like classList.replace(), new takes the position of old.
+        """
+        if old in self._classes and new and new not in self._classes:
+            list.__setitem__(self, list.index(self, old), new)
+            self._classes.remove(old)
+            self._classes.add(new)
+            self._updateElem(added=[new], removed=[old])
+            return
+
+        removed = self._remove([old]) if old else []
+        added = self._add([new]) if new else []
+
+        if removed or added:
+            self._updateElem(added=added, removed=removed)
 
     def set(self, value):
         if value is None:
@@ -201,109 +507,523 @@ class _WidgetClassWrapper(list):
             raise ValueError("Value must be a str, a List or None")
 
         list.clear(self)
-        list.extend(self, value)
+        self._classes.clear()
+        self._add(value)
         self._updateElem()
 
-    def _updateElem(self):
-        if len(self) == 0:
-            self.targetWidget.element.removeAttribute("class")
-        else:
-            self.targetWidget.element.setAttribute("class", " ".join(self))
-
     def append(self, p_object):
-        list.append(self, p_object)
-        self._updateElem()
+        self.add(p_object)
 
     def clear(self):
         list.clear(self)
+        self._classes.clear()
         self._updateElem()
 
     def remove(self, value):
-        try:
-            list.remove(self, value)
-        except:
-            pass
-        self._updateElem()
+        """Removes a class; unlike list.remove(), a class which is not contained is ignored, as it always was."""
+        self.discard(value)
 
     def extend(self, iterable):
-        list.extend(self, iterable)
-        self._updateElem()
+        self.add(*iterable)
 
     def insert(self, index, p_object):
-        list.insert(self, index, p_object)
-        self._updateElem()
+        if p_object not in self._classes:
+            self._classes.add(p_object)
+            list.insert(self, index, p_object)
+            self._updateElem()
 
-    def pop(self, index=None):
-        list.pop(self, index)
-        self._updateElem()
+    def pop(self, index=-1):
+        value = list.pop(self, index)
+        self._classes.discard(value)
+        self._updateElem(removed=[value])
+        return value
+
+
+def _classNames(args):
+    """Flattens class names provided as str or lists of str, as accepted by Widget.addClass()."""
+    ret = []
+
+    for item in args:
+        if isinstance(item, list):
+            ret.extend(_classNames(item))
+
+        elif isinstance(item, str):
+            ret.extend(item.split())
+
+        else:
+            raise TypeError()
+
+    return ret
 
 
 # _WidgetDataWrapper ---------------------------------------------------------------------------------------------------
 
 
 class _WidgetDataWrapper(dict):
+    """Custom data attributes of a widget, which is cached per widget.
+
+    Single items are read from and written to the element directly. The dict contents are synchronized
+    with the element only when the wrapper is enumerated.
+    """
+
     def __init__(self, targetWidget):
         super().__init__()
-
         self.targetWidget = targetWidget
-        alldata = targetWidget.element
+
+    def _sync(self):
+        _flushPendingWrites()
+        dict.clear(self)
+        alldata = self.targetWidget.element
 
         for data in dir(alldata.dataset):
             dict.__setitem__(self, data, getattr(alldata.dataset, data))
 
+    def __getitem__(self, key):
+        _flushPendingWrites()
+        value = self.targetWidget.element.getAttribute(str("data-" + key))
+        if value is None:
+            raise KeyError(key)
+
+        dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        _flushPendingWrites()
+        return bool(self.targetWidget.element.hasAttribute(str("data-" + key)))
+
     def __setitem__(self, key, value):
         dict.__setitem__(self, key, value)
-        self.targetWidget.element.setAttribute(str("data-" + key), value)
+        domWrite(self.targetWidget.element.setAttribute, str("data-" + key), value)
+
+    def __delitem__(self, key):
+        dict.pop(self, key, None)
+        domWrite(self.targetWidget.element.removeAttribute, str("data-" + key))
 
     def update(self, E=None, **F):
-        dict.update(self, E, **F)
-        if E is not None and "keys" in dir(E):
-            for key in E:
-                self.targetWidget.element.setAttribute(
-                    str("data-" + key), E["data-" + key]
-                )
-        elif E:
-            for (key, val) in E:
-                self.targetWidget.element.setAttribute(
-                    str("data-" + key), "data-" + val
-                )
-        for key in F:
-            self.targetWidget.element.setAttribute(str("data-" + key), F["data-" + key])
+        for key, value in dict(E or {}, **F).items():
+            self[key] = value
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+
+            raise
+
+        del self[key]
+        return value
+
+    def popitem(self):
+        self._sync()
+        key, value = dict.popitem(self)
+        del self[key]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def clear(self):
+        self._sync()
+
+        for key in list(dict.keys(self)):
+            del self[key]
 
 
 # _WidgetStyleWrapper --------------------------------------------------------------------------------------------------
 
 
 class _WidgetStyleWrapper(dict):
+    """Inline style of a widget, which is cached per widget.
+
+    Single properties are read from and written to the element directly. The dict contents are synchronized
+    with the element only when the wrapper is enumerated.
+    """
+
     def __init__(self, targetWidget):
         super().__init__()
-
         self.targetWidget = targetWidget
-        style = targetWidget.element.style
+
+    def _sync(self):
+        _flushPendingWrites()
+        dict.clear(self)
+        style = self.targetWidget.element.style
 
         for key in style.object_values():
-            self[key] = style.getPropertyValue(key)
+            dict.__setitem__(self, key, style.getPropertyValue(key))
+
+    def __getitem__(self, key):
+        _flushPendingWrites()
+
+        if not (value := self.targetWidget.element.style.getPropertyValue(key)):
+            raise KeyError(key)
+
+        dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        _flushPendingWrites()
+        return bool(self.targetWidget.element.style.getPropertyValue(key))
 
     def __setitem__(self, key, value):
         dict.__setitem__(self, key, value)
-        self.targetWidget.element.style.setProperty(key, value)
+        domWrite(self.targetWidget.element.style.setProperty, key, value)
+
+    def __delitem__(self, key):
+        dict.pop(self, key, None)
+        domWrite(self.targetWidget.element.style.removeProperty, key)
 
     def update(self, E=None, **F):
-        dict.update(self, E, **F)
-        if E is not None and "keys" in dir(E):
-            for key in E:
-                self.targetWidget.element.style.setProperty(key, E[key])
-        elif E:
-            for (key, val) in E:
-                self.targetWidget.element.style.setProperty(key, val)
-        for key in F:
-            self.targetWidget.element.style.setProperty(key, F[key])
+        self.targetWidget.setStyles(dict(E or {}, **F))
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+
+            raise
+
+        del self[key]
+        return value
+
+    def popitem(self):
+        self._sync()
+        key, value = dict.popitem(self)
+        del self[key]
+        return key, value
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def clear(self):
+        self._sync()
+
+        for key in list(dict.keys(self)):
+            del self[key]
+
+
+def _syncFirst(name):
+    func = getattr(dict, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._sync()
+        return func(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ("__eq__", "__iter__", "__len__", "__repr__", "copy", "items", "keys", "values"):
+    setattr(_WidgetDataWrapper, _name, _syncFirst(_name))
+    setattr(_WidgetStyleWrapper, _name, _syncFirst(_name))
+
+del _name
 
 
 # Widget ---------------------------------------------------------------------------------------------------------------
 
 
+# Shared, read-only placeholder for the event maps of widgets without any events
+_noEvents = MappingProxyType({})
+
+
+class _EventListener(object):
+    """Event listener added by Widget.addEventListener().
+
+    The listener is the callable which is registered for the event. It calls the callback with the parameters
+    it accepts: none, the event, or the event and the widget.
+    """
+
+    __slots__ = (
+        "event",
+        "proxy",
+        "destroyProxy",
+        "org_callback",
+        "arity",
+        "widget",
+        "attached",
+        "delegated",
+        "__weakref__",
+    )
+
+    def __init__(self, event, org_callback, widget, delegated=False):
+        super().__init__()
+        self.event = event
+        self.proxy = None
+        self.destroyProxy = None
+        self.org_callback = org_callback
+        self.arity = _callbackArity(org_callback)
+        self.widget = widget
+        self.attached = False  # registered at the element
+        self.delegated = delegated
+
+    def __call__(self, event):
+        if self.arity == 0:
+            return self.org_callback()
+        elif self.arity == 1:
+            return self.org_callback(event)
+
+        return self.org_callback(event, self.widget)
+
+    def getProxy(self):
+        """Returns the proxy of the listener in Pyodide, which is created once and kept until the listener is gone."""
+        if not pyodide:
+            return self
+
+        if not self.proxy:
+            self.proxy, self.destroyProxy = _createEventProxy(self)
+
+        return self.proxy
+
+
+# Arity of event callbacks by function, see _callbackArity()
+__callbackArities = weakref.WeakKeyDictionary()
+__methodArities = weakref.WeakKeyDictionary()
+
+
+def _callbackArity(callback):
+    """Returns the number of parameters of callback.
+
+    The signature is inspected once per function, which is shared by the bound methods of all instances.
+    """
+    if func := getattr(callback, "__func__", None):
+        cache = __methodArities
+    else:
+        func = callback
+        cache = __callbackArities
+
+    try:
+        if (arity := cache.get(func)) is None:
+            arity = cache[func] = len(inspect.signature(callback).parameters)
+
+    except TypeError:  # not weak-referenceable
+        arity = len(inspect.signature(callback).parameters)
+
+    return arity
+
+
+# Event listeners of attached widgets, see _pinEventListener()
+__pinnedEventListeners = set()
+__eventProxyStats = {"created": 0, "destroyed": 0}
+
+
+def _pinEventListener(event_listener, pin=True):
+    """Keeps event_listener, and therefore its widget, alive while the widget is attached."""
+    if pin:
+        __pinnedEventListeners.add(event_listener)
+    else:
+        __pinnedEventListeners.discard(event_listener)
+
+
+def _createEventProxy(event_listener):
+    """Creates the proxy for event_listener, and a finalizer destroying it when the listener is gone.
+
+    The proxy only references the listener weakly, listeners of attached widgets are kept by _pinEventListener().
+    """
+    ref = weakref.ref(event_listener)
+
+    def dispatch(event):
+        if (event_listener := ref()) is not None:
+            event_listener(event)
+
+    proxy = pyodide.create_proxy(dispatch)
+    __eventProxyStats["created"] += 1
+
+    return proxy, weakref.finalize(event_listener, _destroyEventProxy, proxy)
+
+
+def _destroyEventProxy(proxy):
+    proxy.destroy()
+    __eventProxyStats["destroyed"] += 1
+
+
+def eventListenerStats():
+    """Returns the number of event listener proxies created, destroyed and alive, and of attached listeners."""
+    return {
+        "proxiesCreated": __eventProxyStats["created"],
+        "proxiesDestroyed": __eventProxyStats["destroyed"],
+        "proxiesLive": __eventProxyStats["created"] - __eventProxyStats["destroyed"],
+        "attachedListeners": len(__pinnedEventListeners),
+    }
+
+
+# Element to widget registry, see _registerWidget()
+__widgetIds = itertools.count(1)
+__widgetsById = weakref.WeakValueDictionary()
+
+# Event types handled by the delegation root, and their native listeners
+__delegatedEvents = {}
+
+# Events which don't bubble, and are delegated in the capture phase to their target widget only
+__nonBubblingEvents = {
+    "abort",
+    "blur",
+    "canplay",
+    "ended",
+    "error",
+    "focus",
+    "load",
+    "loadeddata",
+    "loadedmetadata",
+    "mouseenter",
+    "mouseleave",
+    "pause",
+    "play",
+    "playing",
+    "pointerenter",
+    "pointerleave",
+    "scroll",
+    "timeupdate",
+    "toggle",
+    "volumechange",
+}
+
+
+def _registerWidget(widget):
+    """Registers widget as the owner of its element, so that it can be found by _widgetForElement()."""
+    widgetId = getattr(widget.element, "flareWidgetId", None)
+
+    if not widgetId:
+        widgetId = widget.element.flareWidgetId = next(__widgetIds)
+
+    # An element may be wrapped again, e.g. by html5.Body()
+    if __widgetsById.get(widgetId) is not widget:
+        __widgetsById[widgetId] = widget
+
+
+def _widgetForElement(element):
+    """Returns the widget registered for element, or None."""
+    if widgetId := getattr(element, "flareWidgetId", None):
+        return __widgetsById.get(widgetId)
+
+    return None
+
+
+def _delegateEvent(event):
+    """Registers the native listener for event on the delegation root, once per event type."""
+    if event in __delegatedEvents:
+        return
+
+    root = domDelegationRoot or document.body
+    capture = event in __nonBubblingEvents
+
+    listener = _dispatchDelegatedEvent
+    if pyodide:
+        listener = pyodide.create_proxy(listener)
+
+    root.addEventListener(event, listener, capture)
+    __delegatedEvents[event] = listener
+
+
+def _dispatchDelegatedEvent(event):
+    """Dispatches a native event received by the delegation root to the delegated listeners of the widgets
+    from the event's target up to the root, as it bubbles.
+
+    Events which don't bubble are dispatched to the target's widget only. Event.stopPropagation() called by a
+    listener stops the dispatch after the listeners of the current widget.
+    """
+    root = event.currentTarget
+    bubbles = event.type not in __nonBubblingEvents
+    element = event.target
+
+    while element:
+        if (widget := _widgetForElement(element)) is not None:
+            for event_listener in list(widget._event_listeners.values()):
+                if event_listener.delegated and event_listener.event == event.type:
+                    event_listener(event)
+
+            if event.cancelBubble:
+                break
+
+        if not bubbles or element == root:
+            break
+
+        element = element.parentNode
+
+
+# Attributes whose getters only read the Python side of a widget, see Widget.__getitem__();
+# the wrappers returned for class, style and data apply pending writes themselves before reading from the DOM
+_pythonSideAttributes = {"class", "Class", "style", "Style", "data", "Data", "disabled", "Disabled"}
+
+# Attribute dispatch tables of Widget classes, see _widgetAttributes()
+__widgetAttributes = {}
+
+
+def _widgetAttributes(cls):
+    """Returns the attribute getters and setters of a Widget class as dicts of attribute names and method names,
+    and the lower-cased names of its attributes which can be set.
+
+    The tables are built on first use per class. Attribute names are accepted with lower- and upper-case first letter,
+    as by Widget._getTargetfuncName(). The methods are looked up by name on each access, so that methods replaced
+    on a class or an instance are honored.
+    """
+    if (tables := __widgetAttributes.get(cls)) is not None:
+        return tables
+
+    getters = {}
+    setters = {}
+    names = set()
+
+    for fname in dir(cls):
+        if not fname.startswith(("_get", "_set")) or len(fname) < 5:
+            continue
+
+        if fname.startswith("_set"):
+            names.add(fname[4:].lower())
+
+        # Custom _getTargetfuncName() requires the usual lookup
+        if cls._getTargetfuncName is not Widget._getTargetfuncName:
+            continue
+
+        table = getters if fname.startswith("_get") else setters
+        table.setdefault(fname[4:], fname)
+        table.setdefault(fname[4].lower() + fname[5:], fname)
+
+    tables = __widgetAttributes[cls] = (getters, setters, sorted(names))
+    return tables
+
+
 class Widget(object):
+    # The core attributes are stored in slots. Subclasses without __slots__, like the widgets for the HTML tags,
+    # store any further attributes, e.g. widgets bound by [name], in their __dict__.
+    __slots__ = (
+        "element",
+        "_widgetClassWrapper",
+        "_widgetStyleWrapper",
+        "_widgetDataWrapper",
+        "_event_listeners",
+        "_children",
+        "_catchedEvents",
+        "_disabledState",
+        "_isAttached",
+        "_parent",
+        "_observers",
+        "__weakref__",
+    )
+
     _namespace = None  # Namespace
     _tagName = None  # Defines the DOM element name that is used for construction
     _leafTag = False  # Defines whether ths Widget may contain other Widgets (default) or is a leaf
@@ -319,20 +1039,21 @@ class Widget(object):
             self.element = domCreateElement(self._tagName, ns=self._namespace)
 
         self._widgetClassWrapper = None
-        self._event_listeners = {}  # a map of attached event listeners, and their proxies.
+        self._widgetStyleWrapper = None
+        self._widgetDataWrapper = None
+        self._event_listeners = _noEvents  # a map of attached event listeners, and their proxies.
 
         super().__init__()
 
-        self.addClass(self.style)
-
-        if style:
-            self.addClass(style)
+        # Assign all classes with one update
+        self.addClass(self.style, style or [])
 
         self._children = []
-        self._catchedEvents = {}
+        self._catchedEvents = _noEvents
         self._disabledState = 0
         self._isAttached = False
         self._parent = None
+        self._observers = ()  # observers of observable values rendered into this widget, see _addObserver()
 
         if args:
             self.appendChild(*args, **kwargs)
@@ -350,6 +1071,9 @@ class Widget(object):
             eventFn = getattr(self, event_attrName, None)
             assert eventFn and callable(eventFn), f"{self} must provide a {event_attrName}-function"
 
+            if self._catchedEvents is _noEvents:
+                self._catchedEvents = {}
+
             self._catchedEvents[event_attrName] = eventFn
 
             if event.startswith("on"):
@@ -385,38 +1109,24 @@ class Widget(object):
         event_listener_key =  f"{event}_{hash(callback)}"
         assert event_listener_key not in self._event_listeners, f"{callback} already assigned, please remove it first"
 
-        parameters = inspect.signature(callback).parameters
-        org_callback = callback
-
-        # Allow for callback without parameter
-        if len(parameters) == 0:
-            # `lambda callback: lambda _: callback()` doesn't work.
-            def _wrapEventCallback(callback):
-                return lambda _: callback()
+        if domDelegateEvents:
+            # The event is handled by the delegation root, so there's no native listener and no proxy
+            _registerWidget(self)
+            _delegateEvent(event)
+            event_listener = _EventListener(event, callback, self, delegated=True)
 
-            callback = _wrapEventCallback(org_callback)
-
-        # Allow for callback with two or more parameters, to catch the event's source
-        elif len(parameters) >= 2:
-            # `callback = lambda callback: lambda event: callback(event, self)` doesn't work.
-            def _wrapEventWidgetCallback(callback, widget):
-                return lambda event: callback(event, widget)
-
-            callback = _wrapEventWidgetCallback(org_callback, self)
-
-        if pyodide:
-            # In Pyodide, add a proxy for the callback and keep its usage
-            proxy = pyodide.create_proxy(callback)
         else:
-            proxy = None
-
-        self.element.addEventListener(event, proxy or callback)
+            event_listener = _EventListener(event, callback, self)
+            self.element.addEventListener(event, event_listener.getProxy())
+            event_listener.attached = True
 
-        event_listener = SimpleNamespace(
-            event=event, proxy=proxy, callback=callback, org_callback=org_callback, attached=True
-        )
+        if self._isAttached:
+            _pinEventListener(event_listener)
 
         # print("_event_listeners add", event_listener_key)
+        if self._event_listeners is _noEvents:
+            self._event_listeners = {}
+
         self._event_listeners[event_listener_key] = event_listener
 
     def removeEventListener(self, event, callback):
@@ -430,10 +1140,17 @@ class Widget(object):
         event_listener_key = f"{event}_{hash(callback)}"
         assert event_listener_key in self._event_listeners, f"{callback} was not added by addEventListener previously"
 
-        if event_listener := self._event_listeners.pop(event_listener_key, None):
+        if event_listener := self._event_listeners.get(event_listener_key):
+            del self._event_listeners[event_listener_key]
+
+            _pinEventListener(event_listener, False)
+
             # print("_event_listeners remove", event_listener_key)
-            self.element.removeEventListener(event, event_listener.proxy or event_listener.callback)
-            event_listener.proxy.destroy()
+            if event_listener.attached:
+                self.element.removeEventListener(event, event_listener.getProxy())
+
+            if event_listener.destroyProxy:
+                event_listener.destroyProxy()
 
     def disable(self):
         """Disables an element, in case it is not already disabled.
@@ -453,18 +1170,32 @@ class Widget(object):
         return "_{}{}{}".format(type, key[0].upper(), key[1:])
 
     def __getitem__(self, key):
-        funcName = self._getTargetfuncName(key, "get")
+        funcName = _widgetAttributes(self.__class__)[0].get(key) or self._getTargetfuncName(key, "get")
 
         if func := getattr(self, funcName, None):
+            # Getters may read from the DOM, so pending writes are applied first
+            if key not in _pythonSideAttributes:
+                _flushPendingWrites()
+
             return func()
 
         return None
 
     def __setitem__(self, key, value):
-        funcName = self._getTargetfuncName(key, "set")
+        funcName = _widgetAttributes(self.__class__)[1].get(key) or self._getTargetfuncName(key, "set")
 
         if func := getattr(self, funcName, None):
-            return func(value)
+            if not domUseWriteQueue or isinstance(element := self.element, _DeferredElement):
+                return func(value)
+
+            # The setter runs immediately, its writes to the element are queued
+            self.element = deferred = _DeferredElement(element)
+
+            try:
+                return func(value)
+            finally:
+                if self.element is deferred:
+                    self.element = element
 
         raise ValueError(
             "{} is no valid attribute for {}".format(key, (self._tagName or str(self)))
@@ -482,7 +1213,10 @@ class Widget(object):
         :param name:
         :returns:
         """
-        return _WidgetDataWrapper(self)
+        if self._widgetDataWrapper is None:
+            self._widgetDataWrapper = _WidgetDataWrapper(self)
+
+        return self._widgetDataWrapper
 
     def _getTranslate(self):
         """Specifies whether an elements attribute values and contents of its children are to be translated when the page is localized, or whether to leave them unchanged.
@@ -722,12 +1456,26 @@ class Widget(object):
         :param self:
         :returns:
         """
-        return _WidgetStyleWrapper(self)
+        if self._widgetStyleWrapper is None:
+            self._widgetStyleWrapper = _WidgetStyleWrapper(self)
 
-    def _getRole(self):
-        """Specifies a role for an element.
+        return self._widgetStyleWrapper
 
-        @param self:
+    def setStyles(self, styles: Dict[str, str]):
+        """Sets multiple inline style properties with one DOM write.
+
+        :param styles: A dict of CSS property names and their values.
+        """
+        if styles:
+            domWrite(domSetStyles, self.element, styles)
+
+            if self._widgetStyleWrapper is not None:
+                dict.update(self._widgetStyleWrapper, styles)
+
+    def _getRole(self):
+        """Specifies a role for an element.
+
+        @param self:
         @return:
         """
         return self.element.getAttribute("role")
@@ -780,39 +1528,42 @@ class Widget(object):
     def onAttach(self):
         self._isAttached = True
 
-        for c in self._children:
+        # Children which are not yet materialized get the state of their parent (see _LazyChildren)
+        for c in _materializedChildren(self._children):
             c.onAttach()
 
         for event_listener in self._event_listeners.values():
-            if event_listener.attached:  # only add if detached.
-                continue
+            _pinEventListener(event_listener)
 
-            if pyodide:
-                assert not event_listener.proxy
-                event_listener.proxy = pyodide.create_proxy(event_listener.callback)
+            if event_listener.attached or event_listener.delegated:  # only add if detached.
+                continue
 
-            self.element.addEventListener(event_listener.event, event_listener.proxy or event_listener.callback)
+            # The proxy is kept while detached, and registered again
+            self.element.addEventListener(event_listener.event, event_listener.getProxy())
             event_listener.attached = True  # mark as attached
             # print("_event_listeners attach", event_listener)
 
+        for observer in self._observers:
+            observer.attach()
+
     def onDetach(self):
         self._isAttached = False
-        for c in self._children:
+        for c in _materializedChildren(self._children):
             c.onDetach()
 
         for event_listener in self._event_listeners.values():
-            if not event_listener.attached:
-                continue
-
-            self.element.removeEventListener(event_listener.event, event_listener.proxy or event_listener.callback)
+            _pinEventListener(event_listener, False)
 
-            if event_listener.proxy:
-                event_listener.proxy.destroy()
-                event_listener.proxy = None
+            if not event_listener.attached or event_listener.delegated:
+                continue
 
+            self.element.removeEventListener(event_listener.event, event_listener.getProxy())
             event_listener.attached = False  # mark as detached
             # print("_event_listeners detach", event_listener)
 
+        for observer in self._observers:
+            observer.detach()
+
     def __collectChildren(self, *args, **kwargs):
         """Internal function for collecting children from args.
 
@@ -823,7 +1574,7 @@ class Widget(object):
 
         widgets = []
         for arg in args:
-            if isinstance(arg, (str, HtmlAst)):
+            if isinstance(arg, (str, HtmlAst, HtmlBuilder)):
                 widgets.extend(fromHTML(arg, **kwargs))
 
             elif isinstance(arg, (list, tuple)):
@@ -850,7 +1601,7 @@ class Widget(object):
             if insert._parent:
                 insert._parent.removeChild(insert)
 
-            self.element.insertBefore(insert.element, child.element)
+            domWrite(self.element.insertBefore, insert.element, child.element)
             self._children.insert(self._children.index(child), insert)
 
             insert._parent = self
@@ -871,7 +1622,12 @@ class Widget(object):
             if insert._parent:
                 insert._parent.removeChild(insert)
 
-            self.element.insertBefore(insert.element, child.element.nextSibling)
+            # The sibling is looked up when the write is run
+            domWrite(
+                lambda element, child: self.element.insertBefore(element, child.nextSibling),
+                insert.element,
+                child.element,
+            )
             self._children.insert(self._children.index(child), insert)
 
             insert._parent = self
@@ -909,6 +1665,16 @@ class Widget(object):
 
         toAppend = self.__collectChildren(*args, **kwargs)
 
+        # Multiple widgets are inserted into the document by one operation, and attached afterwards.
+        fragment = None
+        if (
+            domUseFragments
+            and self._isAttached
+            and len(toAppend) > 1
+            and not any(isinstance(child, Template) for child in toAppend)
+        ):
+            fragment = domCreateDocumentFragment()
+
         for child in toAppend:
             if isinstance(child, Template):
                 return self.appendChild(child._children)
@@ -917,17 +1683,97 @@ class Widget(object):
                 child._parent._children.remove(child)
 
             self._children.append(child)
-            self.element.appendChild(child.element)
+
+            if fragment is not None:
+                fragment.appendChild(child.element)
+            else:
+                domWrite(self.element.appendChild, child.element)
+
             child._parent = self
 
-            if self._isAttached:
+            if self._isAttached and fragment is None:
+                child.onAttach()
+
+        if fragment is not None:
+            domWrite(self.element.appendChild, fragment)
+
+            for child in toAppend:
                 child.onAttach()
 
         return toAppend
 
     def replaceChild(self, *args, **kwargs):
-        self.removeAllChildren()
-        self.appendChild(*args, **kwargs)
+        """Replaces all children by the given ones.
+
+        Children which are passed again are kept in place and stay attached, so their onDetach() and onAttach()
+        are not called; see patchChildren().
+        """
+        self.patchChildren(self.__collectChildren(*args, **kwargs))
+
+    def patchChildren(self, children, key=None):
+        """Reconciles the children with a new list of children, with a minimal number of DOM operations.
+
+        Children which are contained in the new list are kept, and only moved when their position changed;
+        the moves are planned by the longest increasing subsequence of their old positions.
+        Children which are not contained anymore are removed, and new ones are inserted.
+
+        :param children: The new children; Widgets, TextNodes or Templates.
+        :param key: Optional function returning a key for a child. A new child whose key matches the key of an
+            existing child is dropped in favor of the existing one. By default, children are matched by identity.
+        :return: The new children.
+        """
+        newChildren = []
+        for child in children:
+            if isinstance(child, Template):
+                newChildren.extend(child._children)
+            else:
+                newChildren.append(child)
+
+        if key:
+            existing = {}
+            for child in self._children:
+                existing.setdefault(key(child), child)
+
+            newChildren = [existing.pop(key(child), child) for child in newChildren]
+
+        kept = {id(child) for child in newChildren}
+
+        for child in self._children[:]:
+            if id(child) not in kept:
+                self.removeChild(child)
+
+        # Old positions of the remaining children, and the ones among them which stay in place
+        positions = {id(child): i for i, child in enumerate(self._children)}
+        stable = _longestIncreasingSubsequence([positions.get(id(child), -1) for child in newChildren])
+
+        inserted = []
+        before = None  # element of the successor, None for the end
+
+        for i in range(len(newChildren) - 1, -1, -1):
+            child = newChildren[i]
+
+            if i not in stable:
+                if id(child) not in positions:
+                    if child._parent:
+                        child._parent.removeChild(child)
+
+                    child._parent = self
+                    inserted.append(child)
+
+                if before is None:
+                    domWrite(self.element.appendChild, child.element)
+                else:
+                    domWrite(self.element.insertBefore, child.element, before)
+
+            before = child.element
+
+        self._children[:] = newChildren
+
+        if self._isAttached:
+            for child in reversed(inserted):
+                child.onAttach()
+
+        return newChildren
 
     def removeChild(self, child):
         assert child in self._children, "{} is not a child of {}".format(child, self)
@@ -935,7 +1781,7 @@ class Widget(object):
         if child._isAttached:
             child.onDetach()
 
-        self.element.removeChild(child.element)
+        domWrite(self.element.removeChild, child.element)
         self._children.remove(child)
         child._parent = None
 
@@ -1003,16 +1849,8 @@ class Widget(object):
         :param args: A list of class names. This can also be a list.
         :type args: list of str | list of list of str
         """
-        for item in args:
-            if isinstance(item, list):
-                self.addClass(*item)
-
-            elif isinstance(item, str):
-                for sitem in item.split(" "):
-                    if not self.hasClass(sitem):
-                        self["class"].append(sitem)
-            else:
-                raise TypeError()
+        if classes := _classNames(args):
+            self["class"].add(*classes)
 
     def removeClass(self, *args):
         """Removes a class or a list of classes from the current widget.
@@ -1020,16 +1858,8 @@ class Widget(object):
         :param args: A list of class names. This can also be a list.
         :type args: list of str | list of list of str
         """
-        for item in args:
-            if isinstance(item, list):
-                self.removeClass(item)
-
-            elif isinstance(item, str):
-                for sitem in item.split(" "):
-                    if self.hasClass(sitem):
-                        self["class"].remove(sitem)
-            else:
-                raise TypeError()
+        if classes := _classNames(args):
+            self["class"].discard(*classes)
 
     def toggleClass(self, on, off=None):
         """Toggles the class ``on``.
@@ -1046,18 +1876,13 @@ class Widget(object):
         :return: Returns True, if ``on`` was switched, else False.
         :rtype: bool
         """
-        if self.hasClass(on):
-            self.removeClass(on)
-
-            if off and not self.hasClass(off):
-                self.addClass(off)
+        classes = self["class"]
 
+        if on in classes:
+            classes.replace(on, off)
             return False
 
-        if off and self.hasClass(off):
-            self.removeClass(off)
-
-        self.addClass(on)
+        classes.replace(off, on)
         return True
 
     def onBlur(self, event):
@@ -1201,17 +2026,10 @@ class Widget(object):
         """Sorts our direct children. They are rearranged on DOM level.
 
         Key must be a function accepting one widget as parameter and must return
-        the key used to sort these widgets.
+        the key used to sort these widgets. With reversed, the children are sorted in descending order,
+        both in the DOM and in the list of children.
         """
-        self._children.sort(key=key)
-        tmpl = self._children[:]
-
-        if not reversed:
-            tmpl.reverse()
-
-        for c in tmpl:
-            self.element.removeChild(c.element)
-            self.element.insertBefore(c.element, self.element.children.item(0))
+        self.patchChildren(sorted(self._children, key=key, reverse=reversed))
 
     def fromHTML(
         self, html, appendTo=None, bindTo=None, replace=False, vars=None, **kwargs
@@ -2706,6 +3524,41 @@ def unescape(val, maxLength=0):
     return val
 
 
+def _longestIncreasingSubsequence(sequence):
+    """Returns the indexes of a longest strictly increasing subsequence of the non-negative values in sequence."""
+    tails = []  # index of the smallest tail value of all increasing subsequences of length i + 1
+    predecessors = [-1] * len(sequence)
+
+    for i, value in enumerate(sequence):
+        if value < 0:
+            continue
+
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if sequence[tails[mid]] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo:
+            predecessors[i] = tails[lo - 1]
+
+        if lo == len(tails):
+            tails.append(i)
+        else:
+            tails[lo] = i
+
+    indexes = set()
+    i = tails[-1] if tails else -1
+
+    while i >= 0:
+        indexes.add(i)
+        i = predecessors[i]
+
+    return indexes
+
+
 def doesEventHitWidgetOrParents(event, widget):
     """Test if event 'event' hits widget 'widget' (or *any* of its parents)."""
     while widget:
@@ -2719,14 +3572,36 @@ def doesEventHitWidgetOrParents(event, widget):
 
 def doesEventHitWidgetOrChildren(event, widget):
     """Test if event 'event' hits widget 'widget' (or *any* of its children)."""
-    if event.target == widget.element:
-        return True
+    return eventHitChild(event, widget) is not None
 
-    for child in widget._children:
-        if doesEventHitWidgetOrChildren(event, child):
-            return True
 
-    return False
+def eventHitChild(event, widget):
+    """Returns widget when event 'event' hits it, or the child of widget which is hit itself or by any of its children.
+
+    Walks from the event's target up to widget, so the costs depend on the depth of the target, not on the size of
+    widget's subtree. The children of widget are found by the element-to-widget registry, which is filled on demand.
+    """
+    element = event.target
+
+    while element:
+        if element == widget.element:
+            return widget
+
+        parent = element.parentNode
+
+        if parent == widget.element:
+            if (child := _widgetForElement(element)) is None or child._parent is not widget:
+                for child in widget._children:
+                    if isinstance(child, Widget):
+                        _registerWidget(child)
+
+                child = _widgetForElement(element)
+
+            return child
+
+        element = parent
+
+    return None
 
 
 def textToHtml(node, text):
@@ -2836,7 +3711,134 @@ def isMeta(event):
 
 # Global variables required by HTML parser & renderer
 __tags = None
+__tagsVersion = 0
 __reVarReplacer = re.compile("{{(([^}]|}[^}])*)}}")
+__reHtmlWhite = re.compile(r"[ \t\r\n]*")
+__reHtmlWord = re.compile(r"[^ \t\r\n<>=\"']*")
+__reHtmlTag = re.compile(r"<([^/ \t\r\n<>=\"'][^ \t\r\n<>=\"']*)")
+
+# Templates pre-parsed by the build tool (tools/flare.py --precompile), if available
+try:
+    from .precompiled import templates as __htmlPrecompiled
+except ImportError:
+    __htmlPrecompiled = {}
+
+
+class HtmlAst(list):
+    """Abstract syntax tree element used by parseHTML()."""
+
+    builder = None  # HtmlBuilder generated by compileHTML()
+    renders = 0  # Number of renderings by fromHTML()
+    static = None  # Tags version and HTML code, when rendered by innerHTML (see _staticHTML())
+
+
+class HtmlAstCache(object):
+    """Bounded LRU cache for HtmlAst objects parsed by parseHTML(), keyed by their template source.
+
+    This is used by fromHTML(), so that a template string which is rendered repeatedly is only parsed once.
+    A maxSize of 0 disables the cache.
+    """
+
+    def __init__(self, maxSize=256):
+        super().__init__()
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+        self.precompiled = 0
+        self._entries = {}
+
+    def get(self, html: str, debug: bool = False) -> HtmlAst:
+        """Returns the HtmlAst for html, either from the cache or by parsing it."""
+        if self.maxSize <= 0:
+            return parseHTML(html, debug=debug)
+
+        if (ast := self._entries.pop(html, None)) is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+            if (ast := _precompiledHTML(html)) is not None:
+                self.precompiled += 1
+            else:
+                ast = parseHTML(html, debug=debug)
+
+            while len(self._entries) >= self.maxSize:
+                del self._entries[next(iter(self._entries))]
+
+        # (Re-)insert as most recently used entry
+        self._entries[html] = ast
+        return ast
+
+    def clear(self):
+        """Removes all entries; This is required when the tag registry changes."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hits, misses (and how many of them were served precompiled), the current size and the size limit of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "precompiled": self.precompiled,
+            "size": len(self._entries),
+            "maxSize": self.maxSize,
+        }
+
+
+# Process-wide cache for parsed templates used by fromHTML()
+htmlAstCache = HtmlAstCache()
+
+
+def precompileHTML(html: str) -> tuple:
+    """Parses html into a compact, literal-only representation, as used by the build tool (tools/flare.py).
+
+    The result contains the tag names html refers to together with their leaf-flag, or None when they are
+    unknown to the tag registry, so that `_precompiledHTML()` can check that it still parses the same way.
+    """
+    if __tags is None:
+        _buildTags()
+
+    signature = []
+    for tag in sorted(set(word.lower() for word in __reHtmlTag.findall(html))):
+        signature.append((tag, bool(__tags[tag][0]._leafTag) if tag in __tags else None))
+
+    def pack(items):
+        return tuple(
+            item if isinstance(item, str) else (item[0], tuple(item[1].items()), pack(item[2]))
+            for item in items
+        )
+
+    return tuple(signature), pack(parseHTML(html))
+
+
+def _precompiledHTML(html):
+    """Returns the HtmlAst for html from the precompiled templates, or None.
+
+    A precompiled template is only used when the tags it refers to match the current tag registry,
+    so that the result is always the same as from parseHTML().
+    """
+    if (entry := __htmlPrecompiled.get(html)) is None:
+        return None
+
+    if __tags is None:
+        _buildTags()
+
+    signature, ast = entry
+
+    for tag, leaf in signature:
+        if (tag := __tags.get(tag)) is None:
+            if leaf is not None:
+                return None
+
+        elif bool(tag[0]._leafTag) is not leaf:
+            return None
+
+    def unpack(items):
+        return HtmlAst(
+            item if isinstance(item, str) else (item[0], dict(item[1]), unpack(item[2]))
+            for item in items
+        )
+
+    return unpack(ast)
 
 
 def registerTag(tagName, widgetClass, override=True):
@@ -2846,16 +3848,15 @@ def registerTag(tagName, widgetClass, override=True):
     if __tags is None:
         _buildTags()
 
+    # Any cached HtmlAst may be parsed, and any HtmlBuilder be compiled with an outdated tag registry
+    global __tagsVersion
+    __tagsVersion += 1
+    htmlAstCache.clear()
+
     if not override and tagName.lower() in __tags:
         return
 
-    attr = []
-
-    for fname in dir(widgetClass):
-        if fname.startswith("_set"):
-            attr.append(fname[4:].lower())
-
-    __tags[tagName.lower()] = (widgetClass, attr)
+    __tags[tagName.lower()] = (widgetClass, _widgetAttributes(widgetClass)[2])
 
 
 def tag(arg):
@@ -2929,31 +3930,11 @@ def _buildTags(debug=False):
             print("{}: {}".format(tag, ", ".join(sorted(__tags[tag][1]))))
 
 
-class HtmlAst(list):
-    """Abstract syntax tree element used by parseHTML()."""
-
-
 def parseHTML(html: str, debug: bool = False) -> HtmlAst:
-    """Parses the provided HTML-code according to the tags registered by html5.registerTag() or components that used the html5.tag-decorator."""
-
-    def scanWhite(l):
-        """Scan and return whitespace."""
-        ret = ""
-        while l and l[0] in " \t\r\n":
-            ret += l.pop(0)
-
-        return ret
-
-    def scanWord(l):
-        """Scan and return a word."""
-        ret = ""
-        while l and l[0] not in " \t\r\n" + "<>=\"'":
-            ret += l.pop(0)
-
-        return ret
-
-    stack = []
+    """Parses the provided HTML-code according to the tags registered by html5.registerTag() or components that used the html5.tag-decorator.
 
+    The input is consumed by a cursor in one linear pass.
+    """
     # Obtain tag descriptions, if not already done!
     global __tags
 
@@ -2961,13 +3942,14 @@ def parseHTML(html: str, debug: bool = False) -> HtmlAst:
         _buildTags(debug=debug)
 
     # Prepare stack and input
-    stack.append((None, None, HtmlAst()))
-    html = [ch for ch in html]
+    stack = [(None, None, HtmlAst())]
+    pos = 0
+    end = len(html)
 
     # Parse
-    while html:
+    while pos < end:
         tag = None
-        text = ""
+        text = []
 
         # Auto-close leaf elements, e.g. like <hr>, <br>, etc.
         while stack and stack[-1][0] and __tags[stack[-1][0]][0]._leafTag:
@@ -2978,53 +3960,61 @@ def parseHTML(html: str, debug: bool = False) -> HtmlAst:
 
         parent = stack[-1][2]
 
-        while html:
-            ch = html.pop(0)
+        while pos < end:
+            # Everything up to the next "<" is plain text
+            nxt = html.find("<", pos)
+            if nxt < 0:
+                text.append(html[pos:])
+                pos = end
+                break
 
-            # Comment
-            if html and ch == "<" and "".join(html[:3]) == "!--":
-                html = html[3:]
-                while html and "".join(html[:3]) != "-->":
-                    html.pop(0)
+            if nxt > pos:
+                text.append(html[pos:nxt])
 
-                html = html[3:]
+            pos = nxt + 1
+
+            # A "<" at the end of the input is just text
+            if pos == end:
+                text.append("<")
+
+            # Comment
+            elif html.startswith("!--", pos):
+                pos = html.find("-->", pos + 3)
+                pos = end if pos < 0 else pos + 3
 
             # Opening tag
-            elif html and ch == "<" and html[0] != "/":
-                tag = scanWord(html)
-                if tag.lower() in __tags:
+            elif html[pos] != "/":
+                word = __reHtmlWord.match(html, pos).group()
+                pos += len(word)
+
+                if word.lower() in __tags:
+                    tag = word
                     break
 
-                text += ch + tag
+                text.append("<" + word)
 
             # Closing tag
-            elif html and stack[-1][0] and ch == "<" and html[0] == "/":
-                junk = ch
-                junk += html.pop(0)
+            elif stack[-1][0]:
+                word = __reHtmlWord.match(html, pos + 1).group()
+                junk = pos + 1 + len(word)
 
-                tag = scanWord(html)
-                junk += tag
+                if stack[-1][0] == word.lower():
+                    junk = __reHtmlWhite.match(html, junk).end()
 
-                if stack[-1][0] == tag.lower():
-                    junk += scanWhite(html)
-                    if html and html[0] == ">":
-                        html.pop(0)
+                    if junk < end and html[junk] == ">":
+                        pos = junk + 1
                         stack.pop()
-                        tag = None
                         break
 
-                text += junk
-                tag = None
+                text.append(html[nxt:junk])
+                pos = junk
 
             else:
-                text += ch
+                text.append("<")
 
         # Append plain text (if not only whitespace)
-        if (
-            text
-            and (len(text) == 1 and text in ["\t "])
-            or not all([ch in " \t\r\n" for ch in text])
-        ):
+        text = "".join(text)
+        if text.strip(" \t\r\n"):
             # print("text", text)
             parent.append(domConvertEncodedText(text))
 
@@ -3038,59 +4028,530 @@ def parseHTML(html: str, debug: bool = False) -> HtmlAst:
             stack.append(elem)
             parent.append(elem)
 
-            while html:
-                scanWhite(html)
-                if not html:
+            while pos < end:
+                pos = __reHtmlWhite.match(html, pos).end()
+                if pos == end:
                     break
 
                 # End of tag >
-                if html[0] == ">":
-                    html.pop(0)
+                if html[pos] == ">":
+                    pos += 1
                     break
 
                 # Closing tag at end />
-                elif html[0] == "/":
-                    html.pop(0)
-                    scanWhite(html)
+                elif html[pos] == "/":
+                    pos = __reHtmlWhite.match(html, pos + 1).end()
 
-                    if html[0] == ">":
+                    if pos < end and html[pos] == ">":
                         stack.pop()
-                        html.pop(0)
+                        pos += 1
                         break
 
-                val = att = scanWord(html).lower()
+                att = __reHtmlWord.match(html, pos).group()
+                pos += len(att)
 
                 if not att:
-                    html.pop(0)
+                    pos += 1
                     continue
 
-                scanWhite(html)
-                if html[0] == "=":
-                    html.pop(0)
-                    scanWhite(html)
+                val = att = att.lower()
 
-                    if html[0] in "\"'":
-                        ch = html.pop(0)
+                pos = __reHtmlWhite.match(html, pos).end()
+                if pos < end and html[pos] == "=":
+                    pos = __reHtmlWhite.match(html, pos + 1).end()
 
-                        val = ""
-                        while html and html[0] != ch:
-                            val += html.pop(0)
+                    if pos < end and html[pos] in "\"'":
+                        quote = html.find(html[pos], pos + 1)
+                        if quote < 0:
+                            quote = end
 
-                        html.pop(0)
+                        val = html[pos + 1 : quote]
+                        pos = quote + 1
 
                 if att not in elem[1]:
                     elem[1][att] = val
                 else:
                     elem[1][att] += " " + val
 
-                continue
-
     while stack and stack[-1][0]:
         stack.pop()
 
     return stack[0][2]
 
 
+def _replaceVars(txt, vars):
+    """Internal function for replacing {{ values["from"][4]["string"] + 1 }}-expressions in txt.
+
+    Observable values in vars are evaluated by their current value.
+    """
+    if not htmlExpressionEvaluator or "{{" not in txt:
+        return txt
+
+    if observables := _observablesOf(txt, vars):
+        vars = _currentVars(vars, observables)
+
+    ret = []
+    pos = 0
+
+    for match in __reVarReplacer.finditer(txt):
+        ret.append(txt[pos : match.start()])
+        pos = match.end()
+
+        val = htmlExpressionEvaluator.execute(match.group(1), vars)
+        ret.append(str(val) if val is not None else "")
+
+    if not ret:
+        return txt
+
+    ret.append(txt[pos:])
+    return "".join(ret)
+
+
+def _evaluate(expr, vars):
+    """Evaluates the expression expr, like the one of flare-if or flare-for.
+
+    Observable values in vars are evaluated by their current value, as by _replaceVars().
+    """
+    if observables := _observablesOf(expr, vars, bare=True):
+        vars = _currentVars(vars, observables)
+
+    return htmlExpressionEvaluator.execute(expr, vars)
+
+
+# Variable names used by template texts and expressions, see _expressionNames(); a bounded LRU cache like HtmlAstCache
+__expressionNames = {}
+__expressionNamesMaxSize = 1024
+
+
+def _expressionNames(txt, bare=False):
+    """Returns the variable names used by the {{expressions}} in txt, or by the expression txt when bare is set."""
+    key = (txt, bare)
+
+    if (names := __expressionNames.pop(key, None)) is None:
+        names = set()
+
+        for expr in (txt,) if bare else (match.group(1) for match in __reVarReplacer.finditer(txt)):
+            try:
+                tree = ast.parse(expr.strip(), mode="eval")
+            except SyntaxError:
+                continue
+
+            names.update(node.id for node in ast.walk(tree) if isinstance(node, ast.Name))
+
+        names = tuple(names)
+
+        while len(__expressionNames) >= __expressionNamesMaxSize:
+            del __expressionNames[next(iter(__expressionNames))]
+
+    # (Re-)insert as most recently used entry
+    __expressionNames[key] = names
+    return names
+
+
+# Types of variables which are never observable, so _observablesOf() doesn't need to inspect them
+__plainTypes = {str, int, float, bool, list, tuple, dict, type(None)}
+
+
+def _observablesOf(txt, vars, bare=False):
+    """Returns the observable values, like ObservableValues of a StateHandler, used by the {{expressions}} in txt,
+    or by the expression txt when bare is set."""
+    observables = {}
+
+    for name in _expressionNames(txt, bare):
+        val = vars.get(name)
+
+        if type(val) not in __plainTypes and hasattr(val, "valueChanged"):
+            observables[name] = val
+
+    return observables
+
+
+def _currentVars(vars, observables):
+    """Returns a copy of vars, with the observable values replaced by their current value."""
+    vars = vars.copy()
+    vars.update({name: observable.value for name, observable in observables.items()})
+    return vars
+
+
+def _addObserver(widget, observer):
+    """Keeps observer, which renders observable values into widget, as long as widget exists, which is a Widget or TextNode.
+
+    The observer is detached from its observable values by observer.detach() when widget is detached,
+    and attached again by observer.attach() when widget is attached again.
+    """
+    if not widget._observers:
+        widget._observers = []
+
+    widget._observers.append(observer)
+
+
+class _ReactiveBinding(object):
+    """Text or attribute of a widget rendered from {{expressions}} which use observable values.
+
+    The binding is registered at these observable values. When one of them changes, only this text or attribute is
+    rendered again, once per frame (see flushBindings()). The binding is kept by its widget, which is referenced
+    weakly; while the widget is detached, the binding is unregistered from the observable values.
+    """
+
+    def __init__(self, widget, att, txt, vars, observables, value):
+        super().__init__()
+        self.widget = weakref.ref(widget)
+        self.att = att
+        self.txt = txt
+        self.vars = vars.copy()
+        self.observables = list(observables.values())
+        self.value = value
+        self.registered = False
+
+        for observable in self.observables:
+            # The event is delivered to the on<Key>Changed method of the receiver
+            setattr(self, observable.valueChanged._genTargetFuncName(), self.invalidate)
+
+        self.register()
+        _addObserver(widget, self)
+
+    def invalidate(self, *args, **kwargs):
+        _invalidateBinding(self)
+
+    def register(self):
+        for observable in self.observables:
+            observable.valueChanged.register(self)
+
+        self.registered = True
+
+    def unregister(self):
+        for observable in self.observables:
+            observable.valueChanged.unregister(self)
+
+        self.registered = False
+
+    def attach(self):
+        # The observable values may have changed while detached
+        if not self.registered:
+            self.register()
+            self.invalidate()
+
+    def detach(self):
+        if self.registered:
+            self.unregister()
+
+    def update(self):
+        if (widget := self.widget()) is None:
+            self.unregister()
+            return
+
+        value = _replaceVars(self.txt, self.vars)
+        if value == self.value:
+            return
+
+        if self.att is None:
+            widget._setText(value)
+        elif self.att == "class":
+            old, new = self.value.split(), value.split()
+            widget.removeClass(*[cls for cls in old if cls not in new])
+            widget.addClass(*new)
+        elif self.att == "style":
+            widget.setStyles(dict(_splitStyle(value)))
+        elif self.att.startswith("data-"):
+            widget["data"][self.att[5:]] = value
+        else:
+            _setWidgetAttribute(widget, self.att, value)
+
+        self.value = value
+
+
+def _bindReactive(widget, att, txt, vars, value):
+    """Binds the text (att is None) or attribute att of widget, rendered from txt to value,
+    to the observable values used by txt."""
+    if htmlExpressionEvaluator and (observables := _observablesOf(txt, vars)):
+        _ReactiveBinding(widget, att, txt, vars, observables, value)
+
+
+# Bindings to be updated with the next frame
+__pendingBindings = {}
+
+
+def _invalidateBinding(binding):
+    if not __pendingBindings:
+        domWriteQueue.write(flushBindings)
+
+    __pendingBindings[binding] = None
+
+
+def flushBindings():
+    """Updates the texts and attributes bound to observable values which changed since the last frame.
+
+    This is done automatically with the next animation frame by domWriteQueue.
+    """
+    while __pendingBindings:
+        bindings = list(__pendingBindings)
+        __pendingBindings.clear()
+
+        for binding in bindings:
+            binding.update()
+
+
+def _isValidBindName(name):
+    """Checks if name can be used with the [name]-attribute."""
+    return any([name.startswith(x) for x in string.ascii_letters + "_"]) and all(
+        [x in string.ascii_letters + string.digits + "_" for x in name[1:]]
+    )
+
+
+def _bindWidget(wdg, bindTo, name, debug=False):
+    """Binds wdg to bindTo under the provided name; Used for the [name]-attribute."""
+    # Allow disable binding!
+    if not bindTo:
+        logging.warning("html5: Unable to evaluate %r due unset bindTo", "[name]")
+        return
+
+    if getattr(bindTo, name, None):
+        pass  # logging.warning("html5: Cannot assign name %r because it already exists in %r", name, bindTo)
+
+    elif not _isValidBindName(name):
+        logging.warning(
+            "html5: Cannot assign name %r because it contains invalid characters",
+            name,
+        )
+
+    else:
+        setattr(bindTo, name, wdg)
+        wdg.onBind(bindTo, name)
+
+    if debug:  # fixme: remove debug flag!
+        logging.debug("html5: %r assigned to %r", name, bindTo)
+
+
+def _splitStyle(val):
+    """Splits the content of a style-attribute into its separate declarations."""
+    ret = []
+
+    for dfn in val.split(";"):
+        if ":" not in dfn:
+            continue
+
+        att, val = dfn.split(":", 1)
+        ret.append((att.strip(), val.strip()))
+
+    return ret
+
+
+def _setWidgetAttributeFallback(wdg, att, val):
+    """Stores val on wdg when att has no setter."""
+    if att in dir(wdg):
+        logging.error("html5: Attribute %r already defined for %r", att, wdg)
+    else:
+        setattr(wdg, att, val)
+
+
+def _setWidgetAttribute(wdg, att, val):
+    """Either stores widget attribute att or saves val on the widget."""
+    try:
+        wdg[att] = parseInt(val, val)
+
+    except ValueError:
+        _setWidgetAttributeFallback(wdg, att, val)
+
+    except Exception as e:
+        logging.exception(e)
+
+
+# Tags which may be rendered by innerHTML, and in which context; All of them are plain html5 widgets,
+# and the content models ensure that the browser's HTML parser constructs the same tree as fromHTML().
+__staticPhrasing = {
+    "a", "abbr", "b", "bdi", "bdo", "br", "cite", "code", "dfn", "em", "i", "ins", "mark", "q",
+    "s", "samp", "small", "span", "strong", "sub", "sup", "time", "u", "var",
+}
+__staticPhrasingOnly = {"p", "h1", "h2", "h3", "h4", "h5", "h6"}
+__staticFlow = {
+    "article", "aside", "blockquote", "dd", "div", "dl", "dt", "figcaption", "figure", "footer",
+    "header", "hr", "li", "nav", "ol", "section", "ul",
+}
+__staticListItems = {"ol": ("li",), "ul": ("li",), "dl": ("dd", "dt")}
+__staticVoid = {"br", "hr"}
+__staticAttributes = {"dir", "href", "hreflang", "id", "lang", "rel", "role", "tabindex", "target", "title"}
+
+
+def _staticHTML(ast, context):
+    """Returns the HTML code for the children ast of an element of tag context, or None.
+
+    This is only possible, when the children ast are static, so they don't contain any [name]-, @event-,
+    :attribute- or flare-attributes, {{expressions}} or custom tags, and the result is cached on ast.
+    """
+    if ast.static is not None and ast.static[0] == __tagsVersion:
+        return ast.static[1]
+
+    if __tags is None:
+        _buildTags()
+
+    def render(items, context, inLink):
+        ret = []
+
+        for item in items:
+            if isinstance(item, str):
+                if "{{" in item:
+                    return None
+
+                ret.append(_htmlEscape(domConvertEncodedText(item), quote=False))
+                continue
+
+            tag, atts, children = item
+
+            # Check the tag and its content model
+            if context in __staticPhrasing or context in __staticPhrasingOnly:
+                if tag not in __staticPhrasing or (tag == "a" and inLink):
+                    return None
+
+            elif tag in ("li", "dd", "dt"):
+                if tag not in __staticListItems.get(context, ()):
+                    return None
+
+            elif tag not in __staticPhrasing and tag not in __staticPhrasingOnly and tag not in __staticFlow:
+                return None
+
+            cls = __tags.get(tag, (None,))[0]
+            if cls is None or cls.__module__ != __name__ or cls._tagName != tag:
+                return None
+
+            html = [f"<{tag}"]
+
+            for att, val in atts.items():
+                if "{{" in val:
+                    return None
+
+                if att == "class":
+                    val = " ".join(val.split())
+
+                elif att == "style":
+                    val = "; ".join(f"{key}: {val}" for key, val in _splitStyle(val))
+
+                elif att.startswith("data-"):
+                    if not att[5:].isalnum():
+                        return None
+
+                elif att not in __staticAttributes or att not in _widgetAttributes(cls)[1]:
+                    return None
+
+                if val:
+                    html.append(f' {att}="{_htmlEscape(val)}"')
+
+            if tag in __staticVoid:
+                html.append("/>")
+            else:
+                if (content := render(children, tag, inLink or tag == "a")) is None:
+                    return None
+
+                html.append(f">{content}</{tag}>")
+
+            ret.append("".join(html))
+
+        return "".join(ret)
+
+    html = None
+    if context in __staticPhrasing or context in __staticPhrasingOnly or context in __staticFlow:
+        html = render(ast, context, context == "a")
+
+        # Only worth it when there is more than text
+        if html and "<" not in html:
+            html = None
+
+    ast.static = (__tagsVersion, html)
+    return html
+
+
+def _renderStatic(wdg, html):
+    """Renders the HTML code html into the empty wdg, and returns True when this was possible.
+
+    The widgets for the rendered DOM nodes are created when the children of wdg are accessed.
+    """
+    if not domUseInnerHTML or wdg._children or type(wdg).appendChild is not Widget.appendChild:
+        return False
+
+    domSetInnerHTML(wdg.element, html)
+    wdg._children = _LazyChildren(wdg)
+    return True
+
+
+class _LazyChildren(object):
+    """Children of a widget whose content was rendered by innerHTML.
+
+    The widgets are wrapped around the existing DOM nodes on first access of any kind; they are then stored
+    as a usual list in the widget's _children, and this object forwards any further access to that list.
+    """
+
+    __slots__ = ("widget", "children")
+
+    def __init__(self, widget):
+        super().__init__()
+        self.widget = widget
+        self.children = None
+
+    def materialize(self):
+        """Creates the widgets for the DOM nodes, and returns the list of them."""
+        if (widget := self.widget) is None:
+            return self.children
+
+        self.widget = None
+        self.children = []
+        nodes = widget.element.childNodes
+
+        for i in range(int(nodes.length)):
+            node = nodes.item(i)
+
+            child = _wrapNode(node)
+            child._parent = widget
+            child._isAttached = widget._isAttached
+            self.children.append(child)
+
+        if widget._children is self:
+            widget._children = self.children
+
+        return self.children
+
+    def __getattr__(self, name):
+        return getattr(self.materialize(), name)
+
+    def __radd__(self, other):
+        return other + self.materialize()
+
+
+def _materializeFirst(name):
+    def wrapper(self, *args):
+        return getattr(self.materialize(), name)(*args)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+# Any operation of list materializes the children first
+for _name in vars(list):
+    if _name.startswith("__") and _name not in (
+        "__new__", "__init__", "__getattribute__", "__class_getitem__", "__doc__", "__hash__", "__init_subclass__",
+        "__subclasshook__", "__reduce__", "__reduce_ex__", "__sizeof__",
+    ):
+        setattr(_LazyChildren, _name, _materializeFirst(_name))
+
+del _name
+
+
+def _materializedChildren(children):
+    """Returns children, or nothing for children which are not yet materialized (see _LazyChildren)."""
+    return () if isinstance(children, _LazyChildren) and children.widget is not None else children
+
+
+def _wrapNode(node):
+    """Creates the widget for a DOM node rendered by _renderStatic()."""
+    if node.nodeType == 3:
+        return TextNode(_wrapElem=node)
+
+    wdg = __tags[node.tagName.lower()][0](_wrapElem=node)
+
+    if node.hasChildNodes():
+        wdg._children = _LazyChildren(wdg)
+
+    return wdg
+
+
 def fromHTML(
     html: [str, HtmlAst],
     appendTo: Widget = None,
@@ -3101,6 +4562,9 @@ def fromHTML(
     """Parses the provided HTML code according to the objects defined in the html5-library.
 
     html can also be pre-compiled by `parseHTML()` so that it executes faster.
+    HTML provided as str is parsed only once and then served from `htmlAstCache`.
+    An HtmlAst rendered more than `htmlCompileThreshold` times is compiled by `compileHTML()`,
+    and the generated builder function is used from then on.
 
     Constructs all objects as DOM nodes. The first level is chained into appendTo.
     If no appendTo is provided, appendTo will be set to html5.Body().
@@ -3127,8 +4591,11 @@ def fromHTML(
     if bindTo is None:
         bindTo = appendTo
 
-    if isinstance(html, str):
-        html = parseHTML(html, debug=debug)
+    if isinstance(html, HtmlBuilder):
+        html = html.ast
+
+    elif isinstance(html, str):
+        html = htmlAstCache.get(html, debug=debug)
 
     assert isinstance(html, HtmlAst)
 
@@ -3140,31 +4607,35 @@ def fromHTML(
         )
         kwargs.update(vars)
 
-    def replaceVars(txt, vars):
-        if not htmlExpressionEvaluator:
-            return txt
+    # Use the compiled builder function, or compile HtmlAst when it is rendered repeatedly
+    if not debug:
+        builder = html.builder
 
-        # Internal function for replacing {{ values["from"][4]["string"] + 1 }}...
-        ret = ""
+        if builder is None and htmlCompileThreshold is not None:
+            html.renders += 1
 
-        while match := __reVarReplacer.search(txt):
-            ret += txt[: match.start()]
-            txt = txt[match.end() :]
+            if html.renders > htmlCompileThreshold:
+                builder = compileHTML(html)
 
-            val = htmlExpressionEvaluator.execute(match.group(1), vars)
-            ret += str(val) if val is not None else ""
+        if builder is not None:
+            # Tag registry changed since compilation, so widget classes may be outdated.
+            if builder.tagsVersion != __tagsVersion:
+                builder = compileHTML(html)
 
-        return ret + txt
+            return _appendHTML(appendTo, builder.build(appendTo, kwargs, bindTo))
 
-    def interpret(parent, items, vars):
+    def interpret(parent, items, vars, insert=True):
         ifResult = None
         ret = []
 
         for item in items:
             if isinstance(item, str):
-                txt = TextNode(replaceVars(item, vars))
+                txt = TextNode(value := _replaceVars(item, vars))
+
+                if "{{" in item:
+                    _bindReactive(txt, None, item, vars, value)
 
-                if parent:
+                if parent and insert:
                     parent.appendChild(txt)
 
                 ret.append(txt)
@@ -3185,7 +4656,7 @@ def fromHTML(
                 # print(att, val, ifResult)
 
                 haveConditional = True
-                val = replaceVars(val, vars)
+                val = _replaceVars(val, vars)
 
                 if att in ("if", "elif"):
                     if att == "elif":
@@ -3196,7 +4667,7 @@ def fromHTML(
                             item = None
                             break
 
-                    if not htmlExpressionEvaluator.execute(val, vars):
+                    if not _evaluate(val, vars):
                         item = None
                         ifResult = False
                     else:
@@ -3233,40 +4704,16 @@ def fromHTML(
                 if att.startswith("flare-"):
                     continue
 
-                val = replaceVars(val, vars)
+                source = val
+                val = _replaceVars(val, vars)
+
+                # Texts and attributes using observable values are rendered again when they change
+                if "{{" in source and att not in ("[name]", "disabled", "hidden") and att[0] not in ":@":
+                    _bindReactive(wdg, att, source, vars, val)
 
                 # The [name] attribute binds the current widget to bindTo under the provided name!
                 if att == "[name]":
-                    # Allow disable binding!
-                    if not bindTo:
-                        logging.warning(
-                            "html5: Unable to evaluate %r due unset bindTo", att
-                        )
-                        continue
-
-                    if getattr(bindTo, val, None):
-                        pass  # logging.warning("html5: Cannot assign name %r because it already exists in %r", val, bindTo)
-
-                    elif not (
-                        any([val.startswith(x) for x in string.ascii_letters + "_"])
-                        and all(
-                            [
-                                x in string.ascii_letters + string.digits + "_"
-                                for x in val[1:]
-                            ]
-                        )
-                    ):
-                        logging.warning(
-                            "html5: Cannot assign name %r because it contains invalid characters",
-                            val,
-                        )
-
-                    else:
-                        setattr(bindTo, val, wdg)
-                        wdg.onBind(bindTo, val)
-
-                    if debug:  # fixme: remove debug flag!
-                        logging.debug("html5: %r assigned to %r", val, bindTo)
+                    _bindWidget(wdg, bindTo, val, debug=debug)
 
                 # Class is handled via Widget.addClass()
                 elif att == "class":
@@ -3285,14 +4732,7 @@ def fromHTML(
 
                 # style-attributes must be split into its separate parts to be mapped into the dict.
                 elif att == "style":
-                    for dfn in val.split(";"):
-                        if ":" not in dfn:
-                            continue
-
-                        att, val = dfn.split(":", 1)
-
-                        # print(tag, "style", att.strip(), val.strip())
-                        wdg["style"][att.strip()] = val.strip()
+                    wdg.setStyles(dict(_splitStyle(val)))
 
                 # data attributes are mapped into a related dict.
                 elif att.startswith("data-"):
@@ -3328,23 +4768,15 @@ def fromHTML(
 
                 # Otherwise, either store widget attribute or save value on widget.
                 else:
-                    try:
-                        wdg[att] = parseInt(val, val)
-
-                    except ValueError:
-                        if att in dir(wdg):
-                            logging.error(
-                                "html5: Attribute %r already defined for %r", att, wdg
-                            )
-                        else:
-                            setattr(wdg, att, val)
+                    _setWidgetAttribute(wdg, att, val)
 
-                    except Exception as e:
-                        logging.exception(e)
+            # Repeat children within this element, as a keyed loop which can be rendered again?
+            if htmlExpressionEvaluator and (val := atts.get("flare-for")) and (key := atts.get("flare-key")):
+                _KeyedLoop(wdg, children, vars, val, key, bindTo).render()
 
             # Repeat children within this element?
-            if htmlExpressionEvaluator and (val := atts.get("flare-for")):
-                val = htmlExpressionEvaluator.execute(val, vars)
+            elif htmlExpressionEvaluator and (val := atts.get("flare-for")):
+                val = _evaluate(val, vars)
 
                 if val:
                     lvars = vars.copy()
@@ -3363,17 +4795,453 @@ def fromHTML(
                     else:
                         lvars["value"] = val
                         interpret(wdg, children, lvars)
-            else:
+
+            # Render static children by innerHTML
+            elif not (
+                children
+                and (static := _staticHTML(children, type(wdg)._tagName))
+                and _renderStatic(wdg, static)
+            ):
                 interpret(wdg, children, vars)
 
-            if parent and not wdg.parent():
+            if parent and insert and not wdg.parent():
                 parent.appendChild(wdg)
 
             ret.append(wdg)
 
         return ret
 
-    return interpret(appendTo, html, kwargs)
+    return _appendHTML(appendTo, interpret(appendTo, html, kwargs, insert=False))
+
+
+class _KeyedLoop(object):
+    """Children of a widget repeated by flare-for, whose rows are identified by flare-key.
+
+    ```html
+    <ul flare-for="entries" flare-key="value['key']">
+        <li>{{ value['name'] }}</li>
+    </ul>
+    ```
+
+    The loop can be rendered again. Rows whose key and value are unchanged are kept with their widgets and
+    listeners; only new or changed rows are rendered, and rows are moved and removed by Widget.patchChildren().
+    When flare-for refers to an observable value, like an ObservableValue of a StateHandler, the loop is
+    rendered again whenever the value changes. The loop is kept by its widget, which is referenced weakly;
+    while the widget is detached, the loop is unregistered from the observable value.
+    """
+
+    def __init__(self, widget, children, vars, source, key, bindTo):
+        super().__init__()
+        self.widget = weakref.ref(widget)
+        self.children = children
+        self.vars = vars.copy()
+        self.source = source
+        self.key = key
+        self.bindTo = bindTo
+        self.observables = []
+        self.registered = False
+        self.stale = False  # the observable values may have changed while detached
+        self.rows = {}
+
+        _addObserver(widget, self)
+
+    def observe(self, observables):
+        """Renders the loop again whenever one of observables fires its valueChanged event."""
+        if observables != self.observables:
+            self.unregister()
+            self.observables = observables
+
+        if not self.registered:
+            for observable in observables:
+                # The event is delivered to the on<Key>Changed method of the receiver
+                setattr(self, observable.valueChanged._genTargetFuncName(), self.render)
+                observable.valueChanged.register(self)
+
+            self.registered = True
+
+    def unregister(self):
+        for observable in self.observables:
+            observable.valueChanged.unregister(self)
+
+        self.registered = False
+
+    def attach(self):
+        if self.stale:
+            self.stale = False
+            self.render()
+
+    def detach(self):
+        if self.registered:
+            self.unregister()
+            self.stale = True
+
+    def render(self, *args, **kwargs):
+        """Renders the rows from the current value of the flare-for expression."""
+        if (widget := self.widget()) is None:
+            self.unregister()
+            return
+
+        observables = list(_observablesOf(self.source, self.vars, bare=True).values())
+        val = _evaluate(self.source, self.vars)
+
+        # The expression may also result in an observable value
+        if hasattr(val, "valueChanged"):
+            observables.append(val)
+            val = val.value
+
+        self.observe(observables)
+
+        if not val:
+            items = []
+        elif isinstance(val, dict):
+            items = [{"key": k, "value": v} for k, v in val.items()]
+        elif isinstance(val, (list, tuple)):
+            items = [{"value": v} for v in val]
+        else:
+            items = [{"value": val}]
+
+        rows = {}
+        children = []
+
+        for item in items:
+            lvars = self.vars.copy()
+            lvars.update(item)
+
+            key = _evaluate(self.key, lvars)
+
+            if (row := self.rows.pop(key, None)) is None or row[0] != item:
+                row = (item, fromHTML(self.children, bindTo=self.bindTo, **lvars))
+
+            rows[key] = row
+            children.extend(row[1])
+
+        self.rows = rows
+        widget.patchChildren(children)
+
+
+def _appendHTML(appendTo, widgets):
+    """Appends the top-level widgets constructed by fromHTML() to appendTo at once, and returns them."""
+    if appendTo:
+        appendTo.appendChild([wdg for wdg in widgets if wdg._parent is None])
+
+    return widgets
+
+
+########################################################################################################################
+# HTML compiler
+########################################################################################################################
+
+# Number of renderings of the same HtmlAst by fromHTML(), after which it is compiled by compileHTML().
+# Automatic compilation is disabled by None.
+htmlCompileThreshold = None
+
+
+class HtmlBuilder(object):
+    """Python function generated from an HtmlAst by compileHTML().
+
+    Calling the builder has the same effect as rendering its HtmlAst with fromHTML(), but the widget classes,
+    attribute setters, bindings and event hookups are hard-wired into the generated code instead of being
+    looked up and dispatched for every element on every rendering.
+    """
+
+    def __init__(self, ast: HtmlAst, source: str, build: Callable, tagsVersion: int):
+        super().__init__()
+        self.ast = ast
+        self.source = source
+        self.build = build
+        self.tagsVersion = tagsVersion
+
+    def __call__(self, appendTo: Widget = None, bindTo: Widget = None, **kwargs) -> [Widget]:
+        return fromHTML(self, appendTo, bindTo, **kwargs)
+
+
+def _htmlEvaluator():
+    return htmlExpressionEvaluator
+
+
+def compileHTML(html: [str, HtmlAst]) -> HtmlBuilder:
+    """Compiles HTML code or an HtmlAst into a Python builder function.
+
+    The returned HtmlBuilder is also stored on the HtmlAst, so that fromHTML() uses it for any further rendering.
+
+    ```python
+    rowBuilder = html5.compileHTML('<tr><td class="name">{{name}}</td></tr>')
+
+    for row in rows:
+        rowBuilder(table.body, name=row["name"])
+    ```
+    """
+    if isinstance(html, str):
+        html = htmlAstCache.get(html)
+
+    assert isinstance(html, HtmlAst)
+
+    # Obtain tag descriptions, if not already done!
+    global __tags
+
+    if __tags is None:
+        _buildTags()
+
+    namespace = {
+        "logging": logging,
+        "Table": Table,
+        "TextNode": TextNode,
+        "_bindReactive": _bindReactive,
+        "_bindWidget": _bindWidget,
+        "_htmlEvaluator": _htmlEvaluator,
+        "_KeyedLoop": _KeyedLoop,
+        "_renderStatic": _renderStatic,
+        "_replaceVars": _replaceVars,
+        "_evaluate": _evaluate,
+        "_setWidgetAttribute": _setWidgetAttribute,
+        "_setWidgetAttributeFallback": _setWidgetAttributeFallback,
+        "_splitStyle": _splitStyle,
+    }
+    classes = {}
+    blocks = []
+
+    def value(val):
+        """Returns the Python expression for an attribute value or text."""
+        if "{{" in val:
+            return f"_replaceVars({val!r}, vars)"
+
+        return repr(val)
+
+    def widgetClass(tag):
+        cls = __tags[tag][0]
+
+        if cls not in classes:
+            classes[cls] = f"_c{len(classes)}_{cls.__name__}"
+            namespace[classes[cls]] = cls
+
+        return cls, classes[cls]
+
+    def block(items):
+        """Generates a function constructing the widgets of items, and returns its name.
+
+        The top-level block (_b0) leaves the insertion of its widgets to fromHTML().
+        """
+        name = f"_b{len(blocks)}"
+        insert = bool(blocks)
+        lines = []
+        blocks.append(lines)
+
+        lines.append(f"def {name}(parent, vars, bindTo):")
+
+        atts = [att for item in items if not isinstance(item, str) for att in item[1]]
+        conditional = any(att in atts for att in ("flare-if", "flare-elif", "flare-else"))
+
+        if conditional or "flare-for" in atts:
+            lines.append("    ev = _htmlEvaluator()")
+
+        if conditional:
+            lines.append("    ifResult = None")
+
+        lines.append("    ret = []")
+
+        for item in items:
+            if isinstance(item, str):
+                if "{{" in item:
+                    lines.append(f"    v = {value(item)}")
+                    lines.append("    w = TextNode(v)")
+                    lines.append(f"    _bindReactive(w, None, {item!r}, vars, v)")
+                else:
+                    lines.append(f"    w = TextNode({value(item)})")
+
+                if insert:
+                    lines.append("    if parent:")
+                    lines.append("        parent.appendChild(w)")
+
+                lines.append("    ret.append(w)")
+            else:
+                lines.extend(element(*item, conditional, insert))
+
+        lines.append("    return ret")
+        return name
+
+    def element(tag, atts, children, conditional, insert):
+        lines = []
+        indent = "    "
+
+        # Conditionals
+        for att in ("if", "elif", "else"):
+            if (cond := atts.get(f"flare-{att}")) is None:
+                continue
+
+            lines.append("    ok = True")
+            lines.append("    if ev:")
+
+            if att == "if":
+                lines.append(f"        ok = ifResult = bool(_evaluate({value(cond)}, vars))")
+            else:
+                lines.append(f"        assert ifResult is not None, 'flare-{att} without preceding flare-if/flare-elif'")
+
+                if att == "elif":
+                    lines.append("        if ifResult:")
+                    lines.append("            ok = False")
+                    lines.append("        else:")
+                    lines.append(f"            ok = ifResult = bool(_evaluate({value(cond)}, vars))")
+                else:
+                    lines.append("        ok = not ifResult")
+                    lines.append("        ifResult = None")
+
+            lines.append("    else:")
+            lines.append("        ifResult = None")
+            lines.append("    if ok:")
+            indent = "        "
+            break
+        else:
+            if conditional:
+                lines.append("    ifResult = None")
+
+        body = []
+        cls, clsName = widgetClass(tag)
+
+        # Special handling for tables: A "thead" and "tbody" are already part of table!
+        if tag in ["thead", "tbody"]:
+            body.append("if isinstance(parent, Table):")
+            body.append(f"    w = parent.{tag[1:]}")
+            body.append("else:")
+            body.append(f"    w = {clsName}()")
+        else:
+            body.append(f"w = {clsName}()")
+
+        for att, val in atts.items():
+            # Ignore any flare-prefixed attributes here
+            if att.startswith("flare-"):
+                continue
+
+            isStatic = "{{" not in val
+            expr = value(val)
+
+            # Texts and attributes using observable values are rendered again when they change
+            if not isStatic and att not in ("[name]", "disabled", "hidden") and att[0] not in ":@":
+                body.append(f"v = {expr}")
+                body.append(f"_bindReactive(w, {att!r}, {val!r}, vars, v)")
+                expr = "v"
+
+            if att == "[name]":
+                if isStatic and _isValidBindName(val):
+                    body.append("if not bindTo:")
+                    body.append("    logging.warning('html5: Unable to evaluate %r due unset bindTo', '[name]')")
+                    body.append(f"elif not getattr(bindTo, {val!r}, None):")
+                    body.append(f"    setattr(bindTo, {val!r}, w)")
+                    body.append(f"    w.onBind(bindTo, {val!r})")
+                else:
+                    body.append(f"_bindWidget(w, bindTo, {value(val)})")
+
+            elif att == "class":
+                if not isStatic:
+                    body.append(f"w.addClass(*{expr}.split())")
+                elif val.split():
+                    body.append(f"w.addClass({', '.join(repr(c) for c in val.split())})")
+
+            elif att in ("disabled", "hidden"):
+                call = "disable" if att == "disabled" else "hide"
+
+                if not isStatic:
+                    body.append(f"if {value(val)} == {att!r}:")
+                    body.append(f"    w.{call}()")
+                elif val == att:
+                    body.append(f"w.{call}()")
+
+            elif att == "style":
+                if not isStatic:
+                    body.append(f"w.setStyles(dict(_splitStyle({expr})))")
+                elif style := _splitStyle(val):
+                    body.append(f"w.setStyles({dict(style)!r})")
+
+            elif att.startswith("data-"):
+                body.append(f"w['data'][{att[5:]!r}] = {expr}")
+
+            elif att.startswith(":") or att.startswith("@"):
+                body.append("if bindTo:")
+                body.append("    try:")
+
+                if att.startswith(":"):
+                    body.append(f"        setattr(w, {att[1:]!r}, getattr(bindTo, {value(val)}))")
+                    body.append("    except Exception as e:")
+                    body.append("        logging.exception(e)")
+                else:
+                    body.append(f"        callback = getattr(bindTo, {value(val)})")
+                    body.append("        assert callable(callback), f'{callback} is not callable'")
+                    body.append("    except Exception as e:")
+                    body.append("        logging.exception(e)")
+                    body.append("    else:")
+                    body.append(f"        w.addEventListener({att[1:]!r}, callback)")
+
+                body.append("else:")
+                body.append(f"    logging.error(\"html5: bindTo is unset, can't use %r here\", {att!r})")
+
+            else:
+                setter = "_set" + att[0].upper() + att[1:]
+
+                # Hard-wire the setter, unless item access is customized by the widget class
+                if (
+                    isStatic
+                    and setter.isidentifier()
+                    and att in _widgetAttributes(cls)[1]
+                    and cls.__setitem__ is Widget.__setitem__
+                ):
+                    body.append("try:")
+                    body.append(f"    w.{setter}({parseInt(val, val)!r})")
+                    body.append("except ValueError:")
+                    body.append(f"    _setWidgetAttributeFallback(w, {att!r}, {val!r})")
+                    body.append("except Exception as e:")
+                    body.append("    logging.exception(e)")
+                else:
+                    body.append(f"_setWidgetAttribute(w, {att!r}, {expr})")
+
+        # Children, optionally repeated by flare-for
+        if children:
+            childBlock = block(children)
+
+            if (loop := atts.get("flare-for")) and (key := atts.get("flare-key")):
+                namespace[astName := "_a" + childBlock[2:]] = children
+                body.append("if ev:")
+                body.append(f"    _KeyedLoop(w, {astName}, vars, {loop!r}, {key!r}, bindTo).render()")
+                body.append("else:")
+                body.append(f"    {childBlock}(w, vars, bindTo)")
+            elif loop:
+                body.append("if ev:")
+                body.append(f"    val = _evaluate({loop!r}, vars)")
+                body.append("    if val:")
+                body.append("        lvars = vars.copy()")
+                body.append("        if isinstance(val, dict):")
+                body.append("            for k, v in val.items():")
+                body.append("                lvars['key'] = k")
+                body.append("                lvars['value'] = v")
+                body.append(f"                {childBlock}(w, lvars, bindTo)")
+                body.append("        elif isinstance(val, list):")
+                body.append("            for v in val:")
+                body.append("                lvars['value'] = v")
+                body.append(f"                {childBlock}(w, lvars, bindTo)")
+                body.append("        else:")
+                body.append("            lvars['value'] = val")
+                body.append(f"            {childBlock}(w, lvars, bindTo)")
+                body.append("else:")
+                body.append(f"    {childBlock}(w, vars, bindTo)")
+            elif static := _staticHTML(children, cls._tagName):
+                body.append(f"if not _renderStatic(w, {static!r}):")
+                body.append(f"    {childBlock}(w, vars, bindTo)")
+            else:
+                body.append(f"{childBlock}(w, vars, bindTo)")
+
+        if insert:
+            body.append("if parent and not w.parent():")
+            body.append("    parent.appendChild(w)")
+
+        body.append("ret.append(w)")
+
+        return lines + [indent + line for line in body]
+
+    block(html)
+
+    source = "\n\n".join("\n".join(lines) for lines in blocks)
+    exec(compile(source, "<html5.compileHTML>", "exec"), namespace)
+
+    html.builder = HtmlBuilder(html, source, namespace["_b0"], __tagsVersion)
+    return html.builder
 
 
 if __name__ == "__main__":
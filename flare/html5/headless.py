@@ -0,0 +1,903 @@
+"""Headless DOM backend for running html5 in plain CPython.
+
+This is used by html5 in emulation mode, when it doesn't run inside the browser. It implements the subset of the
+DOM which is used by flare: Nodes and elements with attributes, reflected properties, classList, style and
+dataset, innerHTML, DocumentFragments and events with capture and bubble phases.
+
+Every DOM operation is counted in `Document.ops`, so that rendering performance and DOM mutation budgets can be
+measured and tested without a browser:
+
+```python
+from flare import html5
+
+document = html5.core.document
+document.resetOps()
+
+html5.Body().appendChild(html5.Div("<span>Hello</span>"))
+print(document.ops["appendChild"], document.ops["live"])
+```
+
+The operation counters are named by the DOM method or property used, like "createElement", "appendChild",
+"setAttribute", "classList.add", "style.setProperty" or "innerHTML". Writes to any other property are counted as
+"property". The additional counter "live" counts the mutations of nodes which are part of the document.
+"""
+
+import re
+from collections import Counter
+from html import escape
+from html.parser import HTMLParser
+
+HTML_NAMESPACE = "http://www.w3.org/1999/xhtml"
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+# Elements without contents and end tag
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+
+# Properties reflecting a string attribute, and their attribute names
+REFLECTED_PROPERTIES = {
+    name: name.lower()
+    for name in (
+        "accept", "accessKey", "action", "alt", "autocomplete", "className", "coords", "dir", "download",
+        "draggable", "enctype", "formaction", "formenctype", "formmethod", "formtarget", "height", "href",
+        "hreflang", "id", "lang", "max", "maxLength", "media", "method", "min", "name", "pattern", "placeholder",
+        "preload", "rel", "shape", "size", "spellcheck", "src", "step", "target", "title", "translate", "type",
+        "usemap", "width", "wrap", "cols", "rows",
+    )
+}
+REFLECTED_PROPERTIES.update({"className": "class", "htmlFor": "for", "tabIndex": "tabindex"})
+
+# Properties reflecting a boolean attribute, and their attribute names
+BOOLEAN_PROPERTIES = {
+    name: name.lower()
+    for name in (
+        "autofocus", "autoplay", "controls", "disabled", "formNoValidate", "hidden", "loop", "multiple", "muted",
+        "noValidate", "open", "readOnly", "required",
+    )
+}
+
+# Default values of further properties
+DEFAULT_PROPERTIES = {
+    "checked": False,
+    "indeterminate": False,
+    "selected": False,
+    "selectedIndex": -1,
+    "value": "",
+    "scrollTop": 0,
+    "scrollLeft": 0,
+    "offsetTop": 0,
+    "offsetLeft": 0,
+    "offsetWidth": 0,
+    "offsetHeight": 0,
+    "clientWidth": 0,
+    "clientHeight": 0,
+}
+
+
+class NodeList(list):
+    """List of nodes, accessible like a DOM NodeList."""
+
+    @property
+    def length(self):
+        return len(self)
+
+    def item(self, index):
+        if 0 <= index < len(self):
+            return self[index]
+
+        return None
+
+
+class Event(object):
+    """DOM event, which can be dispatched by Node.dispatchEvent().
+
+    Any further keyword arguments, like clientX or key, are stored on the event.
+    """
+
+    CAPTURING_PHASE = 1
+    AT_TARGET = 2
+    BUBBLING_PHASE = 3
+
+    def __init__(self, type, bubbles=True, cancelable=True, **kwargs):
+        super().__init__()
+        self.type = type
+        self.bubbles = bubbles
+        self.cancelable = cancelable
+        self.target = None
+        self.currentTarget = None
+        self.eventPhase = 0
+        self.cancelBubble = False
+        self.defaultPrevented = False
+        self._stopImmediate = False
+        self.__dict__.update(kwargs)
+
+    def stopPropagation(self):
+        self.cancelBubble = True
+
+    def stopImmediatePropagation(self):
+        self.cancelBubble = self._stopImmediate = True
+
+    def preventDefault(self):
+        if self.cancelable:
+            self.defaultPrevented = True
+
+
+class Node(object):
+    """Base class of all DOM nodes."""
+
+    ELEMENT_NODE = 1
+    TEXT_NODE = 3
+    COMMENT_NODE = 8
+    DOCUMENT_NODE = 9
+    DOCUMENT_FRAGMENT_NODE = 11
+
+    nodeType = None
+    nodeName = None
+
+    def __init__(self, document):
+        super().__init__()
+        self._document = document
+        self.parentNode = None
+        self.childNodes = NodeList()
+        self._listeners = None
+
+    def _count(self, op, mutation=True):
+        ops = self._document.ops
+        ops[op] += 1
+
+        if mutation and self.isConnected:
+            ops["live"] += 1
+
+    @property
+    def ownerDocument(self):
+        return self._document
+
+    @property
+    def isConnected(self):
+        node = self
+        while node.parentNode is not None:
+            node = node.parentNode
+
+        return node is self._document
+
+    @property
+    def firstChild(self):
+        return self.childNodes[0] if self.childNodes else None
+
+    @property
+    def lastChild(self):
+        return self.childNodes[-1] if self.childNodes else None
+
+    @property
+    def nextSibling(self):
+        if self.parentNode is None:
+            return None
+
+        siblings = self.parentNode.childNodes
+        index = siblings.index(self) + 1
+        return siblings[index] if index < len(siblings) else None
+
+    @property
+    def previousSibling(self):
+        if self.parentNode is None:
+            return None
+
+        siblings = self.parentNode.childNodes
+        index = siblings.index(self)
+        return siblings[index - 1] if index else None
+
+    @property
+    def parentElement(self):
+        return self.parentNode if isinstance(self.parentNode, Element) else None
+
+    @property
+    def textContent(self):
+        return "".join(child.textContent for child in self.childNodes if child.nodeType != Node.COMMENT_NODE)
+
+    @textContent.setter
+    def textContent(self, text):
+        self._count("textContent")
+        self._replaceChildren([Text(self._document, text)] if text else [])
+
+    def hasChildNodes(self):
+        return bool(self.childNodes)
+
+    def contains(self, other):
+        while other is not None:
+            if other is self:
+                return True
+
+            other = other.parentNode
+
+        return False
+
+    # Tree mutation; The underscored methods don't count operations
+
+    def _insert(self, child, reference):
+        if reference is not None and reference.parentNode is not self:
+            raise ValueError("The node before which the new node is to be inserted is not a child of this node.")
+
+        if child.nodeType == Node.DOCUMENT_FRAGMENT_NODE:
+            nodes = list(child.childNodes)
+            child.childNodes.clear()
+        else:
+            if child.contains(self):
+                raise ValueError("The new child element contains the parent.")
+
+            if child.parentNode is not None:
+                child.parentNode._remove(child)
+
+            nodes = [child]
+
+        index = len(self.childNodes) if reference is None else self.childNodes.index(reference)
+        self.childNodes[index:index] = nodes
+
+        for node in nodes:
+            node.parentNode = self
+
+        return child
+
+    def _remove(self, child):
+        if child.parentNode is not self:
+            raise ValueError("The node to be removed is not a child of this node.")
+
+        self.childNodes.remove(child)
+        child.parentNode = None
+        return child
+
+    def _replaceChildren(self, nodes):
+        for child in self.childNodes:
+            child.parentNode = None
+
+        self.childNodes.clear()
+
+        for node in nodes:
+            self._insert(node, None)
+
+    def appendChild(self, child):
+        self._count("appendChild")
+        return self._insert(child, None)
+
+    def insertBefore(self, child, reference):
+        self._count("insertBefore")
+        return self._insert(child, reference)
+
+    def removeChild(self, child):
+        self._count("removeChild")
+        return self._remove(child)
+
+    def replaceChild(self, child, old):
+        self._count("replaceChild")
+        self._insert(child, old)
+        return self._remove(old)
+
+    def cloneNode(self, deep=False):
+        clone = self._clone()
+
+        if deep:
+            for child in self.childNodes:
+                clone._insert(child.cloneNode(True), None)
+
+        return clone
+
+    # Events
+
+    def addEventListener(self, type, listener, options=False):
+        self._count("addEventListener", False)
+        capture = bool(options.get("capture") if isinstance(options, dict) else options)
+
+        if self._listeners is None:
+            self._listeners = []
+
+        if (type, listener, capture) not in self._listeners:
+            self._listeners.append((type, listener, capture))
+
+    def removeEventListener(self, type, listener, options=False):
+        self._count("removeEventListener", False)
+        capture = bool(options.get("capture") if isinstance(options, dict) else options)
+
+        if self._listeners and (type, listener, capture) in self._listeners:
+            self._listeners.remove((type, listener, capture))
+
+    def dispatchEvent(self, event):
+        """Dispatches event to this node, through the capture and bubble phases.
+
+        Returns False when the default action was prevented.
+        """
+        self._count("dispatchEvent", False)
+        event.target = self
+
+        path = []
+        node = self.parentNode
+        while node is not None:
+            path.append(node)
+            node = node.parentNode
+
+        def invoke(node, phase):
+            if event.cancelBubble or not node._listeners:
+                return
+
+            event.currentTarget = node
+            event.eventPhase = phase
+
+            for type, listener, capture in list(node._listeners):
+                if type != event.type:
+                    continue
+
+                if phase == Event.CAPTURING_PHASE and not capture or phase == Event.BUBBLING_PHASE and capture:
+                    continue
+
+                listener(event)
+
+                if event._stopImmediate:
+                    break
+
+        for node in reversed(path):
+            invoke(node, Event.CAPTURING_PHASE)
+
+        invoke(self, Event.AT_TARGET)
+
+        if event.bubbles:
+            for node in path:
+                invoke(node, Event.BUBBLING_PHASE)
+
+        event.currentTarget = None
+        event.eventPhase = 0
+        return not event.defaultPrevented
+
+
+class Text(Node):
+    """Text node."""
+
+    nodeType = Node.TEXT_NODE
+    nodeName = "#text"
+
+    def __init__(self, document, data=""):
+        super().__init__(document)
+        self._data = str(data)
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._count("data")
+        self._data = str(data)
+
+    nodeValue = data
+
+    @property
+    def textContent(self):
+        return self._data
+
+    @textContent.setter
+    def textContent(self, data):
+        self.data = data
+
+    @property
+    def length(self):
+        return len(self._data)
+
+    def _clone(self):
+        return Text(self._document, self._data)
+
+    def _serialize(self, raw=False):
+        return self._data if raw else escape(self._data, quote=False)
+
+
+class Comment(Node):
+    """Comment node, which is created by innerHTML."""
+
+    nodeType = Node.COMMENT_NODE
+    nodeName = "#comment"
+
+    def __init__(self, document, data=""):
+        super().__init__(document)
+        self.data = data
+
+    @property
+    def textContent(self):
+        return self.data
+
+    def _clone(self):
+        return Comment(self._document, self.data)
+
+    def _serialize(self, raw=False):
+        return f"<!--{self.data}-->"
+
+
+class DocumentFragment(Node):
+    nodeType = Node.DOCUMENT_FRAGMENT_NODE
+    nodeName = "#document-fragment"
+
+    def _clone(self):
+        return DocumentFragment(self._document)
+
+
+class DOMTokenList(object):
+    """The classList of an element, which is stored in its class attribute."""
+
+    def __init__(self, element):
+        super().__init__()
+        self._element = element
+
+    def _tokens(self):
+        return self._element.attributes.get("class", "").split()
+
+    def _write(self, tokens):
+        self._element.attributes["class"] = " ".join(tokens)
+
+    @property
+    def length(self):
+        return len(self._tokens())
+
+    @property
+    def value(self):
+        return self._element.attributes.get("class", "")
+
+    def item(self, index):
+        tokens = self._tokens()
+        return tokens[index] if 0 <= index < len(tokens) else None
+
+    def contains(self, token):
+        return token in self._tokens()
+
+    def add(self, *tokens):
+        self._element._count("classList.add")
+        current = self._tokens()
+        self._write(current + [token for token in dict.fromkeys(tokens) if token not in current])
+
+    def remove(self, *tokens):
+        self._element._count("classList.remove")
+        self._write([token for token in self._tokens() if token not in tokens])
+
+    def replace(self, old, new):
+        self._element._count("classList.replace")
+        current = self._tokens()
+
+        if old not in current:
+            return False
+
+        self._write(list(dict.fromkeys(new if token == old else token for token in current)))
+        return True
+
+    def toggle(self, token, force=None):
+        self._element._count("classList.toggle")
+        current = self._tokens()
+
+        if token in current and force is not True:
+            self._write([t for t in current if t != token])
+            return False
+
+        if token not in current and force is not False:
+            self._write(current + [token])
+
+        return token in self._tokens()
+
+    def __iter__(self):
+        return iter(self._tokens())
+
+    def __len__(self):
+        return len(self._tokens())
+
+
+class CSSStyleDeclaration(object):
+    """The inline style of an element."""
+
+    __reDeclaration = re.compile(r"\s*([^:;\s]+)\s*:\s*([^;]*?)\s*(?:;|$)")
+
+    def __init__(self, element):
+        super().__init__()
+        self._element = element
+        self._properties = {}
+
+    def _parse(self, css):
+        self._properties = {
+            name.lower(): value for name, value in self.__reDeclaration.findall(css or "") if value
+        }
+
+    def _serialize(self):
+        return " ".join(f"{name}: {value};" for name, value in self._properties.items())
+
+    def _update(self):
+        """Writes the properties into the style attribute."""
+        if self._properties:
+            self._element.attributes["style"] = self._serialize()
+        else:
+            self._element.attributes.pop("style", None)
+
+    def getPropertyValue(self, name):
+        return self._properties.get(name, "")
+
+    def setProperty(self, name, value, priority=""):
+        self._element._count("style.setProperty")
+
+        if value is None or value == "":
+            self._properties.pop(name, None)
+        else:
+            self._properties[name] = f"{value} !important" if priority == "important" else str(value)
+
+        self._update()
+
+    def removeProperty(self, name):
+        self._element._count("style.removeProperty")
+        value = self._properties.pop(name, "")
+        self._update()
+        return value
+
+    @property
+    def cssText(self):
+        return self._serialize()
+
+    @cssText.setter
+    def cssText(self, css):
+        self._element._count("style.cssText")
+        self._parse(css)
+        self._update()
+
+    @property
+    def length(self):
+        return len(self._properties)
+
+    def item(self, index):
+        names = list(self._properties)
+        return names[index] if 0 <= index < len(names) else ""
+
+    def object_values(self):
+        """Returns the property names, like the values of a CSSStyleDeclaration proxied by Pyodide."""
+        return list(self._properties)
+
+    def __iter__(self):
+        return iter(list(self._properties))
+
+
+class DOMStringMap(object):
+    """The dataset of an element, which is stored in its data-* attributes."""
+
+    def __init__(self, element):
+        super().__init__()
+        object.__setattr__(self, "_element", element)
+
+    @staticmethod
+    def _attribute(name):
+        return "data-" + re.sub(r"[A-Z]", lambda match: "-" + match.group(0).lower(), name)
+
+    def __getattr__(self, name):
+        try:
+            return self._element.attributes[self._attribute(name)]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self._element.setAttribute(self._attribute(name), value)
+
+    def __delattr__(self, name):
+        self._element.removeAttribute(self._attribute(name))
+
+    def __dir__(self):
+        return [
+            re.sub(r"-([a-z])", lambda match: match.group(1).upper(), name[5:])
+            for name in self._element.attributes
+            if name.startswith("data-")
+        ]
+
+
+class Attr(object):
+    """Attribute created by Document.createAttribute()."""
+
+    def __init__(self, name, namespaceURI=None):
+        super().__init__()
+        self.name = name
+        self.namespaceURI = namespaceURI
+        self.value = ""
+
+
+class Element(Node):
+    """Element node.
+
+    Properties which reflect attributes are read from and written to the attributes. Any other property can be
+    set as an expando, and the common form and layout properties have default values.
+    """
+
+    nodeType = Node.ELEMENT_NODE
+
+    # Attributes of the Python object, which are no DOM properties
+    _internal = {
+        "_document", "parentNode", "childNodes", "_listeners", "attributes", "tagName", "localName",
+        "namespaceURI", "_classList", "_style", "_dataset",
+    }
+
+    def __init__(self, document, tagName, namespaceURI=HTML_NAMESPACE):
+        super().__init__(document)
+        self.localName = tagName if namespaceURI != HTML_NAMESPACE else tagName.lower()
+        self.tagName = tagName.upper() if namespaceURI == HTML_NAMESPACE else tagName
+        self.namespaceURI = namespaceURI
+        self.attributes = {}
+        self._classList = None
+        self._style = None
+        self._dataset = None
+
+    @property
+    def nodeName(self):
+        return self.tagName
+
+    def __setattr__(self, name, value):
+        if name in Element._internal:
+            object.__setattr__(self, name, value)
+
+        elif attribute := REFLECTED_PROPERTIES.get(name):
+            self._count("property")
+            self._setAttribute(attribute, value)
+
+        elif attribute := BOOLEAN_PROPERTIES.get(name):
+            self._count("property")
+
+            if value:
+                self._setAttribute(attribute, "")
+            else:
+                self.attributes.pop(attribute, None)
+
+        elif isinstance(getattr(type(self), name, None), property):
+            object.__setattr__(self, name, value)
+
+        else:
+            self._count("property")
+            object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        if attribute := REFLECTED_PROPERTIES.get(name):
+            return self.attributes.get(attribute, "")
+
+        if attribute := BOOLEAN_PROPERTIES.get(name):
+            return attribute in self.attributes
+
+        if name in DEFAULT_PROPERTIES:
+            return DEFAULT_PROPERTIES[name]
+
+        raise AttributeError(f"{self.tagName} has no property {name!r}")
+
+    # Attributes
+
+    def _setAttribute(self, name, value):
+        name = name.lower() if self.namespaceURI == HTML_NAMESPACE else name
+        value = str(value)
+
+        if name == "style":
+            self.style._parse(value)
+
+        self.attributes[name] = value
+
+    def getAttribute(self, name):
+        return self.attributes.get(name)
+
+    def setAttribute(self, name, value):
+        self._count("setAttribute")
+        self._setAttribute(name, value)
+
+    def removeAttribute(self, name):
+        self._count("removeAttribute")
+        self.attributes.pop(name, None)
+
+        if name == "style" and self._style is not None:
+            self._style._properties.clear()
+
+    def hasAttribute(self, name):
+        return name in self.attributes
+
+    def getAttributeNames(self):
+        return list(self.attributes)
+
+    @property
+    def classList(self):
+        if self._classList is None:
+            self._classList = DOMTokenList(self)
+
+        return self._classList
+
+    @property
+    def style(self):
+        if self._style is None:
+            self._style = CSSStyleDeclaration(self)
+            self._style._parse(self.attributes.get("style"))
+
+        return self._style
+
+    @property
+    def dataset(self):
+        if self._dataset is None:
+            self._dataset = DOMStringMap(self)
+
+        return self._dataset
+
+    # Tree
+
+    @property
+    def children(self):
+        return NodeList(child for child in self.childNodes if child.nodeType == Node.ELEMENT_NODE)
+
+    @property
+    def firstElementChild(self):
+        return next((child for child in self.childNodes if child.nodeType == Node.ELEMENT_NODE), None)
+
+    @property
+    def options(self):
+        return self.getElementsByTagName("option")
+
+    def getElementsByTagName(self, tagName):
+        tagName = tagName.lower()
+        found = NodeList()
+
+        def walk(node):
+            for child in node.childNodes:
+                if child.nodeType == Node.ELEMENT_NODE:
+                    if tagName == "*" or child.localName.lower() == tagName:
+                        found.append(child)
+
+                    walk(child)
+
+        walk(self)
+        return found
+
+    @property
+    def innerHTML(self):
+        return "".join(child._serialize(self.localName in ("script", "style")) for child in self.childNodes)
+
+    @innerHTML.setter
+    def innerHTML(self, html):
+        self._count("innerHTML")
+        self._replaceChildren(_HTMLBuilder(self._document, self.namespaceURI).build(html))
+
+    @property
+    def outerHTML(self):
+        return self._serialize()
+
+    def _serialize(self, raw=False):
+        atts = "".join(f' {name}="{escape(value)}"' for name, value in self.attributes.items())
+
+        if self.localName in VOID_ELEMENTS:
+            return f"<{self.localName}{atts}>"
+
+        return f"<{self.localName}{atts}>{self.innerHTML}</{self.localName}>"
+
+    def _clone(self):
+        clone = Element(self._document, self.localName, self.namespaceURI)
+
+        for name, value in self.attributes.items():
+            clone._setAttribute(name, value)
+
+        return clone
+
+    # Interaction
+
+    def focus(self):
+        self._count("focus", False)
+        self._document.activeElement = self
+
+    def blur(self):
+        self._count("blur", False)
+
+        if self._document.activeElement is self:
+            self._document.activeElement = self._document.body
+
+    def click(self):
+        self.dispatchEvent(Event("click"))
+
+    def scrollIntoView(self, *args):
+        self._count("scrollIntoView", False)
+
+    def getBoundingClientRect(self):
+        return DOMRect()
+
+
+class DOMRect(object):
+    x = y = top = left = right = bottom = width = height = 0
+
+
+class Document(Node):
+    """The document, with an html element containing head and body."""
+
+    nodeType = Node.DOCUMENT_NODE
+    nodeName = "#document"
+
+    def __init__(self):
+        super().__init__(self)
+        self.ops = Counter()
+
+        self.documentElement = self.createElement("html")
+        self.head = self.createElement("head")
+        self.body = self.createElement("body")
+
+        self.documentElement._insert(self.head, None)
+        self.documentElement._insert(self.body, None)
+        self._insert(self.documentElement, None)
+
+        self.activeElement = self.body
+        self.resetOps()
+
+    @property
+    def ownerDocument(self):
+        return None
+
+    def resetOps(self):
+        """Resets the operation counters."""
+        self.ops.clear()
+
+    def createElement(self, tagName):
+        self.ops["createElement"] += 1
+        return Element(self, tagName)
+
+    def createElementNS(self, namespaceURI, tagName):
+        self.ops["createElementNS"] += 1
+        return Element(self, tagName, namespaceURI)
+
+    def createTextNode(self, data):
+        self.ops["createTextNode"] += 1
+        return Text(self, data)
+
+    def createDocumentFragment(self):
+        self.ops["createDocumentFragment"] += 1
+        return DocumentFragment(self)
+
+    def createAttribute(self, name, namespaceURI=None):
+        return Attr(name, namespaceURI)
+
+    def importNode(self, node, deep=False):
+        return node.cloneNode(deep)
+
+    def getElementById(self, id):
+        return next((element for element in self.getElementsByTagName("*") if element.attributes.get("id") == id), None)
+
+    def getElementsByTagName(self, tagName):
+        return Element.getElementsByTagName(self, tagName)
+
+    def elementFromPoint(self, x, y):
+        return None
+
+
+class _HTMLBuilder(HTMLParser):
+    """Builds the nodes of an innerHTML assignment, without counting them as operations."""
+
+    def __init__(self, document, namespaceURI):
+        super().__init__(convert_charrefs=True)
+        self.document = document
+        self.namespaceURI = namespaceURI
+        self.root = DocumentFragment(document)
+        self.stack = [self.root]
+
+    def build(self, html):
+        self.feed(html)
+        self.close()
+        return list(self.root.childNodes)
+
+    def handle_starttag(self, tag, attrs):
+        parent = self.stack[-1]
+        namespaceURI = SVG_NAMESPACE if tag == "svg" else getattr(parent, "namespaceURI", self.namespaceURI)
+
+        element = Element(self.document, tag, namespaceURI)
+        for name, value in attrs:
+            element._setAttribute(name, value if value is not None else "")
+
+        parent._insert(element, None)
+
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+        if tag not in VOID_ELEMENTS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].localName == tag:
+                del self.stack[i:]
+                break
+
+    def handle_data(self, data):
+        self.stack[-1]._insert(Text(self.document, data), None)
+
+    def handle_comment(self, data):
+        self.stack[-1]._insert(Comment(self.document, data), None)
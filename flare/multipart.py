@@ -0,0 +1,122 @@
+"""
+Encoding of request parameters as multipart/form-data, shared by NetworkService and SyncHandler.
+
+This module doesn't depend on Pyodide, except for MultipartEncoder.toFormData().
+"""
+
+import os, sys, string, random
+
+
+def isFile(value):
+    """Checks if value is a file-like object to be sent as file."""
+    return hasattr(value, "read") and hasattr(value, "name")
+
+
+def flattenParams(params, key=""):
+    """Yields the key-value pairs of nested params, with dotted keys for dicts and lists of dicts, as ViUR expects them."""
+    if isFile(params):
+        yield key, params
+
+    elif isinstance(params, list):
+        if any([isinstance(entry, dict) for entry in params]):
+            for idx, entry in enumerate(params):
+                yield from flattenParams(entry, key + "." + str(idx))
+        else:
+            for entry in params:
+                yield from flattenParams(entry, key)
+
+    elif isinstance(params, dict):
+        for key_, entry in params.items():
+            yield from flattenParams(entry, ((key + ".") if key else "") + key_)
+
+    else:
+        yield key, params
+
+
+class MultipartEncoder(object):
+    """Encodes params as multipart/form-data body.
+
+    The body is generated as a stream of bytes chunks by chunks() and joined once by encode(),
+    file contents are read in blocks and sent unchanged.
+    In the browser, toFormData() builds a JavaScript FormData object instead, which passes file contents as Blobs.
+    """
+
+    blockSize = 65536  # size of the blocks read from files
+
+    def __init__(self, params, boundary=None):
+        super().__init__()
+        self.params = params
+        self.boundary = boundary or "---" + "".join(
+            [random.choice(string.ascii_lowercase + string.ascii_uppercase + string.digits) for x in range(13)]
+        )
+
+    @property
+    def contentType(self):
+        return "multipart/form-data; boundary=" + self.boundary + "; charset=utf-8"
+
+    @staticmethod
+    def fileName(value):
+        name = os.path.basename(value.name)
+
+        if isinstance(name, bytes):
+            name = name.decode(sys.getfilesystemencoding())
+
+        return name
+
+    @staticmethod
+    def readFile(value, blockSize):
+        """Yields the content of a file as bytes chunks."""
+        while chunk := value.read(blockSize):
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else bytes(chunk)
+
+    def chunks(self):
+        """Yields the body as bytes chunks."""
+        separator = f"\r\n--{self.boundary}".encode("ascii")
+
+        yield f'Content-Type: multipart/mixed; boundary="{self.boundary}"\r\nMIME-Version: 1.0\r\n'.encode("ascii")
+        yield separator
+
+        for key, value in flattenParams(self.params):
+            if isFile(value):
+                yield (
+                    "\r\nContent-Type: application/octet-stream"
+                    "\r\nMIME-Version: 1.0"
+                    f'\r\nContent-Disposition: form-data; name="{key}"; filename="{self.fileName(value)}"\r\n\r\n'
+                ).encode("utf-8")
+                yield from self.readFile(value, self.blockSize)
+
+            else:
+                yield (
+                    "\r\nContent-Type: application/octet-stream"
+                    "\r\nMIME-Version: 1.0"
+                    f'\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'
+                    + (str(value) if value is not None else "")
+                ).encode("utf-8")
+
+            yield separator
+
+        yield b"--\r\n"
+
+    def encode(self):
+        """Returns the entire body as bytes."""
+        return b"".join(self.chunks())
+
+    def toFormData(self):
+        """Returns the params as JavaScript FormData, to be sent by the browser with its own boundary."""
+        import pyodide
+        from js import FormData, Blob
+
+        formData = FormData.new()
+
+        for key, value in flattenParams(self.params):
+            if isinstance(value, pyodide.JsProxy):  # e.g. a File from an <input type="file">
+                formData.append(key, value)
+
+            elif isFile(value):
+                blob = Blob.new(pyodide.to_js([b"".join(self.readFile(value, self.blockSize))]))
+                formData.append(key, blob, self.fileName(value))
+
+            else:
+                formData.append(key, str(value) if value is not None else "")
+
+        return formData
@@ -4,8 +4,9 @@ Tools for handling Ajax/fetch-network requests
 
 import logging, pyodide, asyncio
 from flare.event import EventDispatcher
-import os, sys, json, string, random
+import json, time, urllib.parse
 from . import html5, i18n
+from .multipart import MultipartEncoder, isFile, flattenParams
 
 
 def fetch_json(url, callback, **kwargs):
@@ -80,7 +81,8 @@ class HTTPRequest(object):
         payload=None,
         content_type=None,
         response_type=None,
-        asynchronous=True
+        asynchronous=True,
+        headers=None
     ):
         super(HTTPRequest, self).__init__()
 
@@ -93,6 +95,7 @@ class HTTPRequest(object):
         self.hasBeenSent = False
         self.payload = payload
         self.content_type = content_type
+        self.headers = headers
 
         self.req = html5.jseval("new XMLHttpRequest()")
         self.proxy_readystate = pyodide.create_proxy(self.onReadyStateChange)
@@ -114,7 +117,13 @@ class HTTPRequest(object):
             if self.method == "POST" and self.content_type is not None:
                 self.req.setRequestHeader("Content-Type", self.content_type)
 
-            self.req.send(self.payload)
+            for name, value in (self.headers or {}).items():
+                self.req.setRequestHeader(name, value)
+
+            if isinstance(self.payload, (bytes, bytearray)):
+                self.req.send(pyodide.to_js(self.payload))
+            else:
+                self.req.send(self.payload)
 
         if self.req.readyState == 4:
             if 200 <= self.req.status < 300:
@@ -163,6 +172,98 @@ def NiceErrorAndThen(function):
     )
 
 
+class ResponseCacheEntry(object):
+    """A response stored by the ResponseCache."""
+
+    __slots__ = ("text", "etag", "lastModified", "time")
+
+    def __init__(self, text, etag=None, lastModified=None):
+        super().__init__()
+        self.text = text
+        self.etag = etag
+        self.lastModified = lastModified
+        self.time = time.monotonic()
+
+
+class ResponseCache(object):
+    """Bounded LRU cache for the responses of read requests by NetworkService, keyed by module, url, params and body encoding.
+
+    An entry is served without any request while it is younger than the TTL of its module, which is ttl unless
+    moduleTtl specifies another one. Older entries are revalidated by a conditional request, when the server sent an
+    ETag or Last-Modified header; a response with status 304 then keeps the entry.
+    Changes to a module, announced by NetworkService.notifyChange() or by modifying requests, invalidate its entries.
+
+    It is enabled by assigning it to NetworkService.responseCache, e.g.
+    ``NetworkService.responseCache = ResponseCache(ttl=30, moduleTtl={"user": 0})``.
+    """
+
+    def __init__(self, maxSize=256, ttl=60, moduleTtl=None):
+        super().__init__()
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.moduleTtl = moduleTtl or {}
+        self.generation = 0  # increased when all entries are invalidated
+        self.moduleGenerations = {}  # increased per module when its entries are invalidated
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._entries = {}
+
+    def get(self, key):
+        """Returns the entry for key and marks it as most recently used, or None."""
+        if (entry := self._entries.pop(key, None)) is not None:
+            self._entries[key] = entry
+
+        return entry
+
+    def isFresh(self, key, entry):
+        """Checks if entry can be served without revalidation, by the TTL of its module."""
+        return time.monotonic() - entry.time < self.moduleTtl.get(key[0], self.ttl)
+
+    def put(self, key, text, etag=None, lastModified=None):
+        """Stores a response for key, evicting the least recently used entries beyond maxSize."""
+        if self.maxSize <= 0:
+            return
+
+        self._entries.pop(key, None)
+
+        while len(self._entries) >= self.maxSize:
+            del self._entries[next(iter(self._entries))]
+
+        self._entries[key] = ResponseCacheEntry(text, etag, lastModified)
+
+    def generationOf(self, module):
+        """Returns the generation of the entries of module, which changes when they are invalidated.
+
+        Responses requested before their module was invalidated aren't stored.
+        """
+        return self.generation, self.moduleGenerations.get(module, 0)
+
+    def invalidate(self, module=None):
+        """Removes all entries of module, or all entries if no module is given."""
+        if module is None:
+            self.generation += 1
+            self._entries.clear()
+        else:
+            self.moduleGenerations[module] = self.moduleGenerations.get(module, 0) + 1
+
+            for key in [key for key in self._entries if key[0] == module]:
+                del self._entries[key]
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        """Returns hits, misses, revalidations, the current size and the size limit of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "size": len(self._entries),
+            "maxSize": self.maxSize,
+        }
+
+
 skeyRequestQueue = []
 
 
@@ -199,13 +300,34 @@ class NetworkService(object):
     retryMax = 3
     retryDelay = 5000
 
+    # Concurrent identical read requests share one request, see NetworkService.request()
+    coalesceRequests = True
+    inFlight = {}  # the running read requests by their coalescing key
+    stats = {"requests": 0, "coalesced": 0}
+
+    responseCache = None  # ResponseCache for read requests, disabled by default
+
+    # Send read requests with their params urlencoded in the query string by GET, instead of a multipart POST
+    readsAsGet = False
+    maxGetUrlLength = 2048  # longer read requests are still sent by POST
+
+    useFormData = False  # Send multipart bodies as JavaScript FormData, instead of encoding them in Python
+
+    jsonBodyModules = set()  # Modules which accept JSON request bodies, see NetworkService.request()
+
+
     @staticmethod
     def notifyChange(module, **kwargs):
         """Broadcasts a change made to data of module 'module' to all currently registered changeListeners.
 
+        Cached responses of the module are invalidated before.
+
         :param module: Name of the module where the change occured
         :type module: str
         """
+        if NetworkService.responseCache:
+            NetworkService.responseCache.invalidate(module)
+
         for c in NetworkService.changeListeners:
             c.onDataChanged(module, **kwargs)
 
@@ -238,68 +360,62 @@ class NetworkService(object):
 
     @staticmethod
     def genReqStr(params):
-        boundary_str = "---" + "".join(
-            [
-                random.choice(
-                    string.ascii_lowercase + string.ascii_uppercase + string.digits
-                )
-                for x in range(13)
-            ]
-        )
-        boundary = boundary_str
+        """Encodes params as multipart body, returning the body as str and its boundary.
 
-        res = f'Content-Type: multipart/mixed; boundary="{boundary}"\r\nMIME-Version: 1.0\r\n'
-        res += "\r\n--" + boundary
+        Kept for compatibility: File contents which aren't valid UTF-8 can't be represented in a str,
+        MultipartEncoder(params).encode() returns the body as bytes instead.
+        """
+        encoder = MultipartEncoder(params)
+        return encoder.encode().decode("utf-8", "replace"), encoder.boundary
 
-        def expand(key, value):
-            ret = ""
+    @staticmethod
+    def genQueryStr(params):
+        """Urlencodes params for a query string, or returns None when they contain files."""
+        query = []
 
-            if all([x in dir(value) for x in ["name", "read"]]):  # File
-                type = "application/octet-stream"
-                filename = os.path.basename(value.name).decode(
-                    sys.getfilesystemencoding()
-                )
+        for key, value in flattenParams(params):
+            if isFile(value):
+                return None
 
-                ret += (
-                    f"\r\nContent-Type: {type}"
-                    f"\r\nMIME-Version: 1.0"
-                    f'\r\nContent-Disposition: form-data; name="{key}"; filename="{filename}"\r\n\r\n'
-                )
-                ret += str(value.read())
-                ret += "\r\n--" + boundary
+            query.append((key, str(value) if value is not None else ""))
 
-            elif isinstance(value, list):
-                if any([isinstance(entry, dict) for entry in value]):
-                    for idx, entry in enumerate(value):
-                        ret += expand(key + "." + str(idx), entry)
-                else:
-                    for entry in value:
-                        ret += expand(key, entry)
+        return urllib.parse.urlencode(query)
 
-            elif isinstance(value, dict):
-                for key_, entry in value.items():
-                    ret += expand(((key + ".") if key else "") + key_, entry)
+    @staticmethod
+    def genJsonStr(params):
+        """Encodes params as JSON body with dotted keys, flattened like the multipart body, or returns None when they contain files.
 
-            else:
-                ret += (
-                    "\r\nContent-Type: application/octet-stream"
-                    "\r\nMIME-Version: 1.0"
-                    f'\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'
-                )
-                ret += str(value) if value is not None else ""
-                ret += "\r\n--" + boundary
+        Keys occurring several times, like from lists, get a list of all their values.
+        """
+        body = {}
 
-            return ret
+        for key, value in flattenParams(params):
+            if isFile(value):
+                return None
 
-        for key, value in params.items():
-            res += expand(key, value)
+            if key not in body:
+                body[key] = value
+            elif isinstance(body[key], list):
+                body[key].append(value)
+            else:
+                body[key] = [body[key], value]
 
-        res += "--\r\n"
+        return json.dumps(body, separators=(",", ":"), default=str)
 
-        # fixme: DEBUG!
-        # print(res)
+    @staticmethod
+    def coalescingKey(module, url, params, modifies, secure, jsonBody=False):
+        """Returns the key by which concurrent identical read requests are coalesced, or None.
 
-        return res, boundary
+        Only requests which don't modify data and need no security key are coalesced. Requests whose params are
+        encoded differently, as JSON or multipart body, are not considered identical.
+        """
+        if modifies or secure:
+            return None
+
+        try:
+            return module, url, json.dumps(params, sort_keys=True), bool(jsonBody)
+        except (TypeError, ValueError):  # e.g. files
+            return None
 
     @staticmethod
     def decode(req):
@@ -349,6 +465,7 @@ class NetworkService(object):
         secure,
         kickoff,
         group=None,
+        jsonBody=None,
     ):
         """Constructs a new NetworkService request.
 
@@ -369,6 +486,10 @@ class NetworkService(object):
 
         self.params = params
 
+        if jsonBody is None:
+            jsonBody = module in NetworkService.jsonBodyModules
+
+        self.jsonBody = jsonBody
         self.successHandler = [successHandler] if successHandler else []
         self.failureHandler = [failureHandler] if failureHandler else []
         self.finishedHandler = [finishedHandler] if finishedHandler else []
@@ -380,6 +501,12 @@ class NetworkService(object):
         self.request = None  # the underlying HTTPRequest
 
         self.kickoffs = 0
+        self.coalesced = 0  # number of requests served by this request additionally
+        self.coalescingKey = None
+        self.cacheKey = None  # key to store the response in NetworkService.responseCache
+        self.cacheEntry = None  # cached response to be revalidated
+        self.cacheGeneration = None
+
         if kickoff:
             self.kickoff()
 
@@ -420,6 +547,7 @@ class NetworkService(object):
         secure=False,
         kickoff=True,
         group=None,
+        jsonBody=None,
     ):
         """Performs an AJAX request. Handles caching and security-keys.
 
@@ -439,14 +567,42 @@ class NetworkService(object):
         :type modifies: bool
         :param secure: If true, include a fresh securitykey in this request. Defaults to False.
         :type secure: bool
+        :param jsonBody: Send params as JSON body with dotted keys instead of multipart. Defaults to module in NetworkService.jsonBodyModules.
+        :type jsonBody: bool
 
+        Concurrent identical read requests (same module, url and params, neither modifying nor secure) are coalesced:
+        The running request is returned, and the handlers are added to it.
+        When NetworkService.responseCache is set, responses of read requests are cached (see ResponseCache).
         """
         logging.debug(f"NetworkService.request {module=} {url=} {params=}")
+        NetworkService.stats["requests"] += 1
 
         if group:
             # grouped requests will always be handled later
             kickoff = False
 
+        if jsonBody is None:
+            jsonBody = module in NetworkService.jsonBodyModules
+
+        key = None
+        cache = NetworkService.responseCache
+        if (NetworkService.coalesceRequests or cache) and kickoff:
+            key = NetworkService.coalescingKey(module, url, params, modifies, secure, jsonBody)
+
+            if NetworkService.coalesceRequests and (running := NetworkService.inFlight.get(key)) is not None:
+                logging.debug(f"NetworkService.request coalesced with running request {module=} {url=}")
+                NetworkService.stats["coalesced"] += 1
+                running.coalesced += 1
+
+                if successHandler:
+                    running.successHandler.append(successHandler)
+                if failureHandler:
+                    running.failureHandler.append(failureHandler)
+                if finishedHandler:
+                    running.finishedHandler.append(finishedHandler)
+
+                return running
+
         dataRequest = NetworkService(
             module,
             url,
@@ -456,28 +612,80 @@ class NetworkService(object):
             finishedHandler,
             modifies,
             secure,
-            kickoff,
+            False,
             group,
+            jsonBody,
         )
 
+        if cache and key is not None:
+            if (entry := cache.get(key)) and cache.isFresh(key, entry):
+                # Serve from cache, but asynchronously like any request
+                cache.hits += 1
+                dataRequest.status = "running"
+                DeferredCall(dataRequest.onCompletion, entry.text)
+                return dataRequest
+
+            cache.misses += 1
+            dataRequest.cacheKey = key
+            dataRequest.cacheGeneration = cache.generationOf(module)
+
+            if entry and (entry.etag or entry.lastModified):
+                dataRequest.cacheEntry = entry
+
         if group:
             group.addRequest(dataRequest)
 
+        elif kickoff:
+            dataRequest.kickoff()
+
+            if key is not None and NetworkService.coalesceRequests and dataRequest.status == "running":
+                dataRequest.coalescingKey = key
+                NetworkService.inFlight[key] = dataRequest
+
         return dataRequest
 
     def doFetch(self, url, params, skey):
         """Internal function performing the actual AJAX request."""
+        headers = None
+        if self.cacheEntry:
+            # Revalidate the cached response
+            headers = {}
+
+            if self.cacheEntry.etag:
+                headers["If-None-Match"] = self.cacheEntry.etag
+            if self.cacheEntry.lastModified:
+                headers["If-Modified-Since"] = self.cacheEntry.lastModified
+
+        if (
+            params
+            and NetworkService.readsAsGet
+            and not (self.modifies or self.secure or skey)
+            and isinstance(params, dict)
+            and (query := NetworkService.genQueryStr(params)) is not None
+            and len(url) + len(query) < NetworkService.maxGetUrlLength
+        ):
+            # Read request as GET with urlencoded params
+            url += ("&" if "?" in url else "?") + query
+            params = None
+
         if params:
             if skey:
                 params["skey"] = skey
 
             contentType = None
 
-            if isinstance(params, dict):
-                multipart, boundary = NetworkService.genReqStr(params)
-                contentType = (
-                    "multipart/form-data; boundary=" + boundary + "; charset=utf-8"
-                )
+            if isinstance(params, dict) and self.jsonBody and (body := NetworkService.genJsonStr(params)) is not None:
+                contentType = "application/json; charset=utf-8"
+                multipart = body
+
+            elif isinstance(params, dict):
+                encoder = MultipartEncoder(params)
+
+                if NetworkService.useFormData:
+                    multipart = encoder.toFormData()  # the browser sets the content type
+                else:
+                    multipart = encoder.encode()
+                    contentType = encoder.contentType
             elif isinstance(params, bytes):
                 contentType = "application/x-www-form-urlencoded"
                 multipart = params
@@ -491,6 +699,7 @@ class NetworkService(object):
                 self.onError,
                 payload=multipart,
                 content_type=contentType,
+                headers=headers,
             )
 
         else:
@@ -500,7 +709,7 @@ class NetworkService(object):
                 else:
                     url += "?skey=%s" % skey
 
-            self.request = HTTPRequest("GET", url, self.onCompletion, self.onError)
+            self.request = HTTPRequest("GET", url, self.onCompletion, self.onError, headers=headers)
 
     def onCompletion(self, text):
         """Internal hook for the AJAX call."""
@@ -514,11 +723,12 @@ class NetworkService(object):
         else:
             self.result = text
             self.status = "succeeded"
+            self.releaseCoalescing()
+            self.storeInCache(text)
+
             try:
-                for s in self.successHandler:
-                    s(self)
-                for s in self.finishedHandler:
-                    s(self)
+                self.callHandlers(self.successHandler)
+                self.callHandlers(self.finishedHandler)
                 self.requestFinishedEvent.fire(True)
             except:
                 if self.modifies:
@@ -545,6 +755,14 @@ class NetworkService(object):
 
     def onError(self, text, code):
         """Internal hook for the AJAX call."""
+        if int(code) == 304 and self.cacheEntry:
+            # The cached response is still valid
+            NetworkService.responseCache.revalidated += 1
+            self.cacheEntry.time = time.monotonic()
+            self.cacheKey = None
+            self.onCompletion(self.cacheEntry.text)
+            return
+
         self.status = "failed"
         self.result = text
 
@@ -554,9 +772,9 @@ class NetworkService(object):
             return
 
         logging.error(f"NetworkService.error {self.kickoffs=} {self.retryMax=} {code=} {text=}")
+        self.releaseCoalescing()
 
-        for s in self.failureHandler:
-            s(self, code)
+        self.callHandlers(self.failureHandler, code)
 
         if not self.failureHandler and self.defaultFailureHandler:
             self.defaultFailureHandler(code)
@@ -564,15 +782,56 @@ class NetworkService(object):
         if not self.defaultFailureHandler:
             self.clear()
 
-        for s in self.finishedHandler:
-            s(self)
-
+        self.callHandlers(self.finishedHandler)
         self.requestFinishedEvent.fire(False)
 
+    def callHandlers(self, handlers, *args):
+        """Calls handlers with this request and args.
+
+        When requests were coalesced into this one, the handlers belong to several callers; an exception raised by
+        one handler is then logged, so that it doesn't prevent the handlers of the other callers.
+        """
+        for handler in handlers:
+            if not self.coalesced:
+                handler(self, *args)
+                continue
+
+            try:
+                handler(self, *args)
+            except Exception as e:
+                logging.exception(e)
+
     def onTimeout(self, text):
         """Internal hook for the AJAX call."""
         self.onError(text, -1)
 
+    def storeInCache(self, text):
+        """Stores the response in NetworkService.responseCache, or invalidates the module's entries when modified."""
+        if not (cache := NetworkService.responseCache):
+            return
+
+        if self.modifies:
+            cache.invalidate(self.module)
+
+        elif self.cacheKey is not None and self.request and cache.generationOf(self.module) == self.cacheGeneration:
+            if "no-store" not in (self.request.req.getResponseHeader("Cache-Control") or ""):
+                cache.put(
+                    self.cacheKey,
+                    text,
+                    etag=self.request.req.getResponseHeader("ETag"),
+                    lastModified=self.request.req.getResponseHeader("Last-Modified"),
+                )
+
+        self.cacheKey = None
+
+    def releaseCoalescing(self):
+        """Stops coalescing further requests into this request, as its result is delivered."""
+        if self.coalescingKey is not None:
+            if NetworkService.inFlight.get(self.coalescingKey) is self:
+                del NetworkService.inFlight[self.coalescingKey]
+
+            self.coalescingKey = None
+
     def clear(self):
         self.successHandler = []
         self.finishedHandler = []
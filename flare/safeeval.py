@@ -110,12 +110,18 @@ class SafeEval:
     """Safely evaluate an expression from an untrusted party."""
 
     def __init__(
-            self, allowedCallables: typing.Union[None, typing.Dict[str, typing.Any]] = None
+            self, allowedCallables: typing.Union[None, typing.Dict[str, typing.Any]] = None, cacheSize: int = 1024
     ):
         """Ctor for an SafeEval instance with optional mapping of function names to callables.
 
         :param allowedCallables: A mapping if function name to callable
+        :param cacheSize: Maximum number of compiled expressions kept by compile(); 0 disables caching
         """
+        self.cacheSize = cacheSize
+        self.cacheHits = 0
+        self.cacheMisses = 0
+        self._cache: Dict[str, ast.AST] = {}
+
         self.allowedCallables = {
             "str": str,
             "float": float,
@@ -234,14 +240,32 @@ class SafeEval:
         Afterwards you can use execute to run the compiled ast with optional data.
         If you only want to run a 'oneshot' expression feel free to use our safeEval method.
 
+        The most recently compiled expressions are kept in an LRU cache, so that expressions
+        executed repeatedly (e.g. inside a flare-for loop) are only parsed once.
+
         :param expr: the expression to compile
         :return: the ready to use ast node
         """
-        expr = expr.strip()
-        assert (
-                len(expr) < 500 and len([x for x in expr if x in {"(", "[", "{"}]) < 60
-        ), "Recursion depth or len exceeded"
-        return ast.parse(expr).body[0].value
+        if (node := self._cache.pop(expr, None)) is not None:
+            self.cacheHits += 1
+        else:
+            self.cacheMisses += 1
+
+            code = expr.strip()
+            assert (
+                    len(code) < 500 and len([x for x in code if x in {"(", "[", "{"}]) < 60
+            ), "Recursion depth or len exceeded"
+            node = ast.parse(code).body[0].value
+
+            if self.cacheSize <= 0:
+                return node
+
+            while len(self._cache) >= self.cacheSize:
+                del self._cache[next(iter(self._cache))]
+
+        # (Re-)insert as most recently used entry
+        self._cache[expr] = node
+        return node
 
     def safeEval(self, expr: str, names: Dict[str, Any]) -> Any:
         """Safely evaluate an expression.
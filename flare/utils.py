@@ -47,14 +47,7 @@ def doesEventHitWidgetOrParents(event, widget):
 
 def doesEventHitWidgetOrChildren(event, widget):
     """Test if event 'event' hits widget 'widget' (or *any* of its children)."""
-    if event.target == widget.element:
-        return widget
-
-    for child in widget.children():
-        if doesEventHitWidgetOrChildren(event, child):
-            return child
-
-    return None
+    return html5.eventHitChild(event, widget)
 
 
 def textToHtml(node, text):
@@ -92,6 +92,8 @@ class View:
                 logging.error("something went wrong...")
                 logging.exception(err)
 
+        logging.debug("loadView: %r, event listeners: %r", self.name, html5.eventListenerStats())
+
 
 View.params = {}
 
@@ -178,7 +178,11 @@ class ViurForm(html5.Form):
                     else:
                         raise NotImplementedError("Unknown event %r", event)
 
-    def submitForm(self):
+    def submitForm(self, jsonBody=None):
+        """
+        Submits the serialized form to the module's action.
+        :param jsonBody: Send the values as JSON body; By default, this depends on NetworkService.jsonBodyModules.
+        """
         self.state.updateState("submitStatus", "sending")
         res = self.serialize()
 
@@ -189,6 +193,7 @@ class ViurForm(html5.Form):
             secure=True,  # always with fresh skey
             successHandler=self.actionSuccess,
             failureHandler=self.actionFailed,
+            jsonBody=jsonBody,
         )
 
         return res
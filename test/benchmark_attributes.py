@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# Micro-benchmarks for attribute access on html5 widgets, running in html5's emulation mode (plain CPython).
+#
+# Covers item access by widget[key], the lookup it replaces (_getTargetfuncName() and getattr()),
+# and attribute-heavy rendering by html5.fromHTML(), both interpreted and compiled.
+import os, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flare"))
+import html5  # noqa: E402
+
+# language=HTML
+ROW = """
+    <div title="row {{value}}" id="row-{{value}}" lang="en" dir="ltr" tabindex="1" role="row">
+        <a href="/entry/{{value}}" target="_blank" rel="noopener" title="Open" hreflang="en">Open</a>
+        <span title="value" lang="de" dir="rtl" role="cell">{{value}}</span>
+        <span title="label" lang="de" dir="rtl" role="cell">Label</span>
+    </div>
+"""
+
+NUMBER = 10000
+
+
+def legacyGet(wdg, key):
+    """Item access as implemented before the attribute dispatch tables."""
+    if func := getattr(wdg, wdg._getTargetfuncName(key, "get"), None):
+        return func()
+
+
+def legacySet(wdg, key, value):
+    if func := getattr(wdg, wdg._getTargetfuncName(key, "set"), None):
+        return func(value)
+
+
+def render(rows, compile):
+    html5.core.htmlCompileThreshold = 0 if compile else None
+    html5.fromHTML(ROW * rows, appendTo=html5.Div(), value=42)
+
+
+def main():
+    wdg = html5.A()
+    wdg["href"] = "/"
+
+    cases = {
+        'wdg["href"]': lambda: wdg["href"],
+        'legacy wdg["href"]': lambda: legacyGet(wdg, "href"),
+        'wdg["title"] = ...': lambda: wdg.__setitem__("title", "x"),
+        'legacy wdg["title"] = ...': lambda: legacySet(wdg, "title", "x"),
+        'wdg["unknown"]': lambda: wdg["unknown"],
+        "registerTag()": lambda: html5.registerTag("benchmark-link", html5.A),
+    }
+
+    print(f"{'case':<32} {'us/op':>8}")
+
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=NUMBER, repeat=3)) / NUMBER
+        print(f"{name:<32} {best * 1000000:>8.3f}")
+
+    for compile in (False, True):
+        render(1, compile)  # warm-up
+        best = min(timeit.repeat(lambda: render(100, compile), number=1, repeat=3))
+        print(f"{'fromHTML, 100 rows' + (', compiled' if compile else ''):<32} {best * 1000000 / 100:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Benchmark for CSS class handling of html5 widgets, running in html5's emulation mode (plain CPython).
+#
+# Measures widget construction with classes, addClass(), hasClass() and toggleClass()-heavy selection
+# highlighting, and counts the resulting writes to the DOM.
+import os, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flare"))
+import html5  # noqa: E402
+
+NUMBER = 1000
+
+ops = html5.core.document.ops
+
+
+def writes():
+    """Returns the number of writes to class attributes and class lists counted by the headless DOM."""
+    return sum(count for op, count in ops.items() if op.startswith("classList.") or op.endswith("Attribute"))
+
+
+class Item(html5.Div):
+    style = ["item", "list-item", "is-selectable"]
+
+
+def construct():
+    Item()
+
+
+def addClasses(wdg=html5.Div()):
+    wdg.addClass("a", "b", "c", "d")
+    wdg.removeClass("a", "b", "c", "d")
+
+
+def hasClass(wdg=html5.Div(style=[f"class-{i}" for i in range(50)])):
+    wdg.hasClass("class-49")
+
+
+items = [Item() for _ in range(100)]
+
+
+def select():
+    """Moves a selection over all items, as done by list and tree widgets."""
+    for i, item in enumerate(items):
+        item.toggleClass("is-active", "is-inactive")
+        items[i - 1].toggleClass("is-active", "is-inactive")
+
+
+def main():
+    print(f"{'case':<24} {'us/op':>8} {'writes/op':>10}")
+
+    for name, case in {
+        "construction": construct,
+        "addClass/removeClass": addClasses,
+        "hasClass": hasClass,
+        "toggleClass (100 items)": select,
+    }.items():
+        html5.core.document.resetOps()
+        case()
+        count = writes()
+
+        best = min(timeit.repeat(case, number=NUMBER, repeat=3)) / NUMBER
+        print(f"{name:<24} {best * 1000000:>8.2f} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
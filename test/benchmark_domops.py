@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# DOM operation count benchmark for html5.fromHTML(), running in html5's emulation mode (plain CPython).
+#
+# Counts the insertions into the DOM, the mutations of the live document, the onAttach() calls and the
+# created widgets, when a template is rendered into an attached widget, with and without DocumentFragment
+# batching and innerHTML rendering of static contents.
+import os, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flare"))
+import html5  # noqa: E402
+
+# language=HTML
+ROW = """
+    <div class="row" title="{{value}}">
+        <span class="value">{{value}}</span>
+        <button class="btn" disabled>Edit</button>
+        <div class="details">
+            <span class="label">Entry</span> with <em>static</em> content<br>
+            <ul><li>one</li><li>two</li></ul>
+        </div>
+    </div>
+"""
+
+ROWS = [1, 10, 100, 1000]
+
+counts = {}
+
+
+def count(cls, name, counter):
+    """Wraps cls.name to count its calls into counts[counter]."""
+    func = getattr(cls, name)
+
+    def wrapper(self, *args, **kwargs):
+        counts[counter] = counts.get(counter, 0) + 1
+        return func(self, *args, **kwargs)
+
+    setattr(cls, name, wrapper)
+
+
+count(html5.Widget, "onAttach", "onAttach")
+count(html5.Widget, "__init__", "widgets")
+
+
+def render(rows):
+    """Renders rows into an attached container, and returns the counted DOM operations and widget calls."""
+    container = html5.Div()
+    html5.Body().appendChild(container)
+
+    counts.clear()
+    html5.core.document.resetOps()
+    html5.fromHTML(ROW * rows, appendTo=container, value=42)
+
+    ops = html5.core.document.ops
+    ret = dict(counts, insert=ops["appendChild"] + ops["insertBefore"], innerHTML=ops["innerHTML"], live=ops["live"])
+
+    html5.Body().removeChild(container)
+    return ret
+
+
+def main():
+    print(
+        f"{'rows':>6} {'fragments':>10} {'static':>7} {'inserts':>8} {'innerHTML':>10} {'live':>6} {'onAttach':>9} "
+        f"{'widgets':>8} {'time (ms)':>10}"
+    )
+
+    for rows in ROWS:
+        for fragments, innerHTML in ((False, False), (True, False), (True, True)):
+            html5.core.domUseFragments = fragments
+            html5.core.domUseInnerHTML = innerHTML
+            stats = render(rows)
+            best = min(timeit.repeat(lambda: render(rows), number=1, repeat=3))
+
+            print(
+                f"{rows:>6} {str(fragments):>10} {str(innerHTML):>7} {stats.get('insert', 0):>8} "
+                f"{stats.get('innerHTML', 0):>10} {stats.get('live', 0):>6} {stats.get('onAttach', 0):>9} {stats.get('widgets', 0):>8} "
+                f"{best * 1000:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
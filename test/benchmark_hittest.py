@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Benchmark for event hit tests, running in html5's emulation mode (plain CPython).
+#
+# Simulates a selection change in a list, where every list item tests whether the event hits it or its children,
+# like SkellistItem.onActiveSelectionChanged() does.
+import os, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flare"))
+import html5  # noqa: E402
+
+ROWS = [10, 100, 1000]
+
+
+class Event:
+    def __init__(self, target):
+        self.target = target
+
+
+def legacyHit(event, widget):
+    """Hit test as implemented before the element-to-widget registry, scanning the whole subtree."""
+    if event.target == widget.element:
+        return True
+
+    for child in widget._children:
+        if legacyHit(event, child):
+            return True
+
+    return False
+
+
+def selectionChanged(items, event, hit):
+    for item in items:
+        hit(event, item)
+
+
+def main():
+    print(f"{'rows':>6} {'subtree scan (ms)':>18} {'walk up (ms)':>13}")
+
+    for rows in ROWS:
+        items = [
+            html5.Div(f"<span><b>Entry {i}</b> <em>with</em> <span>some</span> <span>children</span></span>")
+            for i in range(rows)
+        ]
+        html5.Div(items)
+
+        # Click onto the last item's innermost element
+        event = Event(items[-1].element.firstChild.firstChild)
+
+        times = [
+            min(timeit.repeat(lambda: selectionChanged(items, event, hit), number=1, repeat=3))
+            for hit in (legacyHit, html5.doesEventHitWidgetOrChildren)
+        ]
+
+        print(f"{rows:>6} {times[0] * 1000:>18.2f} {times[1] * 1000:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Memory per widget benchmark, running in html5's emulation mode (plain CPython).
+#
+# Measures the Python heap allocated per Widget and TextNode with tracemalloc.
+# The DOM nodes themselves are part of the browser's heap, so the memory for the emulated DOM node
+# is measured separately and subtracted.
+#
+# The script fails when an object takes more than its budget. The budgets leave some headroom for different
+# CPython versions; before the core attributes were stored in __slots__, a Div took 328 bytes with CPython 3.11.
+import os, sys, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flare"))
+import html5  # noqa: E402
+
+NUMBER = 10000
+
+# Bytes per object
+BUDGETS = {
+    "Widget (Div)": 256,
+    "TextNode": 128,  # includes the __dict__ slot, which TextNode keeps for further attributes
+    "2 Widgets with [name] binding": 560,
+}
+
+
+def measure(factory):
+    """Returns the number of bytes allocated per object created by factory."""
+    factory()  # warm-up
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(NUMBER)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del objects
+    return (after - before) / NUMBER
+
+
+def main():
+    element = measure(lambda: html5.domCreateElement("div"))
+    text = measure(lambda: html5.domCreateTextNode("Hello"))
+
+    cases = {
+        "Widget (Div)": (lambda: html5.Div(), element),
+        "TextNode": (lambda: html5.TextNode("Hello"), text),
+        "2 Widgets with [name] binding": (lambda: html5.Div('<span [name]="x"></span>'), 2 * element),
+    }
+
+    print(f"{'case':<32} {'bytes/object':>12} {'budget':>8}")
+    failed = False
+
+    for name, (factory, dom) in cases.items():
+        size = measure(factory) - dom
+        print(f"{name:<32} {size:>12.0f} {BUDGETS[name]:>8}")
+
+        if size > BUDGETS[name]:
+            failed = True
+
+    if failed:
+        sys.exit("Memory budget exceeded")
+
+
+if __name__ == "__main__":
+    main()
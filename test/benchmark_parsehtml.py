@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# Benchmark for html5.parseHTML, running in html5's emulation mode (plain CPython, no browser required).
+#
+# The parser must scale linearly with the template size, so the time per KB should stay roughly constant.
+import os, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flare"))
+import html5  # noqa: E402
+
+# language=HTML
+SNIPPET = """
+    <div class="box" [name]="popupBox" style="height: 100%; overflow: auto"> <!-- some comment -->
+        <div class="box-head" [name]="popupHead">
+            <div class="item-headline" @click="onClick" data-key="{{key}}">
+                {{title}} &amp; some more text
+            </div>
+            <input type="text" class="input" [name]="inputField" disabled>
+            <br>
+        </div>
+        <ul class="list">
+            <li flare-for="entries">{{value}}</li>
+        </ul>
+        <label for="x">Label</label>
+    </div>
+"""
+
+SIZES = [1, 4, 16, 64, 256, 1024]  # in KB
+
+
+def buildTemplate(size):
+    size *= 1024
+    return (SNIPPET * (size // len(SNIPPET) + 1))[:size]
+
+
+def main():
+    print(f"{'size':>8} {'time (ms)':>12} {'us/KB':>10}")
+
+    for size in SIZES:
+        template = buildTemplate(size)
+        runs = max(1, 256 // size)
+
+        best = min(timeit.repeat(lambda: html5.parseHTML(template), number=runs, repeat=3)) / runs
+        print(f"{size:>6}KB {best * 1000:>12.2f} {best * 1000000 / size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
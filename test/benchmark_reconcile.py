@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# DOM operation count benchmark for Widget.sortChildren() and Widget.patchChildren(),
+# running in html5's emulation mode (plain CPython).
+#
+# Counts the DOM insertions and removals for reordering a list where a single entry moved, and for a full sort.
+import os, sys, random, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "flare"))
+import html5  # noqa: E402
+
+ROWS = 1000
+
+ops = html5.core.document.ops
+
+
+def moves():
+    """Returns the number of DOM insertions and removals counted by the headless DOM."""
+    return ops["appendChild"] + ops["insertBefore"] + ops["removeChild"]
+
+
+def legacySort(wdg, key):
+    """Widget.sortChildren() as implemented before patchChildren(), re-inserting every child."""
+    wdg._children.sort(key=key)
+
+    for c in reversed(wdg._children[:]):
+        wdg.element.removeChild(c.element)
+        wdg.element.insertBefore(c.element, wdg.element.firstChild)
+
+
+def main():
+    ol = html5.Ol()
+    html5.Body().appendChild(ol)
+
+    key = lambda wdg: wdg.index  # noqa: E731
+
+    def reset(shuffle):
+        children = list(ol.children())
+        children.sort(key=key)
+
+        if shuffle:
+            random.shuffle(children)
+        else:
+            children.insert(0, children.pop(ROWS // 2))  # a single entry moved
+
+        ol.patchChildren(children)
+        html5.core.document.resetOps()
+
+    for i in range(ROWS):
+        li = html5.Li(str(i))
+        li.index = i
+        ol.appendChild(li)
+
+    print(f"{'case':<32} {'DOM ops':>8} {'time (ms)':>10}")
+
+    for shuffle in (False, True):
+        for name, sort in (("legacy", legacySort), ("sortChildren", html5.Widget.sortChildren)):
+            reset(shuffle)
+            sort(ol, key)
+            count = moves()
+
+            best = min(timeit.repeat(lambda: sort(ol, key), setup=lambda: reset(shuffle), number=1, repeat=3))
+            print(f"{name + (', shuffled' if shuffle else ', one moved'):<32} {count:>8} {best * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
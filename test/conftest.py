@@ -0,0 +1,37 @@
+# Configuration for the unit tests, which run in plain CPython.
+#
+# html5 runs in its emulation mode, rendering into the headless DOM (html5.headless).
+# Outside of Pyodide, the browser modules js and pyodide don't exist; they are replaced by minimal doubles here,
+# so that the flare package can be imported. Anything requiring a real browser is left to the manual tests.
+import os, sys, types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Manual tests, which run in the browser
+collect_ignore = ["test_event_listeners.py"]
+
+
+class _JsModule(types.ModuleType):
+    """Double of Pyodide's js module: Any global is None, except for window and eval, so html5 uses emulation mode."""
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("window", "eval"):
+            raise AttributeError(name)
+
+        return None
+
+
+class _JsProxy(object):
+    pass
+
+
+try:
+    import pyodide  # noqa: F401
+except ImportError:
+    sys.modules["js"] = _JsModule("js")
+    sys.modules["pyodide"] = types.SimpleNamespace(
+        create_proxy=lambda func: func,
+        create_once_callable=lambda func: func,
+        to_js=lambda obj: obj,
+        JsProxy=_JsProxy,
+    )
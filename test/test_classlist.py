@@ -0,0 +1,94 @@
+# Tests for the class list of widgets, which applies changes by classList calls
+from flare import html5
+
+document = html5.core.document
+
+
+def classes(widget):
+    return widget.element.getAttribute("class")
+
+
+def test_construction_sets_classes_at_once():
+    class Styled(html5.Div):
+        style = ["a", "b"]
+
+    document.resetOps()
+    div = Styled(style="c a")
+
+    assert classes(div) == "a b c"
+    assert div["class"] == ["a", "b", "c"]
+    assert document.ops["classList.add"] == 1
+
+
+def test_add_and_remove_several_classes_per_call():
+    div = html5.Div()
+    document.resetOps()
+
+    div.addClass("a b", ["c", ["d"]], "a")
+    div.removeClass("b", ["d", "x"])
+
+    assert classes(div) == "a c"
+    assert document.ops["classList.add"] == 1
+    assert document.ops["classList.remove"] == 1
+
+
+def test_duplicates_are_ignored():
+    div = html5.Div()
+    div.addClass("a", "a")
+    div["class"].append("a")
+    div["class"].insert(0, "a")
+
+    assert div["class"] == ["a"]
+    assert div.hasClass("a") and not div.hasClass("b")
+
+
+def test_toggle_replaces_in_one_call():
+    div = html5.Div()
+    div.addClass("on")
+    document.resetOps()
+
+    assert div.toggleClass("on", "off") is False
+    assert classes(div) == "off"
+    assert document.ops["classList.replace"] == 1
+
+    assert div.toggleClass("on", "off") is True
+    assert classes(div) == "on"
+
+
+def test_list_operations():
+    div = html5.Div()
+    div["class"] = "a b c"
+
+    assert div["class"].pop() == "c"
+    div["class"].remove("a")
+    assert classes(div) == "b"
+
+    div["class"].clear()
+    assert not div.element.hasAttribute("class")
+    assert not div.hasClass("b")
+
+
+def test_remove_ignores_missing_class():
+    div = html5.Div()
+    div["class"] = "a"
+    div["class"].remove("x")
+
+    assert div["class"] == ["a"]
+
+
+def test_replace_keeps_position():
+    div = html5.Div()
+    div["class"] = "a on b"
+
+    div.toggleClass("on", "off")
+    assert div["class"] == ["a", "off", "b"]
+    assert classes(div) == "a off b"
+
+    # A class which is contained already is only removed from the old position
+    div["class"].replace("a", "b")
+    assert div["class"] == ["off", "b"]
+    assert classes(div) == "off b"
+
+    div["class"].replace("x", "c")
+    assert div["class"] == ["off", "b", "c"]
+    assert classes(div) == "off b c"
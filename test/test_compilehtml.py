@@ -0,0 +1,88 @@
+# Tests for html5.compileHTML(), which must render the same as the interpreter of fromHTML()
+import pytest
+from flare import html5
+from flare.html5 import headless
+
+TEMPLATES = [
+    '<div class="a {{x}}" title="{{x}}">Hi {{x}}<span class="b">s</span></div>',
+    '<div flare-if="x > 1">big</div><div flare-elif="x > 0">small</div><div flare-else>none</div>',
+    '<ul flare-for="items"><li>{{value}}</li></ul>',
+    '<dl flare-for="mapping"><dt>{{key}}</dt><dd>{{value}}</dd></dl>',
+    '<input type="text" disabled><p hidden="hidden">p</p>',
+    '<div style="color: red; width: {{x}}px" data-value="{{x}}" data-fixed="f">d</div>',
+    '<table><tr><td>a</td></tr></table>',
+    "<p>a<br>b &amp; c</p>",
+]
+
+
+def render(html, compiled, **kwargs):
+    div = html5.Div()
+    ast = html5.parseHTML(html)
+
+    if compiled:
+        widgets = html5.compileHTML(ast)(div, **kwargs)
+    else:
+        widgets = html5.fromHTML(ast, div, **kwargs)
+
+    return div, widgets
+
+
+@pytest.fixture(autouse=True)
+def interpreted():
+    threshold = html5.core.htmlCompileThreshold
+    html5.core.htmlCompileThreshold = None
+    yield
+    html5.core.htmlCompileThreshold = threshold
+
+
+@pytest.mark.parametrize("html", TEMPLATES)
+@pytest.mark.parametrize("x", [0, 1, 2])
+def test_compiled_renders_like_interpreter(html, x):
+    kwargs = {"x": x, "items": [1, 2, 3][:x], "mapping": {"a": 1, "b": x}}
+    interpreted, _ = render(html, False, **kwargs)
+    compiled, _ = render(html, True, **kwargs)
+
+    assert compiled.element.innerHTML == interpreted.element.innerHTML
+
+
+def test_bindings_and_events():
+    class Binder(html5.Div):
+        def onClick(self, *args):
+            self.clicked = True
+
+    binder = Binder()
+    binder.owner = "the owner"
+    html5.compileHTML('<div><a [name]="link" @click="onClick" :owner="owner">x</a></div>')(binder)
+
+    assert isinstance(binder.link, html5.A)
+    assert binder.link.parent().parent() is binder
+    assert binder.link.owner == "the owner"
+
+    binder.link.element.dispatchEvent(headless.Event("click"))
+    assert binder.clicked
+
+
+def test_fromhtml_compiles_after_threshold():
+    html5.core.htmlCompileThreshold = 1
+    ast = html5.parseHTML("<span>{{x}}</span>")
+
+    html5.fromHTML(ast, html5.Div(), x=1)
+    assert ast.builder is None
+
+    div = html5.Div()
+    html5.fromHTML(ast, div, x=2)
+    assert ast.builder is not None
+    assert div.element.innerHTML == "<span>2</span>"
+
+
+def test_registertag_recompiles():
+    ast = html5.parseHTML("<test-compile-tag>x</test-compile-tag>")
+    builder = html5.compileHTML(ast)
+
+    @html5.tag("test-compile-tag")
+    class TestCompileTag(html5.Div):
+        pass
+
+    widgets = html5.fromHTML(ast, html5.Div())
+    assert ast.builder is not builder
+    assert isinstance(widgets[0], html5.TextNode)  # parsed before the tag existed
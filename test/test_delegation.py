@@ -0,0 +1,74 @@
+# Tests for event delegation (html5.core.domDelegateEvents)
+import gc
+import pytest
+from flare import html5
+from flare.html5 import headless
+
+
+@pytest.fixture
+def attached(monkeypatch):
+    monkeypatch.setattr(html5.core, "domDelegateEvents", True)
+    container = html5.Div()
+    html5.Body().appendChild(container)
+    yield container
+    html5.Body().removeChild(container)
+
+
+def test_events_bubble_to_widget_callbacks(attached):
+    calls = []
+    child = html5.Span()
+    attached.appendChild(child)
+
+    child.addEventListener("click", lambda event, widget: calls.append(("child", widget)))
+    attached.addEventListener("click", lambda event: calls.append(("parent", event.target)))
+
+    # No native listener per widget
+    assert not child.element._listeners and not attached.element._listeners
+
+    child.element.dispatchEvent(headless.Event("click"))
+    assert calls == [("child", child), ("parent", child.element)]
+
+
+def test_stop_propagation(attached):
+    calls = []
+    child = html5.Span()
+    attached.appendChild(child)
+
+    child.addEventListener("click", lambda event: event.stopPropagation())
+    attached.addEventListener("click", lambda: calls.append("parent"))
+
+    child.element.dispatchEvent(headless.Event("click"))
+    assert not calls
+
+
+def test_non_bubbling_events_reach_their_target_only(attached):
+    calls = []
+    child = html5.Input()
+    attached.appendChild(child)
+
+    child.addEventListener("focus", lambda: calls.append("child"))
+    attached.addEventListener("focus", lambda: calls.append("parent"))
+
+    child.element.dispatchEvent(headless.Event("focus", bubbles=False))
+    assert calls == ["child"]
+
+
+def test_remove_listener(attached):
+    calls = []
+    callback = lambda: calls.append("click")  # noqa: E731
+    attached.addEventListener("click", callback)
+    attached.removeEventListener("click", callback)
+
+    attached.element.dispatchEvent(headless.Event("click"))
+    assert not calls
+
+
+def test_widget_registry_is_weak(attached):
+    span = html5.Span()
+    span.addEventListener("click", lambda: None)
+    element = span.element
+
+    assert html5.core._widgetForElement(element) is span
+    del span
+    gc.collect()
+    assert html5.core._widgetForElement(element) is None
@@ -0,0 +1,32 @@
+# Tests for html5.domConvertEncodedText(), which decodes HTML entities like the browser's DOM parser
+import pytest
+from flare import html5
+
+
+@pytest.mark.parametrize(
+    "encoded, decoded",
+    [
+        ("plain text", "plain text"),
+        ("&amp; &lt; &gt; &quot; &#39;", "& < > \" '"),
+        ("&auml;&ouml;&uuml;&szlig;&euro;&nbsp;", "äöüß€\xa0"),
+        ("&#65;&#x42;&#X43;", "ABC"),
+        ("&amp", "&"),  # legacy entity without semicolon
+        ("&unknown; & alone", "&unknown; & alone"),
+        ("a\r\nb\rc", "a\nb\nc"),
+        ("a <b>bold</b> c", "a bold c"),
+        ("1 < 2", "1 < 2"),
+    ],
+)
+def test_decode(encoded, decoded):
+    assert html5.domConvertEncodedText(encoded) == decoded
+
+
+def test_non_strings():
+    assert html5.domConvertEncodedText(42) == "42"
+
+
+def test_text_nodes_are_decoded():
+    div = html5.Div()
+    html5.fromHTML("<span>Fish &amp; Chips</span>", div)
+
+    assert div.children(0).children(0).element.data == "Fish & Chips"
@@ -0,0 +1,48 @@
+# Tests for inserting multiple widgets into the document by one DocumentFragment
+import pytest
+from flare import html5
+
+document = html5.core.document
+
+
+@pytest.fixture
+def attached():
+    container = html5.Div()
+    html5.Body().appendChild(container)
+    document.resetOps()
+    yield container
+    html5.Body().removeChild(container)
+
+
+def test_append_multiple_widgets(attached):
+    children = [html5.Span(), html5.Span(), html5.Span()]
+    attached.appendChild(*children)
+
+    assert document.ops["createDocumentFragment"] == 1
+    assert document.ops["live"] == 1
+    assert [child.element for child in children] == list(attached.element.childNodes)
+    assert all(child._isAttached for child in children)
+
+
+def test_fromhtml_inserts_top_level_widgets_at_once(attached):
+    html5.fromHTML("<span>{{a}}</span><b>{{a}}</b><i>{{a}}</i>", attached, a=1)
+
+    assert document.ops["live"] == 1
+    assert attached.element.innerHTML == "<span>1</span><b>1</b><i>1</i>"
+
+
+def test_detached_widgets_need_no_fragment():
+    container = html5.Div()
+    document.resetOps()
+    container.appendChild(html5.Span(), html5.Span())
+
+    assert document.ops["createDocumentFragment"] == 0
+    assert document.ops["appendChild"] == 2
+
+
+def test_disabled(attached, monkeypatch):
+    monkeypatch.setattr(html5.core, "domUseFragments", False)
+    attached.appendChild(html5.Span(), html5.Span(), html5.Span())
+
+    assert document.ops["createDocumentFragment"] == 0
+    assert document.ops["live"] == 3
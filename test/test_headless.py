@@ -0,0 +1,100 @@
+# Tests for the headless DOM of html5's emulation mode, and the DOM operation budgets of rendering widgets
+import pytest
+from flare import html5
+from flare.html5 import headless
+
+document = html5.core.document
+
+
+@pytest.fixture
+def attached():
+    container = html5.Div()
+    html5.Body().appendChild(container)
+    document.resetOps()
+    yield container
+    html5.Body().removeChild(container)
+
+
+def test_document_is_headless():
+    assert isinstance(document, headless.Document)
+    assert isinstance(html5.Div().element, headless.Element)
+
+
+def test_innerhtml_roundtrip():
+    div = document.createElement("div")
+    div.innerHTML = '<p class="a">x &amp; <b>y</b></p><br>'
+
+    assert div.childNodes.length == 2
+    assert div.firstChild.getAttribute("class") == "a"
+    assert div.innerHTML == '<p class="a">x &amp; <b>y</b></p><br>'
+    assert div.textContent == "x & y"
+
+
+def test_reflected_properties_style_and_dataset():
+    div = document.createElement("div")
+    div.title = "t"
+    div.style.setProperty("color", "red")
+    div.dataset.fooBar = "1"
+
+    assert div.getAttribute("title") == "t"
+    assert div.getAttribute("style") == "color: red;"
+    assert div.getAttribute("data-foo-bar") == "1"
+    assert dir(div.dataset) == ["fooBar"]
+
+
+def test_event_phases():
+    calls = []
+    outer = document.createElement("div")
+    inner = document.createElement("span")
+    outer.appendChild(inner)
+
+    outer.addEventListener("click", lambda event: calls.append("capture"), True)
+    outer.addEventListener("click", lambda event: calls.append("bubble"))
+    inner.addEventListener("click", lambda event: calls.append(("target", event.currentTarget is inner)))
+
+    inner.dispatchEvent(headless.Event("click"))
+    assert calls == ["capture", ("target", True), "bubble"]
+
+
+def test_detached_mutations_are_not_live():
+    document.resetOps()
+    div = html5.Div()
+    div.appendChild(html5.Span(), "text")
+
+    assert document.ops["createElement"] == 2
+    assert document.ops["createTextNode"] == 1
+    assert document.ops["live"] == 0
+    assert not div.element.isConnected
+
+
+def test_budget_of_attaching_a_tree(attached):
+    div = html5.Div()
+    html5.fromHTML("<ul>" + "<li>{{i}}</li>" * 10 + "</ul>", div, i=1)
+    attached.appendChild(div)
+
+    assert document.ops["live"] == 1
+    assert div.element.isConnected
+
+
+def test_budget_of_static_template(attached, monkeypatch):
+    monkeypatch.setattr(html5.core, "htmlCompileThreshold", None)
+    html5.fromHTML('<ul class="list">' + "<li>item</li>" * 10 + "</ul>", attached)
+
+    # The static contents of the list are rendered by one innerHTML assignment
+    assert document.ops["innerHTML"] == 1
+    assert document.ops["createElement"] == 1
+    assert document.ops["live"] == 1
+
+
+def test_budget_of_attribute_changes(attached):
+    div = html5.Div()
+    attached.appendChild(div)
+    document.resetOps()
+
+    div.addClass("a", "b")
+    div.setStyles({"color": "red", "width": "1px"})
+    div["title"] = "t"
+
+    assert document.ops["classList.add"] == 1
+    assert document.ops["style.setProperty"] == 2
+    assert document.ops["live"] == 4
@@ -0,0 +1,42 @@
+# Tests for the hit tests of events on widgets and their children
+from flare import html5, utils
+from flare.html5 import headless
+
+
+def event(target):
+    evt = headless.Event("click")
+    evt.target = target.element
+    return evt
+
+
+def tree():
+    root = html5.Div()
+    html5.fromHTML('<ul [name]="ul"><li [name]="a"><b [name]="b">b</b></li><li [name]="c">c</li></ul>', root)
+    return root
+
+
+def test_hits_of_children():
+    root = tree()
+
+    assert html5.eventHitChild(event(root.b), root.ul) is root.a
+    assert html5.eventHitChild(event(root.c), root.ul) is root.c
+    assert html5.eventHitChild(event(root.ul), root.ul) is root.ul
+    assert html5.eventHitChild(event(root), root.ul) is None
+    assert html5.eventHitChild(event(root.c), root.a) is None
+
+    assert html5.doesEventHitWidgetOrChildren(event(root.b), root.ul)
+    assert not html5.doesEventHitWidgetOrChildren(event(root.c), root.a)
+    assert utils.doesEventHitWidgetOrChildren(event(root.b), root.ul) is root.a
+
+
+def test_hits_of_moved_children():
+    root = tree()
+    assert html5.eventHitChild(event(root.b), root.ul) is root.a
+
+    other = html5.Div()
+    root.a.removeChild(root.b)
+    other.appendChild(root.b)
+
+    assert html5.eventHitChild(event(root.b), root.ul) is None
+    assert html5.eventHitChild(event(root.b), other) is root.b
+
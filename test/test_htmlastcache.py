@@ -0,0 +1,50 @@
+# Tests for html5.HtmlAstCache, the template cache used by fromHTML()
+from flare import html5
+
+
+def test_hit_returns_same_ast():
+    cache = html5.HtmlAstCache(maxSize=4)
+    ast = cache.get("<div>a</div>")
+
+    assert cache.get("<div>a</div>") is ast
+    assert ast == html5.parseHTML("<div>a</div>")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_is_evicted():
+    cache = html5.HtmlAstCache(maxSize=2)
+    a = cache.get("a")
+    cache.get("b")
+    cache.get("a")  # a is now the most recently used one
+    cache.get("c")
+
+    assert cache.stats()["size"] == 2
+    assert cache.get("a") is a
+    assert cache.stats()["misses"] == 3
+
+    cache.get("b")
+    assert cache.stats()["misses"] == 4
+
+
+def test_disabled():
+    cache = html5.HtmlAstCache(maxSize=0)
+    assert cache.get("a") is not cache.get("a")
+    assert cache.stats()["size"] == 0
+
+
+def test_registertag_clears_global_cache():
+    ast = html5.htmlAstCache.get("<div>x</div>")
+    html5.registerTag("test-cache-div", html5.Div)
+
+    assert html5.htmlAstCache.get("<div>x</div>") is not ast
+
+
+def test_fromhtml_uses_cache():
+    html = '<span class="test-fromhtml-cache">x</span>'
+    misses = html5.htmlAstCache.stats()["misses"]
+
+    for _ in range(3):
+        html5.fromHTML(html, appendTo=html5.Div())
+
+    assert html5.htmlAstCache.stats()["misses"] == misses + 1
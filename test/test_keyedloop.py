@@ -0,0 +1,81 @@
+# Tests for flare-for loops with flare-key, which are rendered again when their observable value changes
+import pytest
+from flare import html5
+from flare.observable import ObservableValue
+
+TEMPLATE = '<ul flare-for="entries" flare-key="value[\'key\']"><li>{{ value[\'name\'] }}</li></ul>'
+
+
+@pytest.fixture(params=[False, True], ids=["interpreted", "compiled"])
+def render(request):
+    def render(appendTo, **kwargs):
+        ast = html5.parseHTML(TEMPLATE)
+
+        if request.param:
+            return html5.compileHTML(ast)(appendTo, **kwargs)
+
+        return html5.fromHTML(ast, appendTo, **kwargs)
+
+    threshold = html5.core.htmlCompileThreshold
+    html5.core.htmlCompileThreshold = None
+    yield render
+    html5.core.htmlCompileThreshold = threshold
+
+
+@pytest.fixture
+def attached():
+    container = html5.Div()
+    html5.Body().appendChild(container)
+    yield container
+    html5.Body().removeChild(container)
+
+
+def entry(key, name):
+    return {"key": key, "name": name}
+
+
+def names(ul):
+    return [li.element.textContent for li in ul._children]
+
+
+def test_rows_are_kept(render, attached):
+    entries = ObservableValue("entries", [entry(1, "a"), entry(2, "b")])
+    ul = render(attached, entries=entries)[0]
+    a, b = ul._children
+
+    entries.setValue([entry(2, "b"), entry(3, "c"), entry(1, "a")])
+    assert names(ul) == ["b", "c", "a"]
+    assert ul._children[0] is b and ul._children[2] is a
+
+    entries.setValue([entry(2, "B")])
+    assert names(ul) == ["B"]
+    assert ul._children[0] is not b
+
+
+def test_registration_count_stays_one(render, attached):
+    entries = ObservableValue("entries", [entry(1, "a")])
+
+    for _ in range(3):
+        attached.removeAllChildren()
+        render(attached, entries=entries)
+        assert len(entries.valueChanged.queue) == 1
+
+    entries.setValue([entry(1, "a"), entry(2, "b")])
+    assert names(attached._children[0]) == ["a", "b"]
+
+
+def test_detached_loop_is_unregistered(render, attached):
+    entries = ObservableValue("entries", [entry(1, "a")])
+    ul = render(attached, entries=entries)[0]
+
+    attached.removeChild(ul)
+    assert not entries.valueChanged.queue
+
+    entries.setValue([entry(2, "b")])
+    assert names(ul) == ["a"]
+
+    # Catches up when attached again
+    attached.appendChild(ul)
+    assert names(ul) == ["b"]
+    assert len(entries.valueChanged.queue) == 1
+
@@ -0,0 +1,61 @@
+# Tests for the children of widgets whose static content was rendered by innerHTML (html5.core._LazyChildren)
+import pytest
+from flare import html5
+
+
+@pytest.fixture(autouse=True)
+def innerHTML():
+    old = html5.core.domUseInnerHTML, html5.core.htmlCompileThreshold
+    html5.core.domUseInnerHTML = True
+    html5.core.htmlCompileThreshold = None
+    yield
+    html5.core.domUseInnerHTML, html5.core.htmlCompileThreshold = old
+
+
+def render():
+    div = html5.Div()
+    html5.fromHTML("<ul><li>a</li><li>b</li></ul>", div)
+    ul = div._children[0]
+
+    assert isinstance(ul._children, html5.core._LazyChildren)
+    return ul
+
+
+def test_list_operations():
+    assert len(render()._children + []) == 2
+    assert len([] + render()._children) == 2
+    assert len(list(render()._children)) == 2
+    assert len(render()._children * 2) == 4
+    assert render()._children
+    assert render()._children != []
+    assert not render()._children == []
+    assert render()._children > []
+    assert "".join(li._children[0].element.data for li in render()._children) == "ab"
+
+    ul = render()
+    li = ul._children[1]
+    assert ul._children.index(li) == 1
+    assert li in ul._children
+
+
+def test_first_access_materializes():
+    ul = render()
+    children = [li for li in ul._children]
+
+    assert type(ul._children) is list
+    assert ul._children == children
+    assert all(isinstance(li, html5.Li) for li in children)
+    assert all(li.parent() is ul and not li._isAttached for li in children)
+    assert [li.element for li in children] == [ul.element.childNodes.item(i) for i in range(2)]
+
+
+def test_attach_does_not_materialize():
+    ul = render()
+    ul.onAttach()
+    assert isinstance(ul._children, html5.core._LazyChildren)
+
+    # The widgets get the state of their parent when they are created
+    assert all(li._isAttached for li in ul._children)
+
+    ul.onDetach()
+    assert not any(li._isAttached for li in ul._children)
@@ -0,0 +1,95 @@
+# Tests for the Pyodide proxies of event listeners, which are kept across detach and attach
+import gc, types
+import pytest
+from flare import html5
+from flare.html5 import headless
+
+
+class Proxy(object):
+    def __init__(self, func):
+        self.func = func
+        self.destroyed = False
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def destroy(self):
+        self.destroyed = True
+
+
+@pytest.fixture
+def proxies(monkeypatch):
+    created = []
+
+    def create_proxy(func):
+        created.append(Proxy(func))
+        return created[-1]
+
+    monkeypatch.setattr(html5.core, "pyodide", types.SimpleNamespace(create_proxy=create_proxy))
+    return created
+
+
+def test_proxy_is_kept_across_detach_and_attach(proxies):
+    calls = []
+    div = html5.Div()
+    div.addEventListener("click", lambda: calls.append(1))
+
+    html5.Body().appendChild(div)
+    html5.Body().removeChild(div)
+    html5.Body().appendChild(div)
+    div.element.dispatchEvent(headless.Event("click"))
+    html5.Body().removeChild(div)
+
+    assert len(proxies) == 1
+    assert calls == [1]
+
+
+def test_proxy_is_destroyed_with_listener(proxies):
+    div = html5.Div()
+    callback = lambda: None  # noqa: E731
+    div.addEventListener("click", callback)
+    div.removeEventListener("click", callback)
+
+    assert proxies[0].destroyed
+    assert not div.element._listeners
+
+
+def test_proxy_is_destroyed_with_widget(proxies):
+    gc.collect()
+    stats = html5.eventListenerStats()
+    div = html5.Div()
+    div.addEventListener("click", lambda: None)
+    del div
+    gc.collect()
+
+    assert proxies[0].destroyed
+    assert html5.eventListenerStats()["proxiesLive"] == stats["proxiesLive"]
+
+
+def test_attached_listeners_are_pinned():
+    stats = html5.eventListenerStats()
+    div = html5.Div()
+    div.addEventListener("click", lambda: None)
+
+    html5.Body().appendChild(div)
+    assert html5.eventListenerStats()["attachedListeners"] == stats["attachedListeners"] + 1
+
+    html5.Body().removeChild(div)
+    assert html5.eventListenerStats()["attachedListeners"] == stats["attachedListeners"]
+
+
+def test_callback_arities():
+    calls = []
+
+    class Clickable(html5.Div):
+        def onClick(self, event, widget):
+            calls.append((event.type, widget))
+
+    div = Clickable()
+    div.addEventListener("click", lambda: calls.append(0))
+    div.addEventListener("click", lambda event: calls.append(event.type))
+    div.addEventListener("click", div.onClick)
+    div.element.dispatchEvent(headless.Event("click"))
+
+    assert calls == [0, "click", ("click", div)]
+    assert html5.core._callbackArity(Clickable().onClick) == 2
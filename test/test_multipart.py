@@ -0,0 +1,138 @@
+# Tests for the multipart/form-data encoding of request parameters (flare.multipart)
+import io, sys
+from flare.multipart import isFile, flattenParams, MultipartEncoder
+from flare.network import NetworkService
+from flare.handler import SyncHandler
+
+
+class NamedBytesIO(io.BytesIO):
+    name = "/tmp/test.bin"
+
+
+def part(name, content, filename=None):
+    disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+    return (
+        f"\r\nContent-Type: application/octet-stream\r\nMIME-Version: 1.0\r\nContent-Disposition: {disposition}\r\n\r\n"
+    ).encode("utf-8") + content
+
+
+def body(boundary, *parts):
+    separator = f"\r\n--{boundary}".encode("ascii")
+    head = f'Content-Type: multipart/mixed; boundary="{boundary}"\r\nMIME-Version: 1.0\r\n'.encode("ascii")
+    return head + separator + b"".join(part + separator for part in parts) + b"--\r\n"
+
+
+def test_is_file():
+    assert isFile(NamedBytesIO())
+    assert not isFile(io.BytesIO())
+    assert not isFile("test.bin")
+    assert not isFile({"name": "x", "read": "y"})
+
+
+def test_flatten_params():
+    params = {
+        "name": "x",
+        "tags": ["a", "b"],
+        "rows": [{"a": 1}, {"a": 2, "b": None}],
+        "address": {"city": "c", "geo": {"lat": 1.5}},
+    }
+
+    assert list(flattenParams(params)) == [
+        ("name", "x"),
+        ("tags", "a"),
+        ("tags", "b"),
+        ("rows.0.a", 1),
+        ("rows.1.a", 2),
+        ("rows.1.b", None),
+        ("address.city", "c"),
+        ("address.geo.lat", 1.5),
+    ]
+
+    file = NamedBytesIO()
+    assert list(flattenParams({"files": [file]})) == [("files", file)]
+
+
+def test_encode():
+    encoder = MultipartEncoder({"a": "ä", "b": None, "c": [1, 2]}, boundary="---b")
+
+    assert encoder.encode() == body(
+        "---b",
+        part("a", "ä".encode("utf-8")),
+        part("b", b""),
+        part("c", b"1"),
+        part("c", b"2"),
+    )
+    assert encoder.contentType == "multipart/form-data; boundary=---b; charset=utf-8"
+
+
+def test_files_are_sent_unchanged():
+    content = bytes(range(256)) * 3
+    encoder = MultipartEncoder({"file": NamedBytesIO(content)}, boundary="---b")
+    encoder.blockSize = 100
+
+    chunks = list(encoder.chunks())
+    assert b"".join(chunks) == body("---b", part("file", content, filename="test.bin"))
+    assert [content[i : i + 100] for i in range(0, len(content), 100)] == chunks[3:11]
+
+
+def test_text_files_are_encoded_as_utf8():
+    class NamedStringIO(io.StringIO):
+        name = b"/tmp/test.txt"
+
+    encoder = MultipartEncoder({"file": NamedStringIO("ä")}, boundary="---b")
+    assert encoder.encode() == body("---b", part("file", "ä".encode("utf-8"), filename="test.txt"))
+
+
+def test_random_boundary():
+    a, b = MultipartEncoder({}), MultipartEncoder({})
+
+    assert a.boundary != b.boundary
+    assert a.boundary.startswith("---") and len(a.boundary) == 16
+    assert a.encode() == body(a.boundary)
+
+
+def test_gen_req_str_returns_str():
+    for genReqStr in (NetworkService.genReqStr, SyncHandler().genReqStr):
+        res, boundary = genReqStr({"a": "ä", "file": NamedBytesIO(b"\xff")})
+
+        assert isinstance(res, str)
+        assert res.encode("utf-8") == body(
+            boundary,
+            part("a", "ä".encode("utf-8")),
+            part("file", "\ufffd".encode("utf-8"), filename="test.bin"),  # not valid UTF-8
+        )
+
+
+class FormData(object):
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    @classmethod
+    def new(cls):
+        return cls()
+
+    def append(self, *args):
+        self.entries.append(args)
+
+
+class Blob(object):
+    @classmethod
+    def new(cls, parts):
+        blob = cls()
+        blob.parts = parts
+        return blob
+
+
+def test_to_form_data(monkeypatch):
+    pyodide = sys.modules["pyodide"]
+    monkeypatch.setattr(sys.modules["js"], "FormData", FormData, raising=False)
+    monkeypatch.setattr(sys.modules["js"], "Blob", Blob, raising=False)
+
+    jsFile = pyodide.JsProxy()
+    formData = MultipartEncoder({"a": 1, "b": None, "upload": jsFile, "file": NamedBytesIO(b"content")}).toFormData()
+
+    assert formData.entries[:3] == [("a", "1"), ("b", ""), ("upload", jsFile)]
+
+    (key, blob, filename), = formData.entries[3:]
+    assert (key, blob.parts, filename) == ("file", [b"content"], "test.bin")
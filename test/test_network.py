@@ -0,0 +1,480 @@
+# Tests for NetworkService, running against a fake XMLHttpRequest
+import io
+import json
+import time
+import pytest
+import flare.network
+from flare import html5
+from flare.network import NetworkService, ResponseCache
+from flare.viur.forms import ViurForm
+
+
+class XMLHttpRequest(object):
+    def __init__(self):
+        super().__init__()
+        self.headers = {}
+        self.responseHeaders = {}
+        self.readyState = 0
+        self.payload = None
+
+    def open(self, method, url, asynchronous):
+        self.method = method
+        self.url = url
+
+    def setRequestHeader(self, name, value):
+        self.headers[name] = value
+
+    def send(self, payload):
+        self.payload = payload
+
+    def getResponseHeader(self, name):
+        return self.responseHeaders.get(name)
+
+
+class Window(object):
+    def __init__(self):
+        super().__init__()
+        self.timers = []
+
+    def setTimeout(self, callback, delay):
+        self.timers.append(callback)
+
+
+class Network(object):
+    """The fake network: Records the requests sent, and delivers their responses."""
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self.requests = []
+
+    def xhr(self, code):
+        assert code == "new XMLHttpRequest()"
+        self.requests.append(XMLHttpRequest())
+        return self.requests[-1]
+
+    def send(self):
+        """Sends the requests which are opened."""
+        for req in self.requests:
+            if req.readyState == 0:
+                req.readyState = 1
+                req.onreadystatechange()
+
+    def respond(self, req, text="{}", status=200, **headers):
+        req.status = status
+        req.responseText = text
+        req.responseHeaders = headers
+        req.readyState = 4
+        req.onreadystatechange()
+
+    def runTimers(self):
+        while self.window.timers:
+            self.window.timers.pop(0)()
+
+
+@pytest.fixture
+def network(monkeypatch):
+    window = Window()
+    network = Network(window)
+
+    monkeypatch.setattr(html5, "window", window)
+    monkeypatch.setattr(html5, "jseval", network.xhr)
+    monkeypatch.setattr(NetworkService, "inFlight", {})
+    monkeypatch.setattr(NetworkService, "stats", {"requests": 0, "coalesced": 0})
+    monkeypatch.setattr(NetworkService, "responseCache", None)
+    monkeypatch.setattr(NetworkService, "defaultFailureHandler", lambda req, code: None)
+    monkeypatch.setattr(NetworkService, "jsonBodyModules", set())
+    monkeypatch.setattr(flare.network, "skeyRequestQueue", [])
+
+    return network
+
+
+def results(calls):
+    """Returns a handler, which appends its arguments to calls."""
+    return lambda req, *args: calls.append((req, *args))
+
+
+# Coalescing of concurrent read requests ----------------------------------------------------------------------------
+
+
+def test_identical_reads_are_coalesced(network):
+    calls = []
+    a = NetworkService.request("user", "list", {"limit": 5}, successHandler=results(calls))
+    b = NetworkService.request("user", "list", {"limit": 5}, successHandler=results(calls))
+    network.send()
+
+    assert a is b
+    assert len(network.requests) == 1
+    assert NetworkService.stats == {"requests": 2, "coalesced": 1}
+
+    network.respond(network.requests[0], '{"a": 1}')
+    assert calls == [(a,), (a,)]
+    assert not NetworkService.inFlight
+
+    # A new request after the response is sent again
+    NetworkService.request("user", "list", {"limit": 5})
+    assert len(network.requests) == 2
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        dict(params={"limit": 6}),
+        dict(url="view"),
+        dict(modifies=True),
+        dict(jsonBody=True),
+    ],
+)
+def test_different_reads_are_not_coalesced(network, other):
+    kwargs = dict(module="user", url="list", params={"limit": 5})
+    a = NetworkService.request(**kwargs)
+    b = NetworkService.request(**dict(kwargs, **other))
+
+    assert a is not b
+    assert len(network.requests) == 2
+
+
+def test_json_body_modules_are_not_coalesced_with_multipart(network, monkeypatch):
+    monkeypatch.setattr(NetworkService, "jsonBodyModules", {"user"})
+    a = NetworkService.request("user", "list", {"limit": 5})
+    b = NetworkService.request("user", "list", {"limit": 5}, jsonBody=True)
+    c = NetworkService.request("user", "list", {"limit": 5}, jsonBody=False)
+
+    assert a is b
+    assert c is not a
+
+
+def test_failure_is_delivered_to_all_handlers(network):
+    failures, finished = [], []
+    a = NetworkService.request("user", "list", failureHandler=results(failures), finishedHandler=results(finished))
+    NetworkService.request("user", "list", failureHandler=results(failures), finishedHandler=results(finished))
+    network.send()
+
+    network.respond(network.requests[0], "error", status=500)
+    assert failures == [(a, 500), (a, 500)]
+    assert finished == [(a,), (a,)]
+    assert not NetworkService.inFlight
+
+
+def test_coalescing_across_retries(network):
+    calls = []
+    a = NetworkService.request("user", "list", successHandler=results(calls))
+    network.send()
+
+    # A retryable failure keeps the request running
+    network.respond(network.requests[0], "", status=0)
+    assert NetworkService.request("user", "list", successHandler=results(calls)) is a
+
+    network.runTimers()
+    network.send()
+    assert len(network.requests) == 2
+
+    network.respond(network.requests[1], "{}")
+    assert calls == [(a,), (a,)]
+    assert not NetworkService.inFlight
+
+
+def raising(req, *args):
+    raise RuntimeError("handler failed")
+
+
+def test_raising_handler_does_not_prevent_other_callers(network):
+    calls, finished = [], []
+    a = NetworkService.request("user", "list", successHandler=raising, finishedHandler=results(finished))
+    NetworkService.request("user", "list", successHandler=results(calls), finishedHandler=results(finished))
+    network.send()
+
+    network.respond(network.requests[0])
+    assert calls == [(a,)]
+    assert finished == [(a,), (a,)]
+    assert not NetworkService.inFlight
+
+
+def test_raising_failure_handler_does_not_prevent_other_callers(network):
+    failures = []
+    a = NetworkService.request("user", "list", failureHandler=raising)
+    NetworkService.request("user", "list", failureHandler=results(failures))
+    network.send()
+
+    network.respond(network.requests[0], "error", status=500)
+    assert failures == [(a, 500)]
+
+
+def test_raising_handler_of_single_caller_propagates(network):
+    NetworkService.request("user", "list", successHandler=raising)
+    network.send()
+
+    with pytest.raises(RuntimeError):
+        network.respond(network.requests[0])
+
+
+def test_coalescing_disabled(network, monkeypatch):
+    monkeypatch.setattr(NetworkService, "coalesceRequests", False)
+    assert NetworkService.request("user", "list") is not NetworkService.request("user", "list")
+
+
+# Caching of responses ----------------------------------------------------------------------------------------------
+
+
+@pytest.fixture
+def cache(network, monkeypatch):
+    cache = ResponseCache(ttl=60, moduleTtl={"log": 0})
+    monkeypatch.setattr(NetworkService, "responseCache", cache)
+    return cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_fresh_responses_are_served_from_cache(network, cache, clock):
+    calls = []
+    NetworkService.request("user", "view", {"key": 1})
+    network.send()
+    network.respond(network.requests[0], '{"a": 1}')
+
+    clock[0] += 59
+    req = NetworkService.request("user", "view", {"key": 1}, successHandler=results(calls))
+    network.runTimers()
+
+    assert len(network.requests) == 1
+    assert calls == [(req,)] and req.result == '{"a": 1}'
+    assert cache.stats()["hits"] == 1
+
+    # After the TTL, the module is requested again
+    clock[0] += 1
+    NetworkService.request("user", "view", {"key": 1})
+    assert len(network.requests) == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_module_ttl(network, cache, clock):
+    NetworkService.request("log", "list")
+    network.send()
+    network.respond(network.requests[0])
+
+    NetworkService.request("log", "list")
+    assert len(network.requests) == 2
+
+
+def test_no_store(network, cache):
+    NetworkService.request("user", "view")
+    network.send()
+    network.respond(network.requests[0], **{"Cache-Control": "no-store"})
+
+    NetworkService.request("user", "view")
+    assert len(network.requests) == 2
+
+
+def test_stale_entry_is_revalidated(network, cache, clock):
+    calls, failures = [], []
+    NetworkService.request("user", "view")
+    network.send()
+    network.respond(network.requests[0], '{"a": 1}', ETag='"v1"')
+
+    clock[0] += 120
+    req = NetworkService.request("user", "view", successHandler=results(calls), failureHandler=results(failures))
+    network.send()
+    assert network.requests[1].headers["If-None-Match"] == '"v1"'
+
+    network.respond(network.requests[1], "", status=304)
+    assert calls == [(req,)] and req.result == '{"a": 1}'
+    assert not failures
+    assert cache.stats()["revalidated"] == 1
+
+    # The entry is fresh again
+    NetworkService.request("user", "view")
+    assert len(network.requests) == 2
+
+
+def test_notify_change_invalidates_module(network, cache):
+    for module in ("user", "file"):
+        NetworkService.request(module, "list")
+        network.send()
+        network.respond(network.requests[-1])
+
+    NetworkService.notifyChange("user")
+    NetworkService.request("user", "list")
+    NetworkService.request("file", "list")
+    assert len(network.requests) == 3
+
+
+def test_modifying_request_invalidates_module(network, cache):
+    NetworkService.request("user", "list")
+    network.send()
+    network.respond(network.requests[0])
+
+    NetworkService.request("user", "edit", {"key": 1}, modifies=True)
+    network.send()
+    network.respond(network.requests[1])
+    network.runTimers()
+
+    NetworkService.request("user", "list")
+    assert len(network.requests) == 3
+
+
+def test_invalidation_drops_pending_responses_of_its_module_only(network, cache):
+    NetworkService.request("user", "list")
+    NetworkService.request("file", "list")
+    network.send()
+
+    # The changes may not be contained in the responses of requests sent before
+    NetworkService.notifyChange("user")
+    network.respond(network.requests[0])
+    network.respond(network.requests[1])
+
+    NetworkService.request("user", "list")
+    NetworkService.request("file", "list")
+    assert len(network.requests) == 3
+    assert network.requests[2].url.endswith("/user/list")
+
+
+# Read requests as GET ----------------------------------------------------------------------------------------------
+
+
+class NamedBytesIO(io.BytesIO):
+    name = "test.txt"
+
+
+def test_gen_query_str():
+    assert NetworkService.genQueryStr({"a": [1, 2], "b": {"c": None}, "d": "x y&z"}) == "a=1&a=2&b.c=&d=x+y%26z"
+    assert NetworkService.genQueryStr({"rows": [{"a": 1}, {"a": 2}]}) == "rows.0.a=1&rows.1.a=2"
+    assert NetworkService.genQueryStr({"file": NamedBytesIO(b"x")}) is None
+
+
+def test_reads_are_sent_as_post_by_default(network):
+    NetworkService.request("user", "list", {"limit": 5})
+    network.send()
+
+    assert network.requests[0].method == "POST"
+    assert network.requests[0].url == "/json/user/list"
+    assert b'name="limit"' in network.requests[0].payload
+
+
+@pytest.fixture
+def readsAsGet(network, monkeypatch):
+    monkeypatch.setattr(NetworkService, "readsAsGet", True)
+
+
+def test_reads_as_get(network, readsAsGet):
+    calls = []
+    req = NetworkService.request("user", "list", {"limit": 5, "orderby": "name"}, successHandler=results(calls))
+    network.send()
+
+    assert network.requests[0].method == "GET"
+    assert network.requests[0].url == "/json/user/list?limit=5&orderby=name"
+    assert network.requests[0].payload is None
+
+    network.respond(network.requests[0])
+    assert calls == [(req,)]
+
+
+def test_reads_as_get_keep_query_of_url(network, readsAsGet):
+    NetworkService.request("user", "list?amount=5", {"limit": 5})
+    network.send()
+
+    assert network.requests[0].url == "/json/user/list?amount=5&limit=5"
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(params={"limit": 5}, modifies=True),
+        dict(params={"file": NamedBytesIO(b"content")}),
+        dict(params={"text": "x" * 2048}),
+    ],
+    ids=["modifies", "file", "too long"],
+)
+def test_reads_as_get_fall_back_to_post(network, readsAsGet, kwargs):
+    NetworkService.request("user", "list", **kwargs)
+    network.send()
+
+    assert network.requests[0].method == "POST"
+    assert network.requests[0].url == "/json/user/list"
+    assert network.requests[0].payload
+
+
+def test_max_get_url_length(network, readsAsGet, monkeypatch):
+    # Only longer urls are sent by POST
+    monkeypatch.setattr(NetworkService, "maxGetUrlLength", len("/json/user/list?limit=5"))
+    NetworkService.request("user", "list", {"limit": 5})
+    NetworkService.request("user", "list", {"limit": 50})
+    network.send()
+
+    assert [req.method for req in network.requests] == ["GET", "POST"]
+
+
+# JSON request bodies -----------------------------------------------------------------------------------------------
+
+
+def test_gen_json_str():
+    params = {"name": "x", "tags": ["a", "b"], "rows": [{"a": 1}, {"a": 2}], "address": {"city": None}}
+
+    # Keys occurring several times get a list of all their values
+    assert json.loads(NetworkService.genJsonStr(params)) == {
+        "name": "x",
+        "tags": ["a", "b"],
+        "rows.0.a": 1,
+        "rows.1.a": 2,
+        "address.city": None,
+    }
+    assert json.loads(NetworkService.genJsonStr({"tags": ["a", "b", "c"]})) == {"tags": ["a", "b", "c"]}
+    assert NetworkService.genJsonStr({"file": NamedBytesIO(b"x")}) is None
+
+
+def test_json_body(network):
+    NetworkService.request("user", "list", {"tags": ["a", "b"]}, jsonBody=True)
+    network.send()
+
+    assert network.requests[0].method == "POST"
+    assert network.requests[0].headers["Content-Type"] == "application/json; charset=utf-8"
+    assert json.loads(network.requests[0].payload) == {"tags": ["a", "b"]}
+
+
+def test_json_body_with_files_is_multipart(network):
+    NetworkService.request("file", "add", {"file": NamedBytesIO(b"x")}, jsonBody=True)
+    network.send()
+
+    assert network.requests[0].headers["Content-Type"].startswith("multipart/form-data")
+
+
+def submitForm(network, **kwargs):
+    """Submits a ViurForm, and returns the request sent after its skey."""
+    form = ViurForm(moduleName="user", actionName="edit", skel={"key": "k1"})
+    assert form.submitForm(**kwargs) == {"key": "k1"}
+
+    network.send()
+    skey = network.requests[-1]
+    assert skey.url == "/json/skey"
+    network.respond(skey, '"s1"')
+    network.send()
+
+    req = network.requests[-1]
+    assert req.url == "/json/user/edit"
+
+    # Secure requests are sent one by one
+    network.respond(req, '{"action": "editSuccess", "values": {}}')
+    return req
+
+
+def test_submit_form_json_body(network):
+    req = submitForm(network, jsonBody=True)
+
+    assert req.headers["Content-Type"] == "application/json; charset=utf-8"
+    assert json.loads(req.payload) == {"key": "k1", "skey": "s1"}
+
+
+def test_submit_form_multipart(network):
+    req = submitForm(network, jsonBody=False)
+
+    assert req.headers["Content-Type"].startswith("multipart/form-data")
+    assert b'name="skey"\r\n\r\ns1' in req.payload
+
+
+def test_submit_form_json_body_modules(network, monkeypatch):
+    monkeypatch.setattr(NetworkService, "jsonBodyModules", {"user"})
+    assert json.loads(submitForm(network).payload) == {"key": "k1", "skey": "s1"}
+    assert submitForm(network, jsonBody=False).headers["Content-Type"].startswith("multipart/form-data")
@@ -0,0 +1,62 @@
+# Tests for html5.parseHTML()
+from flare import html5
+
+
+def test_elements_and_text():
+    assert html5.parseHTML('<div class="a"><span>Hello</span> world</div>') == [
+        ("div", {"class": "a"}, [("span", {}, ["Hello"]), " world"])
+    ]
+
+
+def test_attributes():
+    ast = html5.parseHTML("<input disabled value='a b' title = \"x\" CLASS=\"c\" class=\"d\">")
+    assert ast == [("input", {"disabled": "disabled", "value": "a b", "title": "x", "class": "c d"}, [])]
+
+
+def test_leaf_tags_are_closed():
+    assert html5.parseHTML("a<br>b<hr>c") == ["a", ("br", {}, []), "b", ("hr", {}, []), "c"]
+    assert html5.parseHTML('<div><img src="x"/><span></span></div>') == [
+        ("div", {}, [("img", {"src": "x"}, []), ("span", {}, [])])
+    ]
+
+
+def test_whitespace_only_texts_are_skipped():
+    assert html5.parseHTML("<ul>\n\t<li>a</li>\n</ul>\n") == [("ul", {}, [("li", {}, ["a"])])]
+
+
+def test_comments():
+    assert html5.parseHTML("a<!-- <div>ignored</div> -->b") == ["ab"]
+    assert html5.parseHTML("a<!-- unterminated") == ["a"]
+
+
+def test_unknown_tags_and_stray_markup_are_text():
+    assert html5.parseHTML("<foo>bar</foo>") == ["bar"]
+    assert html5.parseHTML("<div></span>x</div>") == [("div", {}, ["x"])]
+    assert html5.parseHTML("x <") == ["x <"]
+    assert html5.parseHTML("1 < 2") == ["1 < 2"]
+
+
+def test_unclosed_tags():
+    assert html5.parseHTML("<div><p>a<p>b</div>") == [("div", {}, [("p", {}, ["a", ("p", {}, ["b"])])])]
+
+
+def test_entities():
+    assert html5.parseHTML("<div>&amp;&lt;&#65;&auml;</div>") == [("div", {}, ["&<Aä"])]
+
+
+def test_deep_nesting():
+    depth = 5000
+    ast = html5.parseHTML("<div>" * depth + "x" + "</div>" * depth)
+
+    for _ in range(depth):
+        assert len(ast) == 1 and ast[0][0] == "div"
+        ast = ast[0][2]
+
+    assert ast == ["x"]
+
+
+def test_large_input():
+    rows = 20000
+    ast = html5.parseHTML('<li class="row">item</li>' * rows)
+    assert len(ast) == rows
+    assert ast[-1] == ("li", {"class": "row"}, ["item"])
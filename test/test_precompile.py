@@ -0,0 +1,60 @@
+# Tests for the template precompilation of the build tool (tools/flare.py --precompile)
+import os, sys, shutil, importlib.util
+from flare import html5
+
+TOOLS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools")
+
+
+def loadTool():
+    spec = importlib.util.spec_from_file_location("flare_build_tool", os.path.join(TOOLS, "flare.py"))
+    tool = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(tool)
+    return tool
+
+
+def makeTarget(path):
+    shutil.copytree(os.path.dirname(html5.__file__), path / "flare" / "html5", ignore=shutil.ignore_patterns(
+        "__pycache__", "precompiled.py"
+    ))
+
+    with open(path / "app.py", "w") as f:
+        f.write(
+            "from flare import html5\n"
+            "\n"
+            "@html5.tag('my-leaf')\n"
+            "class MyLeaf(html5.Div):\n"
+            "    _leafTag = True\n"
+            "\n"
+            "html5.Body().appendChild('<div class=\"app\"><my-leaf>x<span>{{y}}</span></div>')\n"
+        )
+
+    return path
+
+
+def test_precompile(tmp_path):
+    tool = loadTool()
+    target = makeTarget(tmp_path)
+    path = list(sys.path)
+
+    tool.precompileTemplates(str(target))
+
+    # The html5 package of the target is used, without modifying sys.path
+    assert sys.path == path
+    (html5dir, package), = tool.html5Packages.items()
+    assert html5dir == os.path.realpath(target / "flare" / "html5")
+    assert package.__file__.startswith(html5dir)
+    assert package is not html5
+
+    namespace = {}
+    with open(target / "flare" / "html5" / "precompiled.py") as f:
+        exec(f.read(), namespace)
+
+    template = '<div class="app"><my-leaf>x<span>{{y}}</span></div>'
+    signature, ast = namespace["templates"][template]
+    assert ("my-leaf", True) in signature
+    assert ast[0][0] == "div"
+
+    # Repeated builds reuse the imported package
+    tool.precompileTemplates(str(target))
+    assert len(tool.html5Packages) == 1
+    assert sys.path == path
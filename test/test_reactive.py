@@ -0,0 +1,119 @@
+# Tests for templates using observable values, whose texts and attributes are rendered again when they change
+import pytest
+from flare import html5
+from flare.observable import ObservableValue
+
+
+@pytest.fixture(params=[False, True], ids=["interpreted", "compiled"])
+def render(request):
+    def render(html, appendTo, **kwargs):
+        ast = html5.parseHTML(html)
+
+        if request.param:
+            return html5.compileHTML(ast)(appendTo, **kwargs)
+
+        return html5.fromHTML(ast, appendTo, **kwargs)
+
+    threshold = html5.core.htmlCompileThreshold
+    html5.core.htmlCompileThreshold = None
+    yield render
+    html5.core.htmlCompileThreshold = threshold
+
+
+@pytest.fixture
+def attached():
+    container = html5.Div()
+    html5.Body().appendChild(container)
+    yield container
+    html5.Body().removeChild(container)
+
+
+def test_text_and_attributes_are_rendered_again(render, attached):
+    name = ObservableValue("name", "a")
+    render('<span class="x-{{name}}" title="{{name}}">Hello {{name}}</span>', attached, name=name)
+
+    assert attached.element.innerHTML == '<span class="x-a" title="a">Hello a</span>'
+
+    name.setValue("b")
+    assert "Hello a" in attached.element.innerHTML  # updated with the next frame
+
+    html5.core.domFlush()
+    assert attached.element.innerHTML == '<span class="x-b" title="b">Hello b</span>'
+
+
+def test_detached_bindings_are_unregistered(render, attached):
+    name = ObservableValue("name", "a")
+    span = render("<span>{{name}}</span>", attached, name=name)[0]
+    assert len(name.valueChanged.queue) == 1
+
+    attached.removeChild(span)
+    assert not name.valueChanged.queue
+
+    name.setValue("b")
+    html5.core.domFlush()
+    assert span.element.innerHTML == "a"
+
+    # Catches up when attached again
+    attached.appendChild(span)
+    assert len(name.valueChanged.queue) == 1
+    html5.core.domFlush()
+    assert span.element.innerHTML == "b"
+
+
+def test_registration_count_stays_one(render, attached):
+    name = ObservableValue("name", "a")
+
+    for _ in range(3):
+        attached.removeAllChildren()
+        render("<span>{{name}}</span>", attached, name=name)
+
+    assert len(name.valueChanged.queue) == 1
+
+
+def test_conditions_and_loops_use_current_values(render):
+    count = ObservableValue("count", 2)
+    items = ObservableValue("items", ["a", "b"])
+    div = html5.Div()
+    render(
+        '<b flare-if="count > 1">many</b><b flare-elif="count == 1">one</b>'
+        '<ul flare-for="items"><li>{{value}}</li></ul>',
+        div,
+        count=count,
+        items=items,
+    )
+
+    assert div.element.innerHTML == "<b>many</b><ul><li>a</li><li>b</li></ul>"
+
+
+def test_keyed_loop_observes_values_used_by_expression(render, attached):
+    first = ObservableValue("first", ["a"])
+    second = ObservableValue("second", ["b"])
+    ul = render(
+        '<ul flare-for="first + second" flare-key="value"><li>{{value}}</li></ul>', attached, first=first, second=second
+    )[0]
+    assert ul.element.innerHTML == "<li>a</li><li>b</li>"
+
+    second.setValue(["c"])
+    assert ul.element.innerHTML == "<li>a</li><li>c</li>"
+
+    first.setValue([])
+    assert ul.element.innerHTML == "<li>c</li>"
+
+
+def test_plain_variables_are_no_observables():
+    assert html5.core._replaceVars("{{a}} {{b}}", {"a": 1, "b": "x"}) == "1 x"
+    assert html5.core._observablesOf("{{a}}", {"a": [1]}) == {}
+    assert html5.core._replaceVars("no expression", {}) == "no expression"
+
+
+def test_expression_names_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(html5.core, "__expressionNamesMaxSize", 2)
+    cache = html5.core.__dict__["__expressionNames"]
+    cache.clear()
+
+    assert html5.core._expressionNames("{{a + b}}") in (("a", "b"), ("b", "a"))
+    assert html5.core._expressionNames("c", bare=True) == ("c",)
+    html5.core._expressionNames("{{a + b}}")  # most recently used
+    html5.core._expressionNames("{{d}}")
+
+    assert list(cache) == [("{{a + b}}", False), ("{{d}}", False)]
@@ -0,0 +1,102 @@
+# Tests for the reconciliation of children by Widget.patchChildren(), used by replaceChild() and sortChildren()
+import itertools
+import pytest
+from flare import html5
+
+document = html5.core.document
+
+
+class Item(html5.Li):
+    def __init__(self, value):
+        super().__init__(str(value))
+        self.value = value
+        self.attached = 0
+        self.detached = 0
+
+    def onAttach(self):
+        super().onAttach()
+        self.attached += 1
+
+    def onDetach(self):
+        super().onDetach()
+        self.detached += 1
+
+
+@pytest.fixture
+def ul():
+    ul = html5.Ul()
+    html5.Body().appendChild(ul)
+    yield ul
+    html5.Body().removeChild(ul)
+
+
+def values(ul):
+    assert [child.element for child in ul._children] == list(ul.element.childNodes)
+    return [child.value for child in ul._children]
+
+
+@pytest.mark.parametrize("order", list(itertools.permutations(range(4))))
+def test_permutations(ul, order):
+    items = [Item(i) for i in range(4)]
+    ul.appendChild(*items)
+
+    document.resetOps()
+    assert ul.patchChildren([items[i] for i in order]) == [items[i] for i in order]
+
+    assert values(ul) == list(order)
+
+    # Only the children outside the longest increasing subsequence are moved
+    stable = len(html5.core._longestIncreasingSubsequence(list(order)))
+    assert document.ops["live"] == 4 - stable
+    assert all(item.attached == 1 and item.detached == 0 for item in items)
+
+
+def test_insert_and_remove(ul):
+    items = [Item(i) for i in range(3)]
+    ul.appendChild(*items)
+    new = Item(3)
+
+    document.resetOps()
+    ul.patchChildren([items[2], new, items[0]])
+
+    assert values(ul) == [2, 3, 0]
+    assert document.ops["live"] == 3  # remove 1, insert 3, move 2
+    assert items[1].detached == 1 and not items[1].parent()
+    assert new.attached == 1 and new.parent() is ul
+
+
+def test_key(ul):
+    ul.appendChild(*[Item(i) for i in range(3)])
+    old = ul._children[:]
+
+    document.resetOps()
+    ul.patchChildren([Item(2), Item(0), Item(4)], key=lambda item: item.value)
+
+    assert values(ul) == [2, 0, 4]
+    assert ul._children[:2] == [old[2], old[0]]
+    assert document.ops["live"] == 3  # remove 1, move 2, insert 4
+
+
+def test_templates(ul):
+    a, b = Item("a"), Item("b")
+    ul.patchChildren([html5.Template(a, b)])
+
+    assert ul._children == [a, b]
+    assert a.parent() is ul
+
+
+def test_replacechild_keeps_children(ul):
+    a, b = Item("a"), Item("b")
+    ul.appendChild(a)
+
+    assert ul.replaceChild(b, a) is None
+    assert values(ul) == ["b", "a"]
+    assert a.attached == 1 and a.detached == 0
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_sortchildren(ul, reverse):
+    ul.appendChild(*[Item(i) for i in (2, 0, 3, 1)])
+    ul.sortChildren(lambda item: item.value, reversed=reverse)
+
+    assert values(ul) == sorted([0, 1, 2, 3], reverse=reverse)
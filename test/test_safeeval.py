@@ -0,0 +1,43 @@
+# Tests for the expression cache of SafeEval
+import pytest
+from flare.safeeval import SafeEval
+
+
+def test_compiled_expressions_are_cached():
+    ev = SafeEval()
+
+    assert ev.compile("a + 1") is ev.compile("a + 1")
+    assert ev.cacheHits == 1
+    assert ev.cacheMisses == 1
+    assert [ev.execute("a + 1", {"a": a}) for a in range(3)] == [1, 2, 3]
+
+
+def test_cache_is_bounded_lru():
+    ev = SafeEval(cacheSize=2)
+    a = ev.compile("a")
+    ev.compile("b")
+    ev.compile("a")
+    ev.compile("c")  # evicts b
+
+    assert len(ev._cache) == 2
+    assert ev.compile("a") is a
+    assert ev.cacheMisses == 3
+
+    ev.compile("b")
+    assert ev.cacheMisses == 4
+
+
+def test_cache_disabled():
+    ev = SafeEval(cacheSize=0)
+
+    assert ev.compile("a") is not ev.compile("a")
+    assert not ev._cache
+
+
+def test_invalid_expressions_are_not_cached():
+    ev = SafeEval()
+
+    with pytest.raises(AssertionError):
+        ev.compile("(" * 100 + ")" * 100)
+
+    assert not ev._cache
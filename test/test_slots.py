@@ -0,0 +1,23 @@
+# Tests for the __slots__ of Widget and TextNode
+import pytest
+from flare import html5
+
+
+def test_core_attributes_are_slots():
+    assert "__dict__" not in html5.Widget.__slots__
+    assert "element" in html5.Widget.__slots__
+    assert "element" in html5.TextNode.__slots__
+
+
+def test_textnode_takes_further_attributes():
+    txt = html5.TextNode("x")
+    txt.foo = 1
+
+    assert txt.__dict__ == {"foo": 1}
+
+
+def test_widget_subclasses_take_further_attributes():
+    div = html5.Div('<span [name]="x"></span>')
+
+    assert isinstance(div.x, html5.Span)
+    assert div.__dict__ == {"x": div.x}
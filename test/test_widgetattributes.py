@@ -0,0 +1,57 @@
+# Tests for the item access of widgets, which uses the attribute dispatch tables of html5.core._widgetAttributes()
+import abc
+import pytest
+from flare import html5
+
+
+def test_getters_and_setters():
+    div = html5.Div()
+    div["title"] = "a"
+    div["Hidden"] = True
+
+    assert div["title"] == div["Title"] == "a"
+    assert div["hidden"]
+    assert div["nonexisting"] is None
+
+    with pytest.raises(ValueError):
+        div["nonexisting"] = 1
+
+
+def test_setter_names():
+    assert "disabled" in html5.core._widgetAttributes(html5.Input)[2]
+    assert html5.core._widgetAttributes(html5.Input)[1]["disabled"] == "_setDisabled"
+
+
+def test_methods_replaced_on_class_and_instance():
+    class Patched(html5.Div):
+        pass
+
+    div = Patched()
+    div["title"] = "a"  # builds the tables
+
+    Patched._getTitle = lambda self: "class"
+    assert div["title"] == "class"
+
+    div.__dict__["_getTitle"] = lambda: "instance"
+    assert div["title"] == "instance"
+
+    Patched._setAnswer = lambda self, value: setattr(self, "answer", value)
+    div["answer"] = 42
+    assert div.answer == 42
+
+
+def test_custom_targetfuncname():
+    class Custom(html5.Div):
+        def _getTargetfuncName(self, key, type):
+            return "_" + type + "Title"
+
+    div = Custom()
+    div["anything"] = "x"
+    assert div["title"] == "x"
+
+
+def test_no_metaclass_conflict():
+    class Abstract(html5.Div, metaclass=abc.ABCMeta):
+        pass
+
+    assert isinstance(Abstract(), html5.Widget)
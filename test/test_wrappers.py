@@ -0,0 +1,91 @@
+# Tests for the style and data wrappers of widgets, which write any change to the element
+import pytest
+from flare import html5
+
+
+def style(widget):
+    return widget.element.getAttribute("style")
+
+
+def test_style_item_access():
+    div = html5.Div()
+    div["style"]["color"] = "red"
+
+    assert div["style"]["color"] == "red"
+    assert "color" in div["style"]
+    assert dict(div["style"]) == {"color": "red"}
+
+    del div["style"]["color"]
+    assert "color" not in div["style"]
+
+
+def test_style_mutating_methods():
+    div = html5.Div()
+    div["style"].update({"color": "red"}, width="1px")
+    assert style(div) == "color: red; width: 1px;"
+
+    assert div["style"].pop("color") == "red"
+    assert div["style"].pop("color", None) is None
+    with pytest.raises(KeyError):
+        div["style"].pop("color")
+
+    assert div["style"].setdefault("width", "2px") == "1px"
+    assert div["style"].setdefault("height", "2px") == "2px"
+    assert style(div) == "width: 1px; height: 2px;"
+
+    assert div["style"].popitem() in (("width", "1px"), ("height", "2px"))
+    assert len(div["style"]) == 1
+
+    div["style"].clear()
+    assert not style(div)
+    assert not div["style"]
+
+
+def test_data_mutating_methods():
+    div = html5.Div()
+    div["data"].update({"a": "1"}, b="2")
+    assert div.element.getAttribute("data-a") == "1"
+    assert div.element.getAttribute("data-b") == "2"
+
+    assert div["data"].pop("a") == "1"
+    assert not div.element.hasAttribute("data-a")
+
+    assert div["data"].setdefault("c", "3") == "3"
+    assert div["data"].setdefault("c", "4") == "3"
+    assert div.element.getAttribute("data-c") == "3"
+
+    key, value = div["data"].popitem()
+    assert not div.element.hasAttribute("data-" + key)
+
+    div["data"].clear()
+    assert not div["data"]
+    assert not div.element.hasAttribute("data-b") and not div.element.hasAttribute("data-c")
+
+
+def test_wrapper_is_cached():
+    div = html5.Div()
+    assert div["style"] is div["style"]
+    assert div["data"] is div["data"]
+
+
+def test_setstyles():
+    div = html5.Div()
+    div["style"]  # creates the wrapper
+    div.setStyles({"color": "red", "width": "1px"})
+
+    assert style(div) == "color: red; width: 1px;"
+    assert div["style"]["width"] == "1px"
+
+
+def test_setstyles_behaves_like_wrapper():
+    a, b = html5.Div(), html5.Div()
+
+    for div in (a, b):
+        div["style"]["color"] = "blue"
+        div["style"]["margin"] = "1px"
+
+    a.setStyles({"color": "red", "width": ""})
+    b["style"]["color"] = "red"
+    b["style"]["width"] = ""
+
+    assert style(a) == style(b) == "color: red; margin: 1px;"
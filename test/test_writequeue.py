@@ -0,0 +1,148 @@
+# Tests for the DOM write queue (html5.core.domUseWriteQueue), which is run with the next animation frame
+import pytest
+from flare import html5
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    """Enables the write queue with a clock whose frames are run by the test."""
+    frames = []
+    monkeypatch.setattr(html5.core, "domUseWriteQueue", True)
+    monkeypatch.setattr(html5.core, "domWriteQueue", html5.DomWriteQueue(requestFrame=frames.append))
+    return frames
+
+
+def runFrame(frames):
+    frames.pop(0)()
+
+
+def test_writes_are_run_with_next_frame(frames):
+    div = html5.Div()
+    div.addClass("a")
+    div["title"] = "t"
+    div.appendChild(html5.Span())
+
+    assert len(frames) == 1
+    assert len(html5.core.domWriteQueue) == 3
+    assert not div.element.hasAttribute("class") and not div.element.hasChildNodes()
+
+    runFrame(frames)
+    assert div.element.outerHTML == '<div class="a" title="t"><span></span></div>'
+    assert html5.core.domWriteQueue.frames == 1
+    assert not frames
+
+
+def test_setter_updates_python_side_immediately(frames):
+    inp = html5.Input()
+    inp["disabled"] = True
+
+    assert inp._disabledState == 1
+    assert inp["disabled"]
+    assert not inp.element.disabled
+    assert html5.core.domWriteQueue.writes  # disabled is read from the Python side
+
+    runFrame(frames)
+    assert inp.element.disabled
+    assert inp.hasClass("is-disabled")
+
+
+def test_getter_flushes_pending_writes(frames):
+    inp = html5.Input()
+    inp["value"] = "x"
+    inp["title"] = "t"
+
+    assert inp.element.value == ""
+    assert inp["value"] == "x"
+    assert inp.element.getAttribute("title") == "t"
+    assert not html5.core.domWriteQueue.writes
+
+
+def test_element_is_restored(frames):
+    div = html5.Div()
+    element = div.element
+    div["title"] = "t"
+
+    assert div.element is element
+    runFrame(frames)
+    assert element.getAttribute("title") == "t"
+
+
+def test_disabled():
+    div = html5.Div()
+    div["title"] = "t"
+    assert div.element.getAttribute("title") == "t"
+
+
+def test_style_wrapper_reads_pending_writes(frames):
+    div = html5.Div()
+    div["style"]["color"] = "red"
+
+    assert "color" in div["style"]
+    assert div["style"].get("color") == "red"
+
+    div["style"]["width"] = "1px"
+    assert dict(div["style"].items()) == {"color": "red", "width": "1px"}
+
+    del div["style"]["color"]
+    assert "color" not in div["style"]
+
+
+def test_data_wrapper_reads_pending_writes(frames):
+    div = html5.Div()
+    div["data"]["x"] = "1"
+
+    assert "x" in div["data"]
+    assert div["data"].get("x") == "1"
+
+    div["data"]["y"] = "2"
+    assert dict(div["data"].items()) == {"x": "1", "y": "2"}
+
+    del div["data"]["x"]
+    assert div["data"].get("x") is None
+
+
+class Ordered(html5.Div):
+    """Widget whose setters write to the element directly and through its style and classList."""
+
+    def _setOrdered(self, val):
+        self.element.setAttribute("style", "color: blue")
+        self.element.style.setProperty("color", val)
+        self.element.classList.add("a")
+        self.element.setAttribute("class", "b")
+
+    def _setCopied(self, val):
+        self.element.setAttribute("class", val)
+        self.element.title = self.element.getAttribute("class")
+
+
+def test_setter_writes_are_run_in_program_order(frames):
+    widget = Ordered()
+    widget.element.setAttribute("class", "x")
+    widget["ordered"] = "red"
+
+    assert widget.element.getAttribute("style") is None
+    assert widget.element.getAttribute("class") == "x"
+
+    runFrame(frames)
+    assert widget.element.getAttribute("style") == "color: red;"
+    assert widget.element.getAttribute("class") == "b"
+
+
+def test_setter_reads_apply_pending_writes(frames):
+    widget = Ordered()
+    widget["copied"] = "c"
+
+    assert widget.element.getAttribute("class") == "c"
+    assert not widget.element.title
+
+    runFrame(frames)
+    assert widget.element.title == "c"
+
+
+def test_writes_made_by_writes_are_run_in_order(frames):
+    div = html5.Div()
+    html5.domWrite(html5.domWrite, div.element.setAttribute, "title", "a")
+    html5.domWrite(div.element.setAttribute, "title", "b")
+
+    runFrame(frames)
+    assert div.element.getAttribute("title") == "b"
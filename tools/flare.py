@@ -3,7 +3,7 @@
 flare application packager and build tool
 """
 
-import os, shutil, json, argparse, pathlib, fnmatch, compileall, tempfile
+import os, sys, re, ast, shutil, json, argparse, pathlib, fnmatch, compileall, tempfile, types, importlib.util
 
 ignore_patterns = [
     "flare/assets/*",
@@ -48,6 +48,182 @@ def minifyPy(target):
                     f.truncate()
                     f.write(python_minifier.minify(code, remove_literal_statements=True))
 
+
+# Widget methods and html5 functions whose string literal arguments are HTML templates
+templateFunctions = {
+    "appendChild": None,  # None means: all positional arguments
+    "prependChild": None,
+    "replaceChild": 1,  # only the first positional argument
+    "fromHTML": 1,
+    "parseHTML": 1,
+}
+
+
+def collectTemplates(target):
+    """Collects all HTML templates passed as string literals to appendChild(), fromHTML(), parseHTML() etc.,
+    and all tags defined by the html5.tag-decorator or registerTag() in the .py-files of target.
+
+    Returns the set of templates, a dict of tag names and their class names,
+    and a dict of class names with their base class names and leaf-flag (or None when not set).
+    """
+    templates = set()
+    tags = {}
+    classes = {}
+
+    def funcName(node):
+        if isinstance(node, ast.Attribute):
+            return node.attr
+        elif isinstance(node, ast.Name):
+            return node.id
+
+        return None
+
+    for root, _, filenames in os.walk(target):
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+
+            with open(os.path.join(root, filename), "r") as f:
+                try:
+                    tree = ast.parse(f.read())
+                except SyntaxError:
+                    continue
+
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Call):
+                    name = funcName(node.func)
+
+                    if name in templateFunctions:
+                        args = node.args[:templateFunctions[name]]
+
+                        for arg in args:
+                            if isinstance(arg, ast.Constant) and isinstance(arg.value, str) and "<" in arg.value:
+                                templates.add(arg.value)
+
+                    elif name == "registerTag" and len(node.args) >= 2:
+                        tagName, cls = node.args[:2]
+
+                        if isinstance(tagName, ast.Constant) and isinstance(tagName.value, str):
+                            tags[tagName.value.lower()] = funcName(cls)
+
+                # Classes inside html5 itself are already known by the html5 library
+                elif isinstance(node, ast.ClassDef) and os.path.basename(root) != "html5":
+                    leaf = None
+                    for stmt in node.body:
+                        if (
+                            isinstance(stmt, ast.Assign)
+                            and any(funcName(t) == "_leafTag" for t in stmt.targets)
+                            and isinstance(stmt.value, ast.Constant)
+                        ):
+                            leaf = bool(stmt.value.value)
+
+                    classes[node.name] = ([funcName(base) for base in node.bases], leaf)
+
+                    for decorator in node.decorator_list:
+                        if isinstance(decorator, ast.Call):
+                            if funcName(decorator.func) == "tag" and decorator.args \
+                                    and isinstance(decorator.args[0], ast.Constant):
+                                tags[str(decorator.args[0].value).lower()] = node.name
+
+                        elif funcName(decorator) == "tag":
+                            tags[node.name.lower()] = node.name
+
+    return templates, tags, classes
+
+
+# html5 packages imported by loadHtml5(), by their directory
+html5Packages = {}
+
+
+def loadHtml5(html5dir):
+    """Imports the html5 package located in html5dir, once per directory.
+
+    The package is imported as a sub-package of a private package, so that it neither depends on
+    nor modifies sys.path, and any other html5 package stays untouched.
+    """
+    html5dir = os.path.realpath(html5dir)
+
+    if (html5 := html5Packages.get(html5dir)) is not None:
+        return html5
+
+    parent = f"_flare_html5_{len(html5Packages)}"
+    sys.modules[parent] = types.ModuleType(parent)
+    sys.modules[parent].__path__ = []
+
+    spec = importlib.util.spec_from_file_location(
+        f"{parent}.html5", os.path.join(html5dir, "__init__.py"), submodule_search_locations=[html5dir]
+    )
+    html5 = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = html5  # required by the relative imports inside html5
+    spec.loader.exec_module(html5)
+
+    html5Packages[html5dir] = html5
+    return html5
+
+
+def precompileTemplates(target):
+    """Pre-parses all HTML templates found in the .py-files of target, and writes them as precompiled.py
+    into the html5 package, where html5.fromHTML() picks them up instead of parsing them at runtime.
+
+    Custom tags are emulated with their leaf-flag, as far as it can be determined from the sources.
+    The runtime falls back to parsing any template whose tags do not match its tag registry.
+    """
+    html5dir = None
+    for root, dirs, filenames in os.walk(target):
+        if os.path.basename(root) == "html5" and "core.py" in filenames:
+            html5dir = root
+            break
+
+    if not html5dir:
+        print("html5 not found in target, templates are not precompiled")
+        return
+
+    # Use the html5 library of the target, which parses the templates at runtime
+    html5 = loadHtml5(html5dir)
+
+    templates, tags, classes = collectTemplates(target)
+
+    def isHtml5Leaf(name):
+        widget = getattr(html5, name or "", None)
+        return isinstance(widget, type) and issubclass(widget, html5.Widget) and bool(widget._leafTag)
+
+    def isLeaf(name, depth=0):
+        if name not in classes or depth > 32:
+            return isHtml5Leaf(name)
+
+        bases, leaf = classes[name]
+        if leaf is not None:
+            return leaf
+
+        # e.g. class Input(html5.Input) refers to html5 by its own name
+        return any(isHtml5Leaf(base) if base == name else isLeaf(base, depth + 1) for base in bases)
+
+    for tag, name in tags.items():
+        html5.registerTag(tag, type(name or tag, (html5.Widget,), {"_leafTag": isLeaf(name)}))
+
+    with open(os.path.join(html5dir, "precompiled.py"), "w") as f:
+        f.write("# This file is generated by tools/flare.py, do not edit.\n")
+        f.write("templates = {\n")
+
+        for template in sorted(templates):
+            f.write(f"    {template!r}: {html5.precompileHTML(template)!r},\n")
+
+        f.write("}\n")
+
+    # Add precompiled.py to the files.json of the package containing html5
+    filesJson = os.path.join(html5dir, "..", "files.json")
+    if os.path.exists(filesJson):
+        with open(filesJson, "r") as f:
+            files = json.load(f)
+
+        if "html5/precompiled.py" not in files:
+            with open(filesJson, "w") as f:
+                json.dump(sorted(files + ["html5/precompiled.py"]), f, indent=2)
+                print("", file=f)  # append line break
+
+    print(f"{len(templates)} templates precompiled")
+
+
 def compilePy(target):
     """Compiles py files to pyc and removes all py files at the end."""
     compileall.compile_dir(target, force=True, legacy=True, quiet=1)  # fixme: This does not work when local Python is 3.9.7 but Pyodide is 3.9.5...
@@ -187,6 +363,8 @@ def main():
 
     ap.add_argument("-n", "--name", type=str, help="Name of the target package", default="app")
     ap.add_argument("-m", "--minify", help="Minify source by removing docstrings", action="store_true", default=False)
+    ap.add_argument("-p", "--precompile", help="Pre-parse HTML templates, so they are not parsed at runtime",
+                    action="store_true", default=False)
     ap.add_argument("-c", "--compile", help="Compile into pre-compiled .PYC-files", action="store_true", default=False)
     ap.add_argument("-z", "--zip", help="Create zipped package to decreased number of download requests",
                     action="store_true", default=False)
@@ -209,6 +387,10 @@ def main():
     # Copy sources
     copySourcePy(args.source, args.target)
 
+    if args.precompile:
+        # Pre-parse HTML templates into html5
+        precompileTemplates(args.target)
+
     if args.minify:
         # Minify copied sources
         minifyPy(args.target)
@@ -277,6 +459,9 @@ def main():
                 print("regenerating files.json")
                 generateFilesJson(args.target)
 
+            if args.precompile:
+                precompileTemplates(args.target)
+
             if args.minify:
                 minifyPy(args.target)
 